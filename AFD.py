@@ -1,14 +1,35 @@
 
+import codecs
+import gzip
+import hashlib
+import io
+import mmap
+import struct
+import sys
 import xml.etree.ElementTree as ET
 
+import instrumentacao
+
+from array import array
 from collections import deque
-from copy import deepcopy
+from collections.abc import Mapping, MutableMapping, MutableSet, Sequence, Set
 from itertools import combinations
+from xml.sax.saxutils import escape, quoteattr
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional (usado só em aceita_lote)
+    np = None
 
 
 class AFD:
 
     def __init__(self, Alfabeto):
+        if isinstance(Alfabeto, (set, frozenset, list, tuple)):
+            # Coleção de símbolos: guarda os símbolos em ordem, e não o
+            # str() da coleção (que criaria símbolos como '{', ',' e "'").
+            # Como em criaTransicao, só símbolos de um caractere contam
+            Alfabeto = ''.join(sorted({s for s in map(str, Alfabeto) if len(s) == 1}))
         Alfabeto = str(Alfabeto)
         self.estados = set()
         self.alfabeto = Alfabeto
@@ -26,10 +47,11 @@ class AFD:
         id = str(id)
         if id in self.estados:
             return False
+        self.estados.add(id)
         if inicial:
             self.incial = id
         if final:
-            self.finais = self.finais.union({id})
+            self.finais.add(id)
         return True
 
     # Funções aprendidas na video aula mas nao utilizadas
@@ -52,18 +74,20 @@ class AFD:
 
     # Funções aprendidas na video aula mas nao utilizadas
     def mudaEstadoInicial(self,id):
+        id = str(id)
         if not id in self.estados:
             return
-        self.inicial = id
+        self.incial = id
 
     # Funções aprendidas na video aula mas nao utilizadas
     def mudaEstadoFinal(self, id, final):
+        id = str(id)
         if not id in self.estados:
             return
         if final:
-            self.final = self.finais.union({id})
+            self.finais.add(id)
         else:
-            self.final = self.finais.difference({id})
+            self.finais.discard(id)
 
     # Funções aprendidas na video aula mas nao utilizadas
     def move(self, cadeia):
@@ -79,6 +103,128 @@ class AFD:
                 break
         return self.__estadoAtual
 
+    # Aceitação sem estado interno (não depende de limpaAfd/move)
+    def aceita(self, cadeia):
+        transicoes = self.transicoes
+        estado = self.incial
+        for simbolo in cadeia:
+            estado = transicoes.get((estado, simbolo))
+            if estado is None:
+                return False
+        return estado in self.finais
+
+    def aceita_lote(self, cadeias, estados_finais=False):
+        """
+        Testa várias cadeias de uma vez sobre a tabela densa do AFD.
+        Com NumPy, todas as cadeias avançam juntas (um gather por posição) e
+        o resultado é um array booleano; sem NumPy, é uma lista de bool.
+        Com estados_finais=True retorna também o estado em que cada cadeia
+        parou (None se alguma transição faltou).
+        """
+        tab = self.tabela()
+        cadeias = list(cadeias)
+        if np is not None and all(len(simbolo) == 1 for simbolo in tab.simbolos):
+            ids = _simular_lote_numpy(tab, cadeias)
+            finais = np.zeros(tab.n + 1, dtype=bool)
+            for q in range(tab.n):
+                finais[q] = tab.eh_final(q)
+            aceitos = finais[ids]
+            ids = ids.tolist()
+            morto = tab.n
+        else:
+            ids = [_simular(tab, cadeia) for cadeia in cadeias]
+            aceitos = [q >= 0 and tab.eh_final(q) for q in ids]
+            morto = -1
+        if not estados_finais:
+            return aceitos
+        nomes = tab.nomes
+        return aceitos, [None if q == morto else nomes[q] for q in ids]
+
+    def aceita_fluxo(self, fonte, tamanho_bloco=1 << 16, codificacao='utf-8'):
+        """
+        Testa cada linha de uma entrada grande como uma cadeia, sem carregá-la
+        inteira na memória. fonte pode ser um arquivo (texto ou binário), um
+        mmap, bytes/str ou um iterável de blocos. O estado atual atravessa as
+        fronteiras entre blocos.
+
+        Gera (numero_linha, deslocamento, aceita), onde deslocamento é a
+        posição do início da linha: em bytes para fontes binárias quando o
+        alfabeto é ASCII (ou tem só códigos < 256 e a codificação é latin-1),
+        em caracteres nos demais casos. Símbolos fora do
+        alfabeto apenas rejeitam a linha; '\r' fora do alfabeto é ignorado.
+        """
+        tab = self.tabela()
+        coluna, delta, k, inicial = tab.coluna, tab.delta, tab.k, tab.inicial
+        # '\r' só é ignorado (fim de linha CRLF) se não é símbolo do
+        # alfabeto; se é, mesmo sem transição, rejeita a linha como os demais
+        ignora_cr = '\r' not in self.alfabeto and '\r' not in coluna
+        limite = 256 if codecs.lookup(codificacao).name == 'iso8859-1' else 128
+        por_bytes = (all(len(simbolo) == 1 and ord(simbolo) < limite for simbolo in tab.simbolos)
+                     and len(tab.classes_colunas()[1]) + 2 <= 256)
+        decodificador = None
+        if por_bytes:
+            # Fontes binárias: um bytes.translate troca cada byte pela classe
+            # do seu símbolo e o laço anda numa tabela por classes, com os
+            # estados já multiplicados pela largura da linha. A coluna m
+            # (fora do alfabeto) leva ao morto e a m + 1 ('\r') não sai do lugar
+            classes, _ = tab.por_classes()
+            m = classes.k
+            largura = m + 2
+            tradutor = tab.tradutor_bytes(m, {ord('\r'): m + 1} if ignora_cr else None)
+            morto = tab.n * largura
+            linhas = [morto] * (morto + largura)    # lista: indexar é mais rápido que array
+            for q in range(tab.n + 1):
+                base = q * largura
+                if q < tab.n:
+                    for j, d in enumerate(classes.delta[q * m:(q + 1) * m]):
+                        if d >= 0:
+                            linhas[base + j] = d * largura
+                linhas[base + m + 1] = base
+
+        linha = 0
+        inicio = 0      # deslocamento do começo da linha atual
+        pos = 0         # deslocamento do começo do bloco atual
+        q = inicial
+        for bloco in _blocos(fonte, tamanho_bloco):
+            binario = not isinstance(bloco, str)
+            if binario and por_bytes:
+                # Bytes sem símbolo viram a coluna fora do alfabeto
+                partes = bytes(bloco).split(b'\n')
+            else:
+                if binario:
+                    if decodificador is None:
+                        decodificador = codecs.getincrementaldecoder(codificacao)()
+                    bloco = decodificador.decode(bloco)
+                partes = bloco.split('\n')
+            for i, parte in enumerate(partes):
+                if i > 0:
+                    # Fim de linha: reporta e recomeça do estado inicial
+                    yield linha, inicio, q >= 0 and tab.eh_final(q)
+                    pos += 1
+                    linha += 1
+                    inicio = pos
+                    q = inicial
+                if binario and por_bytes:
+                    r = morto if q < 0 else q * largura
+                    for c in parte.translate(tradutor):
+                        r = linhas[r + c]
+                    q = -1 if r == morto else r // largura
+                else:
+                    for simbolo in parte:
+                        if q < 0:
+                            break
+                        c = coluna.get(simbolo)
+                        if c is not None:
+                            q = delta[q * k + c]
+                        elif not (ignora_cr and simbolo == '\r'):
+                            q = -1
+                pos += len(parte)
+        if decodificador is not None:
+            decodificador.decode(b'', final=True)
+        # Última linha sem '\n' no final
+        if pos > inicio:
+            yield linha, inicio, q >= 0 and tab.eh_final(q)
+
     # Funções aprendidas na video aula mas nao utilizadas
     def deuErro(self):
         return self.__deuErro
@@ -121,245 +267,297 @@ class AFD:
 
     # ===== SUPORTE AFD EM JFLAP =====
 
-    def carregar_afd_de_jflap(caminho_arquivo):
-        tree = ET.parse(caminho_arquivo)
-        root = tree.getroot()
-        automato = root.find('automaton')
-
-        estados = {}
-        alfabeto = set()
-        transicoes_temp = []
-
-        inicial = None
-        finais = set()
-
-        # 1) Ler os estados
-        for state in automato.findall('state'):
-            id_xml = state.get('id')  # atributo id do XML (string)
-            nome = state.get('name')  # nome legível do estado
-            estados[id_xml] = nome  # mapeia id → nome
-
-            if state.find('initial') is not None:
-                inicial = nome              # marca estado inicial
-            if state.find('final') is not None:
-                finais.add(nome)           # adiciona a estados finais
-
-        if inicial is None:
+    @instrumentacao.medido('jflap.leitura')
+    def carregar_afd_de_jflap(caminho_arquivo, compacto=False):
+        # Leitura em fluxo (iterparse): monta a tabela densa direto do XML.
+        # Com compacto=True retorna um AFDCompacto apoiado nessa tabela.
+        lido = _ler_jflap(caminho_arquivo)
+        if lido is None:
             return None
-
-
-        # 2) Ler transições
-        for trans in automato.findall('transition'):
-            origem_id = trans.find('from').text  # id numérico do estado de origem
-            destino_id = trans.find('to').text  # id numérico do estado de destino
-            simbolo = trans.find('read').text or ""  # símbolo lido (pode ser vazio)
-
-            origem = estados[origem_id]  # converte id → nome
-            destino = estados[destino_id]  # converte id → nome
-            alfabeto.add(simbolo)  # coleta todos os símbolos usados
-            transicoes_temp.append((origem, simbolo, destino))
-
-        # 3) Criar o objeto AFD
-        afd = AFD(alfabeto)         # inicializa com o alfabeto extraído
-        for id_estado in estados.values():
-            afd.estados.add(id_estado)          # adiciona cada estado
-        afd.incial = inicial  # define o inicial
-        afd.finais = finais  # define o conjunto de finais
-
-        # 4) Adicionar transições (já validadas)
-        for origem, simbolo, destino in transicoes_temp:
-            afd.criaTransicao(origem, destino, simbolo)
-
-        return afd
-
-    def salvar_afd_em_jflap(afd, caminho_arquivo):
-        estrutura = ET.Element('structure')
-        tipo = ET.SubElement(estrutura, 'type')
-        tipo.text = 'fa'
-        automato = ET.SubElement(estrutura, 'automaton')
-
-        # Mapeia cada nome de estado para um ID numérico (string)
-        id_map = {estado: str(i) for i, estado in enumerate(sorted(afd.estados))}
-
-
-        for estado in afd.estados:
-            state_el = ET.SubElement(automato, 'state', id=id_map[estado], name=str(estado))
-            if estado == afd.incial:
-                ET.SubElement(state_el, 'initial')
-            if estado in afd.finais:
-                ET.SubElement(state_el, 'final')
-
-        for (origem, simbolo), destino in afd.transicoes.items():
-            trans_el = ET.SubElement(automato, 'transition')
-            ET.SubElement(trans_el, 'from').text = id_map[origem]
-            ET.SubElement(trans_el, 'to').text = id_map[destino]
-            ET.SubElement(trans_el, 'read').text = simbolo
-
-        tree = ET.ElementTree(estrutura)
-        tree.write(caminho_arquivo, encoding='utf-8', xml_declaration=True)
+        tab, alfabeto = lido
+        if compacto:
+            return AFDCompacto(tab, alfabeto)
+        return tab.para_afd(alfabeto)
+
+    @instrumentacao.medido('jflap.escrita')
+    def salvar_afd_em_jflap(afd, caminho_arquivo, comprimir=None):
+        # Escrita em fluxo: cada estado e transição vira uma linha de XML
+        # gravada direto no arquivo, usando os ids inteiros da tabela densa.
+        # comprimir=None grava em gzip quando o caminho termina em '.gz'.
+        if comprimir is None:
+            comprimir = str(caminho_arquivo).endswith('.gz')
+        tab = afd.tabela()
+        if comprimir:
+            arquivo = gzip.open(caminho_arquivo, 'wt', encoding='utf-8')
+        else:
+            arquivo = open(caminho_arquivo, 'w', encoding='utf-8', buffering=1 << 20)
+        with arquivo:
+            _escrever_jflap(tab, arquivo)
+
+    # ===== Representação compacta =====
+    def tabela(self):
+        # Tabela densa (estados inteiros) equivalente a este AFD
+        return TabelaAFD.de_afd(self)
+
+    def compactar(self):
+        return AFDCompacto(self.tabela(), self.alfabeto)
+
+    def impressao_digital(self):
+        # Hash estrutural, independente dos nomes dos estados: só a parte
+        # alcançável a partir de incial, em ordem de busca em largura
+        return self.tabela().impressao_digital()
+
+    # ===== Formato binário =====
+    def salvar_binario(self, caminho_arquivo):
+        # Grava a tabela densa no formato binário (ver TabelaAFD.escrever)
+        with open(caminho_arquivo, 'wb') as arquivo:
+            self.tabela().escrever(arquivo)
+
+    @staticmethod
+    def abrir_binario(caminho_arquivo):
+        # Abre o arquivo com mmap: as transições e os finais são lidos direto
+        # das páginas do arquivo, que são compartilhadas entre processos
+        with open(caminho_arquivo, 'rb') as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        return AFDCompacto(TabelaAFD.de_buffer(mapa))
 
     # ===== Funções de manipulação do AFD =====
+    def aparar(self):
+        """
+        Remove os estados inalcançáveis a partir de incial e os mortos (que
+        não alcançam nenhum final), com uma busca a partir de incial e outra
+        a partir dos finais sobre as transições invertidas, em O(n·k). O
+        inicial fica mesmo se for morto. Retorna o AFD aparado e um
+        relatório com quantos estados foram removidos.
+        """
+        aparada, relatorio = _aparar_com_relatorio(self.tabela())
+        if isinstance(self, AFDCompacto):
+            return AFDCompacto(aparada, self.alfabeto), relatorio
+        return aparada.para_afd(self.alfabeto), relatorio
+
+    @instrumentacao.medido('minimizar_hopcroft')
     def minimizar_hopcroft(self):
         """
         Minimização de AFD pelo algoritmo de Hopcroft.
         Se já estiver minimizado, exibe mensagem e retorna o próprio AFD.
+
+        Antes, os estados inalcançáveis e os mortos são removidos (ver
+        aparar), para não participarem do refinamento. O refinamento é
+        feito por _refinar_particao sobre a tabela densa do AFD, em
+        O(n·k·log n). Transições ausentes vão para um estado morto
+        implícito, que não aparece no AFD resultante.
         """
-        # Estado completo: garante que para cada estado e símbolo haja transição (pode levar a None)
-        # Partições iniciais: finais e não-finais
-        Q = set(self.estados)
-        F = set(self.finais)
-        P = [F, Q - F]
-        # Remover partições vazias
-        P = [block for block in P if block]
-        # Worklist
-        W = [block.copy() for block in P]
-
-        while W:
-            A = W.pop()
-            for c in self.alfabeto:
-                # Conjunto de estados que vão para A pelo símbolo c
-                X = {q for q in Q if self.transicoes.get((q, c)) in A}
-                new_P = []
-                for Y in P:
-                    inter = Y & X
-                    diff = Y - X
-                    if inter and diff:
-                        new_P.append(inter)
-                        new_P.append(diff)
-                        # Atualizar worklist
-                        if Y in W:
-                            W.remove(Y)
-                            W.append(inter)
-                            W.append(diff)
-                        else:
-                            # adiciona menor bloco primeiro
-                            W.append(inter if len(inter) <= len(diff) else diff)
-                    else:
-                        new_P.append(Y)
-                P = new_P
-
-        # Se cada estado está em seu próprio bloco, já está minimizado
-        if len(P) == len(Q):
+        with instrumentacao.fase('minimizar.tabela'):
+            tab = self.tabela()
+        with instrumentacao.fase('minimizar.aparagem'):
+            aparada, inalcancaveis, mortos = _aparar_tabela(tab)
+        if inalcancaveis or mortos:
+            print(f"ℹ️ Removidos {inalcancaveis} estado(s) inalcançável(is) e {mortos} morto(s).")
+        with instrumentacao.fase('minimizar.refinamento'):
+            minima = _minimizar_tabela(aparada, aparar=False)
+        if minima is None and aparada is not tab:
+            minima = aparada
+        instrumentacao.contar('minimizar.estados_entrada', tab.n)
+        instrumentacao.contar('minimizar.estados_saida', tab.n if minima is None else minima.n)
+        instrumentacao.fotografar('minimizar_hopcroft')
+        if minima is None:
             print("✅ O AFD já está minimizado pelo critério de Hopcroft.")
             return self
-
-        # Construir novo AFD minimizado
-        novo = AFD(self.alfabeto)
-        # Mapear cada bloco a um representante de nome
-        bloco_map = {}
-        for i, block in enumerate(P):
-            nome_bloco = f'q{i}'
-            bloco_map[frozenset(block)] = nome_bloco
-            novo.estados.add(nome_bloco)
-            if self.incial in block:
-                novo.incial = nome_bloco
-            if block & F:
-                novo.finais.add(nome_bloco)
-
-        # Criar transições
-        for block in P:
-            rep = next(iter(block))
-            origem = bloco_map[frozenset(block)]
-            for c in self.alfabeto:
-                dst = self.transicoes.get((rep, c))
-                if dst is not None:
-                    # encontrar bloco de destino
-                    for b in P:
-                        if dst in b:
-                            destino = bloco_map[frozenset(b)]
-                            novo.transicoes[(origem, c)] = destino
-                            break
         print("✅ AFD minimizado com sucesso pelo algoritmo de Hopcroft.")
-        return novo
+        with instrumentacao.fase('minimizar.construcao'):
+            return minima.para_afd(self.alfabeto)
 
 
     # ===== Teste de equivalência entre dois AFDs =====
     def testar_equivalencia(self, afd1, afd2):
-        # Unifica o alfabeto
-        sigma = set(afd1.alfabeto) | set(afd2.alfabeto)
-        visited = set()
-        queue = deque()
-
-        # Estado inicial do par
-        queue.append((afd1.incial, afd2.incial))
-        visited.add((afd1.incial, afd2.incial))
+        return self.contraexemplo_equivalencia(afd1, afd2) is None
 
-        while queue:
-            q1, q2 = queue.popleft()
+    @instrumentacao.medido('equivalencia')
+    def contraexemplo_equivalencia(self, afd1, afd2):
+        """
+        Menor cadeia aceita por exatamente um dos AFDs, ou None se forem
+        equivalentes. Usa o algoritmo de Hopcroft–Karp: em vez de guardar
+        todos os pares visitados, une os estados de cada par num union-find
+        e só explora pares cujos estados ainda estão em classes diferentes
+        (no máximo n1 + n2 pares). A busca é em largura, então o primeiro
+        par com aceitação diferente dá o menor contraexemplo.
+        """
+        t1, t2 = afd1.tabela(), afd2.tabela()
+        simbolos = sorted(set(t1.simbolos) | set(t2.simbolos))
+        # Símbolos que se comportam igual nos dois AFDs dão os mesmos pares:
+        # basta o primeiro de cada classe
+        _, representantes = _classes_conjuntas([t1, t2], simbolos)
+        simbolos = [simbolos[c] for c in representantes]
+        colunas1 = [t1.coluna.get(simbolo, -1) for simbolo in simbolos]
+        colunas2 = [t2.coluna.get(simbolo, -1) for simbolo in simbolos]
+
+        # Estados de afd1: 0..n1 (n1 é o morto); de afd2: base2..base2+n2
+        morto1 = t1.n
+        base2 = t1.n + 1
+        morto2 = base2 + t2.n
+        pai = list(range(morto2 + 1))
+        tamanho = [1] * (morto2 + 1)
+
+        def raiz(x):
+            while pai[x] != x:
+                pai[x] = pai[pai[x]]
+                x = pai[x]
+            return x
+
+        def final(x):
+            if x < base2:
+                return x != morto1 and t1.eh_final(x)
+            return x != morto2 and t2.eh_final(x - base2)
+
+        inicio = (t1.inicial if t1.inicial >= 0 else morto1,
+                  base2 + t2.inicial if t2.inicial >= 0 else morto2)
+        pai[inicio[0]] = inicio[1]
+        tamanho[inicio[1]] += 1
+        # Pares explorados, com o par e o símbolo de onde vieram
+        pares = [inicio]
+        anterior = [-1]
+        simbolo_lido = [None]
+        fila = deque([0])
+
+        while fila:
+            i = fila.popleft()
+            q1, q2 = pares[i]
             # Verifica discrepância de aceitação
-            in1 = q1 in afd1.finais
-            in2 = q2 in afd2.finais
-            if in1 != in2:
-                return False
+            if final(q1) != final(q2):
+                instrumentacao.contar('equivalencia.pares_visitados', i + 1)
+                instrumentacao.contar('equivalencia.pares_agendados', len(pares))
+                cadeia = []
+                while i > 0:
+                    cadeia.append(simbolo_lido[i])
+                    i = anterior[i]
+                return ''.join(reversed(cadeia))
             # Explora próxima transição para cada símbolo
-            for a in sigma:
-                next1 = afd1.transicoes.get((q1, a))
-                next2 = afd2.transicoes.get((q2, a))
-                # Se ambos levam ao estado "morto" (None), continua
-                if next1 is None and next2 is None:
+            for c, simbolo in enumerate(simbolos):
+                c1, c2 = colunas1[c], colunas2[c]
+                d1 = t1.delta[q1 * t1.k + c1] if q1 != morto1 and c1 >= 0 else -1
+                d2 = t2.delta[(q2 - base2) * t2.k + c2] if q2 != morto2 and c2 >= 0 else -1
+                d1 = morto1 if d1 < 0 else d1
+                d2 = morto2 if d2 < 0 else base2 + d2
+                r1, r2 = raiz(d1), raiz(d2)
+                if r1 == r2:
                     continue
-                pair = (next1, next2)
-                if pair not in visited:
-                    visited.add(pair)
-                    queue.append(pair)
-        return True
+                # Une as classes (a menor entra na maior) e agenda o par
+                if tamanho[r1] > tamanho[r2]:
+                    r1, r2 = r2, r1
+                pai[r1] = r2
+                tamanho[r2] += tamanho[r1]
+                pares.append((d1, d2))
+                anterior.append(i)
+                simbolo_lido.append(simbolo)
+                fila.append(len(pares) - 1)
+        instrumentacao.contar('equivalencia.pares_visitados', len(pares))
+        instrumentacao.contar('equivalencia.pares_agendados', len(pares))
+        return None
+
+    @instrumentacao.medido('classes_equivalencia')
+    def classes_equivalencia(self):
+        # Classes de estados equivalentes (com dois ou mais estados), pelo
+        # mesmo refinamento de partições usado em minimizar_hopcroft
+        tab = self.tabela()
+        bloco = _blocos_equivalencia(tab)
+        classes = {}
+        for q in range(tab.n):
+            classes.setdefault(bloco[q], []).append(tab.nomes[q])
+        return sorted(sorted(classe) for classe in classes.values() if len(classe) > 1)
 
     def estados_equivalentes(self):
+        # Pares (p, q) de estados equivalentes, gerados sob demanda
+        for classe in self.classes_equivalencia():
+            yield from combinations(classe, 2)
+
+    # ===== Problemas de decisão =====
+    # Buscas sobre o produto sob demanda: só as tuplas visitadas são criadas
+    # e a busca para no primeiro estado final, devolvendo a menor cadeia
+    # que chega nele (a testemunha).
+
+    def exemplo_aceito(self):
+        # Menor cadeia aceita, ou None se a linguagem é vazia
+        return ProdutoPreguicoso([self.tabela()], all).testemunha()
+
+    def vazio(self):
+        return self.exemplo_aceito() is None
+
+    @instrumentacao.medido('inclusao')
+    def contraexemplo_inclusao(self, afd1, afd2):
+        # Menor cadeia aceita por afd1 e rejeitada por afd2, ou None se
+        # L(afd1) ⊆ L(afd2)
+        produto = ProdutoPreguicoso([afd1.tabela(), afd2.tabela()],
+                                    lambda finais: finais[0] and not finais[1])
+        return produto.testemunha()
+
+    def contido(self, afd1, afd2):
+        return self.contraexemplo_inclusao(afd1, afd2) is None
+
+    @instrumentacao.medido('disjuncao')
+    def palavra_comum(self, afd1, afd2):
+        # Menor cadeia aceita pelos dois AFDs, ou None se forem disjuntos
+        return ProdutoPreguicoso([afd1.tabela(), afd2.tabela()], all).testemunha()
+
+    def disjuntos(self, afd1, afd2):
+        return self.palavra_comum(afd1, afd2) is None
+
+    def finito(self):
+        # A linguagem é infinita se, e só se, há um ciclo entre os estados
+        # úteis (alcançáveis a partir do inicial e que alcançam um final)
+        tab = self.tabela()
+        return not _tem_ciclo(tab, _estados_uteis(tab))
+
+    def contar_palavras(self, n, por_tamanho=False):
+        """
+        Quantas cadeias de tamanho até n o AFD aceita. Com por_tamanho=True,
+        retorna a lista com a quantidade de cada tamanho 0..n.
 
-        # Refina partições até estabilizar para identificar classes de equivalência
-        estados = sorted(self.estados)
-        alfabeto = list(self.alfabeto)
-
-        # Partição inicial: finais x não-finais
-        blocos = [set(self.finais), set(estados) - set(self.finais)]
-        mudou = True
-        while mudou:
-            mudou = False
-            novos_blocos = []
-            for bloco in blocos:
-                # Agrupa estados por assinatura de transições
-                assinatura_map = {}
-                for q in bloco:
-                    assinatura = []
-                    for a in alfabeto:
-                        destino = self.transicoes.get((q, a))
-                        # Identifica índice do bloco do estado destino
-                        idx = None
-                        for i, b in enumerate(blocos):
-                            if destino in b:
-                                idx = i
-                                break
-                        assinatura.append(idx)
-                    assinatura = tuple(assinatura)
-                    assinatura_map.setdefault(assinatura, set()).add(q)
-
-                # Sebloco precisar ser dividido
-                if len(assinatura_map) > 1:
-                    mudou = True
-                novos_blocos.extend(assinatura_map.values())
-
-            blocos = novos_blocos
-
-        # Coleta pares de estados equivalentes em cada bloco com tamanho >= 2
-        equivalentes = []
-        for bloco in blocos:
-            if len(bloco) > 1:
-                for p, q in combinations(sorted(bloco), 2):
-                    equivalentes.append((p, q))
-        return equivalentes
+        Programação dinâmica sobre a tabela: a cada passo, quantas cadeias
+        chegam em cada estado útil. Custa O(n·transições úteis), com os
+        inteiros exatos do Python, e para cedo se a linguagem for finita.
+        """
+        contagens = _contar_por_tamanho(self.tabela(), n)
+        return contagens if por_tamanho else sum(contagens)
 
 
 
     def copiar(afd):
-        return deepcopy(afd)
+        # Cópia em O(1): original e cópia passam a ler dos mesmos dados e
+        # cada um guarda só as próprias alterações (copy-on-write)
+        copia = object.__new__(type(afd))
+        copia.__dict__.update(afd.__dict__)
+        afd.estados, copia.estados = _compartilhar(afd.estados, _ConjuntoCOW, set)
+        afd.transicoes, copia.transicoes = _compartilhar(afd.transicoes, _MapaCOW, dict)
+        afd.finais, copia.finais = _compartilhar(afd.finais, _ConjuntoCOW, set)
+        return copia
 
     def completar_afd(self, afd):
-        from copy import deepcopy
-        comp = deepcopy(afd)
+        # Sobre uma cópia copy-on-write: só o estado morto e as transições
+        # que levam a ele são guardados à parte
+        comp = afd.copiar()
 
         # Reconstrói sigma apenas com os símbolos que realmente aparecem nas transições
         sigma = {simbolo for (_, simbolo) in comp.transicoes.keys()}
 
+        # Estados alcançáveis a partir do inicial; os demais são removidos,
+        # para que as transições que faltam neles não criem o estado morto
+        alcancaveis = set()
+        if comp.incial in comp.estados:
+            alcancaveis.add(comp.incial)
+            pilha = [comp.incial]
+            while pilha:
+                estado = pilha.pop()
+                for simbolo in sigma:
+                    destino = comp.transicoes.get((estado, simbolo))
+                    if destino is not None and destino not in alcancaveis:
+                        alcancaveis.add(destino)
+                        pilha.append(destino)
+        for estado in [e for e in comp.estados if e not in alcancaveis]:
+            comp.estados.discard(estado)
+            comp.finais.discard(estado)
+            for simbolo in sigma:
+                comp.transicoes.pop((estado, simbolo), None)
+
         # Detectar transições faltantes sobre sigma
         faltantes = []
         for estado in comp.estados:
@@ -384,36 +582,33 @@ class AFD:
 
 
 
-    def produto_afds(self, afd1, afd2, criterio_final):
-        # criterio_final: função que recebe (f1, f2) e diz se (q1,q2) é final
-        afd1 = self.completar_afd(afd1)
-        afd2 = self.completar_afd(afd2)
-
-        sigma = set(afd1.alfabeto) | set(afd2.alfabeto)
-        novo = AFD(sigma)
-        # criar estados produto
-        for q1 in afd1.estados:
-            for q2 in afd2.estados:
-                nome = f"({q1},{q2})"
-                is_final = criterio_final(q1 in afd1.finais, q2 in afd2.finais)
-                novo.estados.add(nome)
-                if afd1.incial == q1 and afd2.incial == q2:
-                    novo.incial = nome
-                if is_final:
-                    novo.finais.add(nome)
-        # transições
-        for q1 in afd1.estados:
-            for q2 in afd2.estados:
-                for a in sigma:
-                    t1 = afd1.transicoes.get((q1, a))
-                    t2 = afd2.transicoes.get((q2, a))
-                    dest = None
-                    if t1 is not None and t2 is not None:
-                        dest = f"({t1},{t2})"
-                    else:
-                        continue  # transições incompletas ignoradas
-                    novo.transicoes[(f"({q1},{q2})", a)] = dest
-        return novo
+    @instrumentacao.medido('produto_afds')
+    def produto_afds(self, afd1, afd2, criterio_final, preguicoso=False, relatorio=False):
+        # criterio_final: função que recebe (f1, f2) e diz se (q1,q2) é final.
+        # Só os pares alcançáveis a partir de (afd1.incial, afd2.incial) são
+        # criados; transição ausente leva a um estado morto implícito. Os
+        # AFDs e o resultado são aparados (ver aparar); com relatorio=True,
+        # retorna (resultado, relatório da aparagem), ver produto_varios.
+        return _produto([afd1, afd2], lambda finais: criterio_final(*finais),
+                        False, preguicoso, relatorio)
+
+    @instrumentacao.medido('produto_varios')
+    def produto_varios(self, afds, criterio_final, minimizar=False, preguicoso=False,
+                       relatorio=False):
+        # Produto de uma lista de AFDs numa única passada. criterio_final
+        # recebe uma tupla com um bool por AFD (ex.: any, all). Com
+        # minimizar=True, cada AFD é minimizado antes e o resultado depois.
+        # Sem minimizar, os AFDs e o resultado são só aparados. Com
+        # relatorio=True, retorna (resultado, relatório), onde o relatório
+        # tem o de aparar para cada AFD ('operandos') e para o produto
+        # ('produto', None se preguicoso).
+        return _produto(afds, criterio_final, minimizar, preguicoso, relatorio)
+
+    def uniao_varios(self, afds, minimizar=False):
+        return self.produto_varios(afds, any, minimizar)
+
+    def intersecao_varios(self, afds, minimizar=False):
+        return self.produto_varios(afds, all, minimizar)
 
     def complemento_afd(self, afd):
         comp = self.completar_afd(afd)
@@ -427,8 +622,1460 @@ class AFD:
         return self.produto_afds(afd1, afd2, lambda f1, f2: f1 and f2)
 
     def diferenca_afds(self, afd1, afd2):
-        comp2 = self.complemento_afd(afd2)
-        return self.intersecao_afds(afd1, comp2)
+        # Equivale à interseção com o complemento de afd2, sem construí-lo
+        return self.produto_afds(afd1, afd2, lambda f1, f2: f1 and not f2)
+
+
+# ===== Representação compacta (tabela densa) =====
+
+class TabelaAFD:
+    """
+    AFD em forma densa: estados numerados 0..n-1, símbolos numerados por
+    coluna, transições num array('i') de n*k posições (-1 = ausente) e
+    estados finais num bitset. Custa 4 bytes por transição, contra
+    centenas de bytes do dicionário de tuplas de strings.
+    """
+
+    def __init__(self, nomes, simbolos, delta, finais, inicial, indice=None):
+        self.nomes = nomes                  # id -> nome do estado
+        self.simbolos = tuple(simbolos)     # coluna -> símbolo
+        self.coluna = {simbolo: c for c, simbolo in enumerate(self.simbolos)}
+        self.n = len(nomes)
+        self.k = len(self.simbolos)
+        self.delta = delta                  # delta[q * k + c], -1 se ausente
+        self.finais = finais                # bit q ligado se q é final
+        self.inicial = inicial              # id do inicial, -1 se não houver
+        self._indice = indice
+        self._canonica = None
+        self._impressao = None
+        self._classes = None
+        self._percurso = None
+
+    @property
+    def indice(self):
+        # nome -> id, construído só quando alguém precisa
+        if self._indice is None:
+            self._indice = {nome: q for q, nome in enumerate(self.nomes)}
+        return self._indice
+
+    @staticmethod
+    def de_afd(afd):
+        nomes = sorted(afd.estados)
+        indice = {nome: q for q, nome in enumerate(nomes)}
+        simbolos = sorted({simbolo for (_, simbolo) in afd.transicoes.keys()})
+        coluna = {simbolo: c for c, simbolo in enumerate(simbolos)}
+        k = len(simbolos)
+
+        delta = array('i', [-1]) * (len(nomes) * k)
+        for (origem, simbolo), destino in afd.transicoes.items():
+            delta[indice[origem] * k + coluna[simbolo]] = indice[destino]
+
+        finais = bytearray((len(nomes) + 7) // 8)
+        for estado in afd.finais:
+            q = indice.get(estado)
+            if q is not None:
+                finais[q >> 3] |= 1 << (q & 7)
+
+        inicial = indice.get(afd.incial, -1)
+        return TabelaAFD(nomes, simbolos, delta, finais, inicial, indice)
 
+    def destino(self, q, c):
+        return self.delta[q * self.k + c]
 
+    def eh_final(self, q):
+        return bool(self.finais[q >> 3] & (1 << (q & 7)))
 
+    def com_inicial(self, inicial):
+        # Mesma tabela (arrays compartilhados) com outro estado inicial
+        tab = TabelaAFD(self.nomes, self.simbolos, self.delta, self.finais, inicial, self._indice)
+        tab._classes, tab._percurso = self._classes, self._percurso
+        return tab
+
+    def canonica(self):
+        """
+        Parte alcançável a partir do inicial, com os estados renumerados na
+        ordem da busca em largura (símbolos em ordem crescente). Dois AFDs
+        que só diferem nos nomes dos estados têm a mesma forma canônica,
+        a menos dos nomes.
+        """
+        if self._canonica is not None:
+            return self._canonica
+        ordem_colunas = sorted(range(self.k), key=self.simbolos.__getitem__)
+        simbolos = [self.simbolos[c] for c in ordem_colunas]
+        delta, k = self.delta, self.k
+        novo_delta = array('i')
+        ordem = [self.inicial] if self.inicial >= 0 else []
+        novo_id = {q: i for i, q in enumerate(ordem)}
+        for q in ordem:  # ordem cresce durante a busca
+            base = q * k
+            for c in ordem_colunas:
+                d = delta[base + c]
+                if d >= 0:
+                    i = novo_id.get(d)
+                    if i is None:
+                        i = novo_id[d] = len(ordem)
+                        ordem.append(d)
+                    d = i
+                novo_delta.append(d)
+        finais = bytearray((len(ordem) + 7) // 8)
+        for i, q in enumerate(ordem):
+            if self.eh_final(q):
+                finais[i >> 3] |= 1 << (i & 7)
+        nomes = [self.nomes[q] for q in ordem]
+        self._canonica = TabelaAFD(nomes, simbolos, novo_delta, finais, 0 if ordem else -1)
+        self._canonica._canonica = self._canonica
+        return self._canonica
+
+    def impressao_digital(self):
+        # Hash (blake2b) da forma canônica: símbolos, delta e finais, sem nomes
+        if self._impressao is None:
+            tab = self.canonica()
+            h = hashlib.blake2b(digest_size=16)
+            h.update(struct.pack('<II', tab.n, tab.k))
+            for simbolo in tab.simbolos:
+                texto = simbolo.encode('utf-8')
+                h.update(struct.pack('<I', len(texto)) + texto)
+            h.update(_little_endian(tab.delta))
+            h.update(bytes(tab.finais))
+            self._impressao = tab._impressao = h.hexdigest()
+        return self._impressao
+
+    def classes_colunas(self):
+        """
+        Classes de equivalência dos símbolos: dois símbolos ficam na mesma
+        classe se levam cada estado ao mesmo destino (colunas iguais em
+        delta). Retorna (classe, representantes): a classe de cada coluna e
+        a primeira coluna de cada classe. Calculado uma vez por tabela.
+        """
+        if self._classes is None:
+            k, delta = self.k, self.delta
+            ids = {}
+            classe = []
+            representantes = []
+            for c in range(k):
+                chave = hashlib.blake2b(delta[c::k].tobytes(), digest_size=16).digest()
+                j = ids.get(chave)
+                if j is None:
+                    j = ids[chave] = len(representantes)
+                    representantes.append(c)
+                classe.append(j)
+            self._classes = (classe, representantes)
+        return self._classes
+
+    def por_classes(self):
+        """
+        (tabela, classe): tabela com uma coluna por classe de símbolos, cujo
+        símbolo é o primeiro da classe, e a classe de cada coluna de self.
+        Sem classes com mais de um símbolo, a tabela é a própria self.
+        """
+        classe, representantes = self.classes_colunas()
+        m = len(representantes)
+        if m == self.k:
+            return self, classe
+        k = self.k
+        delta = array('i', [-1]) * (self.n * m)
+        for j, c in enumerate(representantes):
+            delta[j::m] = array('i', self.delta[c::k])
+        tab = TabelaAFD(self.nomes, [self.simbolos[c] for c in representantes],
+                        delta, self.finais, self.inicial, self._indice)
+        tab._classes = (list(range(m)), list(range(m)))
+        return tab, classe
+
+    def percurso(self):
+        """
+        (linhas, tradutor, colunas) para percorrer cadeias como em
+        compilador.py: str.translate(tradutor) leva cada símbolo ao número
+        da sua classe (fora do alfabeto: a última coluna) e
+        linhas[q * colunas + c] já é o destino vezes colunas; a linha n é o
+        estado morto. None se algum símbolo tiver mais de um caractere ou
+        as colunas não couberem num byte. Calculado uma vez por tabela.
+        """
+        if self._percurso is None:
+            classes, classe = self.por_classes()
+            n, m = self.n, classes.k
+            colunas = m + 1
+            if colunas > 256 or any(len(simbolo) != 1 for simbolo in self.simbolos):
+                self._percurso = False
+            else:
+                linhas = array('i', [n * colunas]) * ((n + 1) * colunas)
+                for q in range(n):
+                    base = q * colunas
+                    for j in range(m):
+                        d = classes.delta[q * m + j]
+                        if d >= 0:
+                            linhas[base + j] = d * colunas
+                tradutor = _Tradutor({ord(simbolo): chr(classe[c])
+                                      for c, simbolo in enumerate(self.simbolos)}, chr(m))
+                self._percurso = (linhas, tradutor, colunas)
+        return self._percurso or None
+
+    def tradutor_bytes(self, fora, extras=None):
+        """
+        Tabela de 256 bytes para bytes.translate: o byte de cada símbolo de
+        um caractere com código < 256 vira o número da sua classe; os demais
+        bytes viram fora, exceto os de extras (byte -> valor). Exige que
+        as classes e fora caibam num byte.
+        """
+        classe, _ = self.classes_colunas()
+        tabela = bytearray([fora]) * 256
+        for c, simbolo in enumerate(self.simbolos):
+            if len(simbolo) == 1 and ord(simbolo) < 256:
+                tabela[ord(simbolo)] = classe[c]
+        for byte, valor in (extras or {}).items():
+            tabela[byte] = valor
+        return bytes(tabela)
+
+    def num_transicoes(self):
+        return sum(1 for d in self.delta if d >= 0)
+
+    def memoria(self):
+        # Bytes ocupados pelas transições e pelo bitset de finais
+        return len(self.delta) * self.delta.itemsize + len(self.finais)
+
+    def escrever(self, arquivo):
+        """
+        Grava a tabela no formato binário, em little-endian:
+        cabeçalho, símbolos, nomes dos estados, delta (int32, n*k) e o
+        bitset de finais. Cada seção de nomes/símbolos é uma tabela de
+        deslocamentos (uint64) seguida dos textos em UTF-8.
+        """
+        def textos(lista):
+            codificados = [texto.encode('utf-8') for texto in lista]
+            deslocamentos = array('Q', [0])
+            for texto in codificados:
+                deslocamentos.append(deslocamentos[-1] + len(texto))
+            return _little_endian(deslocamentos) + b''.join(codificados)
+
+        simbolos = textos(self.simbolos)
+        nomes = textos(self.nomes)
+        pos_simbolos = _CABECALHO.size
+        pos_nomes = pos_simbolos + len(simbolos)
+        # delta alinhado a 4 bytes para poder ser lido como int32 sem cópia
+        pos_delta = (pos_nomes + len(nomes) + 3) & ~3
+        pos_finais = pos_delta + 4 * self.n * self.k
+        arquivo.write(_CABECALHO.pack(_MAGICO, 1, 0, self.n, self.k, self.inicial,
+                                      pos_simbolos, pos_nomes, pos_delta, pos_finais))
+        arquivo.write(simbolos)
+        arquivo.write(nomes)
+        arquivo.write(bytes(pos_delta - pos_nomes - len(nomes)))
+        delta = self.delta if isinstance(self.delta, array) else array('i', self.delta)
+        arquivo.write(_little_endian(delta))
+        arquivo.write(bytes(self.finais))
+
+    def para_bytes(self):
+        saida = io.BytesIO()
+        self.escrever(saida)
+        return saida.getvalue()
+
+    @staticmethod
+    def de_buffer(buffer):
+        # Lê o formato binário de bytes, mmap ou qualquer buffer. Em máquinas
+        # little-endian, delta e finais são visões (sem cópia) sobre o buffer.
+        visao = memoryview(buffer)
+        (magico, versao, _, n, k, inicial,
+         pos_simbolos, pos_nomes, pos_delta, pos_finais) = _CABECALHO.unpack_from(visao)
+        if magico != _MAGICO or versao != 1:
+            raise ValueError("Arquivo não está no formato binário de AFD.")
+        simbolos = list(_TextosBinarios(visao, pos_simbolos, k))
+        nomes = _TextosBinarios(visao, pos_nomes, n)
+        delta = visao[pos_delta:pos_delta + 4 * n * k]
+        if sys.byteorder == 'little':
+            delta = delta.cast('i')
+        else:
+            delta = array('i', bytes(delta))
+            delta.byteswap()
+        finais = visao[pos_finais:pos_finais + (n + 7) // 8]
+        return TabelaAFD(nomes, simbolos, delta, finais, inicial)
+
+    def para_afd(self, Alfabeto=None):
+        afd = AFD(''.join(self.simbolos) if Alfabeto is None else Alfabeto)
+        nomes, simbolos, delta, k = self.nomes, self.simbolos, self.delta, self.k
+        afd.estados.update(nomes)
+        for q in range(self.n):
+            base = q * k
+            for c in range(k):
+                d = delta[base + c]
+                if d >= 0:
+                    afd.transicoes[(nomes[q], simbolos[c])] = nomes[d]
+            if self.eh_final(q):
+                afd.finais.add(nomes[q])
+        if self.inicial >= 0:
+            afd.incial = nomes[self.inicial]
+        return afd
+
+
+class _Tradutor(dict):
+    # str.translate: símbolo fora do alfabeto vai para a coluna fora
+
+    def __init__(self, colunas, fora):
+        super().__init__(colunas)
+        self.fora = fora
+
+    def __missing__(self, codigo):
+        return self.fora
+
+
+class AFDCompacto(AFD):
+    """
+    AFD cujos dados ficam numa TabelaAFD. Os atributos estados, transicoes
+    e finais são sobreposições copy-on-write em cima de visões somente
+    leitura da tabela, então __str__, salvar_afd_em_jflap e as operações
+    da classe AFD funcionam sem mudança, e uma alteração guarda só a
+    diferença em vez de converter o AFD inteiro.
+    """
+
+    def __init__(self, tabela, Alfabeto=None):
+        AFD.__init__(self, ''.join(tabela.simbolos) if Alfabeto is None else Alfabeto)
+        self._tabela = tabela
+        self.estados = _ConjuntoCOW(_EstadosTabela(tabela))
+        self.transicoes = _MapaCOW(_TransicoesTabela(tabela))
+        self.finais = _ConjuntoCOW(_FinaisTabela(tabela))
+        self.incial = tabela.nomes[tabela.inicial] if tabela.inicial >= 0 else None
+
+    def __setattr__(self, nome, valor):
+        # Trocar um dos atributos vigiados invalida a tabela validada; as
+        # sobreposições copy-on-write avisam os donos a cada escrita
+        object.__setattr__(self, nome, valor)
+        if nome in _VIGIADOS:
+            self.__dict__['_validada'] = None
+            if isinstance(valor, (_ConjuntoCOW, _MapaCOW)):
+                valor._donos.append(self)
+
+    def _intacto(self):
+        # True se estados, transicoes e finais ainda são exatamente a tabela
+        tab = self._tabela
+        for valor in (self.estados, self.transicoes, self.finais):
+            if not isinstance(valor, (_ConjuntoCOW, _MapaCOW)) or valor.alterado():
+                return False
+            if getattr(valor.base, 'tab', None) is not tab:
+                return False
+        return True
+
+    def _validar(self):
+        # (tabela, percurso): a tabela (com o inicial atual) se o AFD ainda é
+        # a tabela original, senão False; o percurso de aceita é preparado na
+        # primeira chamada. Fica guardado em _validada até a próxima escrita
+        if not self._intacto():
+            tab = False
+        else:
+            tab = self._tabela
+            if tab.inicial < 0 or tab.nomes[tab.inicial] != self.incial:
+                inicial = tab.indice.get(self.incial, -1)
+                if inicial != tab.inicial:
+                    tab = tab.com_inicial(inicial)
+        validada = self.__dict__['_validada'] = (tab, None)
+        return validada
+
+    def tabela(self):
+        tab = (self._validada or self._validar())[0]
+        return AFD.tabela(self) if tab is False else tab
+
+    def compactar(self):
+        return AFDCompacto(self.tabela(), self.alfabeto)
+
+    def aceita(self, cadeia):
+        tab, rapido = self._validada or self._validar()
+        if rapido is None:
+            # (linhas, tradutor, linha inicial, colunas), ou False se a
+            # tabela não tem percurso (ver TabelaAFD.percurso)
+            percurso = tab is not False and tab.inicial >= 0 and tab.percurso()
+            if percurso:
+                linhas, tradutor, colunas = percurso
+                rapido = (linhas, tradutor, tab.inicial * colunas, colunas)
+            else:
+                rapido = False
+            self.__dict__['_validada'] = (tab, rapido)
+        if rapido and isinstance(cadeia, str):
+            linhas, tradutor, q, colunas = rapido
+            for c in cadeia.translate(tradutor).encode('latin-1'):
+                q = linhas[q + c]
+            q //= colunas
+            return q < tab.n and tab.eh_final(q)
+        if tab is False:
+            return AFD.aceita(self, cadeia)
+        q = _simular(tab, cadeia)
+        return q >= 0 and tab.eh_final(q)
+
+
+# ===== Visões somente leitura sobre a tabela =====
+
+class _EstadosTabela(Set):
+
+    def __init__(self, tab):
+        self.tab = tab
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+    def __contains__(self, estado):
+        return estado in self.tab.indice
+
+    def __iter__(self):
+        return iter(self.tab.nomes)
+
+    def __len__(self):
+        return self.tab.n
+
+
+class _FinaisTabela(Set):
+
+    def __init__(self, tab):
+        self.tab = tab
+        self._tamanho = None
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+    def __contains__(self, estado):
+        q = self.tab.indice.get(estado)
+        return q is not None and self.tab.eh_final(q)
+
+    def __iter__(self):
+        tab = self.tab
+        return (tab.nomes[q] for q in range(tab.n) if tab.eh_final(q))
+
+    def __len__(self):
+        if self._tamanho is None:
+            self._tamanho = sum(bin(byte).count('1') for byte in self.tab.finais)
+        return self._tamanho
+
+
+class _TransicoesTabela(Mapping):
+    # (origem, simbolo) -> destino, lido diretamente da tabela
+
+    def __init__(self, tab):
+        self.tab = tab
+        self._tamanho = None
+
+    def __getitem__(self, chave):
+        tab = self.tab
+        origem, simbolo = chave
+        q = tab.indice.get(origem)
+        c = tab.coluna.get(simbolo)
+        if q is None or c is None:
+            raise KeyError(chave)
+        d = tab.delta[q * tab.k + c]
+        if d < 0:
+            raise KeyError(chave)
+        return tab.nomes[d]
+
+    def __iter__(self):
+        tab = self.tab
+        return ((tab.nomes[i // tab.k], tab.simbolos[i % tab.k])
+                for i, d in enumerate(tab.delta) if d >= 0)
+
+    def __len__(self):
+        if self._tamanho is None:
+            self._tamanho = self.tab.num_transicoes()
+        return self._tamanho
+
+
+# ===== Copy-on-write =====
+
+# Acima desta profundidade de sobreposições, copiar() achata a cadeia
+_PROFUNDIDADE_MAXIMA = 8
+
+# Atributos do AFDCompacto que, trocados, invalidam a tabela validada
+_VIGIADOS = frozenset(('estados', 'transicoes', 'finais', 'incial'))
+
+
+def _invalidar(donos):
+    # Uma sobreposição foi escrita: os AFDs que a usam revalidam a tabela
+    for dono in donos:
+        dono.__dict__['_validada'] = None
+
+
+class _MapaCOW(MutableMapping):
+    """
+    Dicionário copy-on-write: lê de uma base compartilhada, que ninguém
+    mais altera, e guarda só as diferenças (chaves novas ou trocadas em
+    novos, chaves apagadas em removidos).
+    """
+
+    __slots__ = ('base', 'novos', 'removidos', 'profundidade', '_extra', '_donos')
+
+    def __init__(self, base, profundidade=0):
+        self.base = base
+        self.novos = {}
+        self.removidos = set()
+        self.profundidade = profundidade
+        self._extra = 0           # len(self) - len(base)
+        self._donos = []          # AFDCompacto avisados a cada escrita
+
+    def alterado(self):
+        return bool(self.novos or self.removidos)
+
+    def __contains__(self, chave):
+        if chave in self.novos:
+            return True
+        return chave not in self.removidos and chave in self.base
+
+    def __getitem__(self, chave):
+        try:
+            return self.novos[chave]
+        except KeyError:
+            pass
+        if chave in self.removidos:
+            raise KeyError(chave)
+        return self.base[chave]
+
+    def get(self, chave, padrao=None):
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+    def __iter__(self):
+        novos, removidos = self.novos, self.removidos
+        yield from novos
+        for chave in self.base:
+            if chave not in novos and chave not in removidos:
+                yield chave
+
+    def __len__(self):
+        return len(self.base) + self._extra
+
+    def __setitem__(self, chave, valor):
+        if chave not in self:
+            self._extra += 1
+        self.removidos.discard(chave)
+        self.novos[chave] = valor
+        _invalidar(self._donos)
+
+    def __delitem__(self, chave):
+        if chave not in self:
+            raise KeyError(chave)
+        self.novos.pop(chave, None)
+        if chave in self.base:
+            self.removidos.add(chave)
+        self._extra -= 1
+        _invalidar(self._donos)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    # Métodos de dict que MutableMapping não tem: o AFD copiado (original e
+    # cópia) mantém a interface de dict
+    def copy(self):
+        return dict(self)
+
+    def __or__(self, outro):
+        if not isinstance(outro, Mapping):
+            return NotImplemented
+        resultado = dict(self)
+        resultado.update(outro)
+        return resultado
+
+    def __ror__(self, outro):
+        if not isinstance(outro, Mapping):
+            return NotImplemented
+        resultado = dict(outro)
+        resultado.update(self)
+        return resultado
+
+    def __ior__(self, outro):
+        self.update(outro)
+        return self
+
+
+class _ConjuntoCOW(MutableSet):
+    # Conjunto copy-on-write, com a mesma ideia de _MapaCOW
+
+    __slots__ = ('base', 'novos', 'removidos', 'profundidade', '_extra', '_donos')
+
+    def __init__(self, base, profundidade=0):
+        self.base = base
+        self.novos = set()
+        self.removidos = set()
+        self.profundidade = profundidade
+        self._extra = 0
+        self._donos = []
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+    def alterado(self):
+        return bool(self.novos or self.removidos)
+
+    def __contains__(self, valor):
+        if valor in self.novos:
+            return True
+        return valor not in self.removidos and valor in self.base
+
+    def __iter__(self):
+        novos, removidos = self.novos, self.removidos
+        yield from novos
+        for valor in self.base:
+            if valor not in novos and valor not in removidos:
+                yield valor
+
+    def __len__(self):
+        return len(self.base) + self._extra
+
+    def add(self, valor):
+        if valor in self:
+            return
+        self._extra += 1
+        self.removidos.discard(valor)
+        if valor not in self.base:
+            self.novos.add(valor)
+        _invalidar(self._donos)
+
+    def discard(self, valor):
+        if valor not in self:
+            return
+        self._extra -= 1
+        self.novos.discard(valor)
+        if valor in self.base:
+            self.removidos.add(valor)
+        _invalidar(self._donos)
+
+    def __repr__(self):
+        return repr(set(self))
+
+    # Métodos nomeados de set (os operadores |, &, -, ^ e comparações vêm de
+    # Set/MutableSet): o AFD copiado mantém a interface de set
+    def copy(self):
+        return set(self)
+
+    def union(self, *outros):
+        return set(self).union(*outros)
+
+    def intersection(self, *outros):
+        return set(self).intersection(*outros)
+
+    def difference(self, *outros):
+        return set(self).difference(*outros)
+
+    def symmetric_difference(self, outro):
+        return set(self).symmetric_difference(outro)
+
+    def issubset(self, outro):
+        return set(self).issubset(outro)
+
+    def issuperset(self, outro):
+        return set(self).issuperset(outro)
+
+    def update(self, *outros):
+        for outro in outros:
+            for valor in outro:
+                self.add(valor)
+
+    def difference_update(self, *outros):
+        for outro in outros:
+            for valor in set(outro):
+                self.discard(valor)
+
+    def intersection_update(self, *outros):
+        manter = set(self).intersection(*outros)
+        for valor in [v for v in self if v not in manter]:
+            self.discard(valor)
+
+    def symmetric_difference_update(self, outro):
+        for valor in set(outro):
+            if valor in self:
+                self.discard(valor)
+            else:
+                self.add(valor)
+
+
+def _compartilhar(valor, tipo, plano):
+    """
+    Devolve duas sobreposições novas sobre uma mesma base: uma para o AFD
+    original e outra para a cópia. Uma sobreposição sem alterações
+    compartilha a própria base; com alterações, ela mesma vira a base
+    (e não é mais escrita por ninguém). Cadeias fundas demais são achatadas
+    com plano (dict ou set), que custa O(n) uma única vez.
+    """
+    if isinstance(valor, tipo):
+        if not valor.alterado():
+            base, profundidade = valor.base, valor.profundidade
+        elif valor.profundidade < _PROFUNDIDADE_MAXIMA:
+            base, profundidade = valor, valor.profundidade + 1
+        else:
+            base, profundidade = plano(valor), 0
+    else:
+        base, profundidade = valor, 0
+    return tipo(base, profundidade), tipo(base, profundidade)
+
+
+# ===== Formato binário =====
+
+# magico, versão, reservado, n, k, inicial e as posições de cada seção
+_CABECALHO = struct.Struct('<4sHHIIiQQQQ')
+_MAGICO = b'AFDB'
+
+
+def _little_endian(arr):
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+class _TextosBinarios(Sequence):
+    # Lista de textos lida sob demanda de uma seção do formato binário
+
+    def __init__(self, visao, posicao, quantidade):
+        self._visao = visao
+        self._quantidade = quantidade
+        fim_tabela = posicao + 8 * (quantidade + 1)
+        self._deslocamentos = visao[posicao:fim_tabela]
+        if sys.byteorder == 'little':
+            self._deslocamentos = self._deslocamentos.cast('Q')
+        else:
+            self._deslocamentos = array('Q', bytes(self._deslocamentos))
+            self._deslocamentos.byteswap()
+        self._inicio_textos = fim_tabela
+
+    def __len__(self):
+        return self._quantidade
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._quantidade))]
+        if i < 0:
+            i += self._quantidade
+        if not 0 <= i < self._quantidade:
+            raise IndexError(i)
+        inicio = self._inicio_textos + self._deslocamentos[i]
+        fim = self._inicio_textos + self._deslocamentos[i + 1]
+        return str(self._visao[inicio:fim], 'utf-8')
+
+
+# ===== Leitura de arquivos JFLAP =====
+
+def _ler_jflap(caminho_arquivo):
+    """
+    Lê um .jff com iterparse, liberando cada <state>/<transition> logo após
+    processá-lo; tags de layout (<x>, <y>, <label>) são ignoradas. Retorna
+    (TabelaAFD, alfabeto) ou None se não houver estado inicial. O alfabeto
+    é o conjunto de símbolos lidos, que AFD() guarda como cadeia ordenada.
+
+    Transições vazias (ε) e duas transições do mesmo estado pelo mesmo
+    símbolo para destinos diferentes geram ValueError: o arquivo descreve
+    um AFN e deve ser lido com AFN.carregar_afn_de_jflap.
+    """
+    id_de = {}          # id do XML -> id inteiro
+    nomes = []          # id inteiro -> nome (None até ver o <state>)
+    finais = []
+    inicial = -1
+    coluna = {}         # símbolo -> coluna provisória
+    alfabeto = set()
+    origens, destinos, colunas = array('i'), array('i'), array('i')
+
+    def id_inteiro(id_xml):
+        q = id_de.get(id_xml)
+        if q is None:
+            q = id_de[id_xml] = len(nomes)
+            nomes.append(None)
+        return q
+
+    automato = None
+    with _abrir_jflap(caminho_arquivo) as arquivo:
+        for evento, elem in ET.iterparse(arquivo, events=('start', 'end')):
+            tag = elem.tag
+            if evento == 'start':
+                if tag == 'automaton':
+                    automato = elem
+                continue
+            if tag == 'state':
+                q = id_inteiro(elem.get('id'))
+                nomes[q] = elem.get('name')
+                for filho in elem:
+                    if filho.tag == 'initial':
+                        inicial = q          # marca estado inicial
+                    elif filho.tag == 'final':
+                        finais.append(q)     # adiciona a estados finais
+            elif tag == 'transition':
+                origem = destino = None
+                simbolo = ""
+                for filho in elem:
+                    if filho.tag == 'from':
+                        origem = filho.text
+                    elif filho.tag == 'to':
+                        destino = filho.text
+                    elif filho.tag == 'read':
+                        simbolo = filho.text or ""
+                if simbolo == "":
+                    raise ValueError(f"Transição vazia (ε) saindo do estado de id {origem}: "
+                                     "o arquivo descreve um AFN.")
+                alfabeto.add(simbolo)
+                # Como em criaTransicao, só símbolos de um caractere viram transição
+                if len(simbolo) == 1:
+                    origens.append(id_inteiro(origem))
+                    destinos.append(id_inteiro(destino))
+                    colunas.append(coluna.setdefault(simbolo, len(coluna)))
+            else:
+                continue
+            elem.clear()
+            if automato is not None:
+                automato.clear()
+
+    if inicial < 0:
+        return None
+    for id_xml, q in id_de.items():
+        if nomes[q] is None:
+            raise KeyError(id_xml)
+
+    # Estados com o mesmo nome são o mesmo estado (como no conjunto de nomes)
+    if len(set(nomes)) != len(nomes):
+        primeiro = {}
+        canonico = [primeiro.setdefault(nome, len(primeiro)) for nome in nomes]
+        nomes = list(primeiro)
+        origens = array('i', (canonico[q] for q in origens))
+        destinos = array('i', (canonico[q] for q in destinos))
+        finais = [canonico[q] for q in finais]
+        inicial = canonico[inicial]
+
+    # Colunas em ordem alfabética de símbolo
+    simbolos = sorted(coluna)
+    nova_coluna = [0] * len(simbolos)
+    for c, simbolo in enumerate(simbolos):
+        nova_coluna[coluna[simbolo]] = c
+    n, k = len(nomes), len(simbolos)
+    delta = array('i', [-1]) * (n * k)
+    for origem, destino, c in zip(origens, destinos, colunas):
+        i = origem * k + nova_coluna[c]
+        if delta[i] >= 0 and delta[i] != destino:
+            raise ValueError(f"Estado '{nomes[origem]}' tem mais de uma transição por "
+                             f"'{simbolos[nova_coluna[c]]}': o arquivo descreve um AFN.")
+        delta[i] = destino
+    bits = bytearray((n + 7) // 8)
+    for q in finais:
+        bits[q >> 3] |= 1 << (q & 7)
+    instrumentacao.contar('jflap.estados_lidos', n)
+    instrumentacao.contar('jflap.transicoes_lidas', len(origens))
+    return TabelaAFD(nomes, simbolos, delta, bits, inicial), alfabeto
+
+
+def _escrever_jflap(tab, arquivo, linhas_por_escrita=10000):
+    # Grava a tabela como XML do JFLAP, em blocos de linhas
+    escritas = 0
+    arquivo.write("<?xml version='1.0' encoding='utf-8'?>\n")
+    arquivo.write('<structure>\n\t<type>fa</type>\n\t<automaton>\n')
+    linhas = []
+    for q, nome in enumerate(tab.nomes):
+        marcas = ''
+        if q == tab.inicial:
+            marcas += '<initial />'
+        if tab.eh_final(q):
+            marcas += '<final />'
+        linhas.append(f'\t\t<state id="{q}" name={quoteattr(str(nome))}>{marcas}</state>\n')
+        if len(linhas) >= linhas_por_escrita:
+            arquivo.write(''.join(linhas))
+            escritas += 1
+            linhas.clear()
+
+    simbolos = [escape(simbolo) for simbolo in tab.simbolos]
+    delta, k = tab.delta, tab.k
+    for q in range(tab.n):
+        base = q * k
+        for c in range(k):
+            d = delta[base + c]
+            if d >= 0:
+                linhas.append(f'\t\t<transition><from>{q}</from><to>{d}</to>'
+                              f'<read>{simbolos[c]}</read></transition>\n')
+        if len(linhas) >= linhas_por_escrita:
+            arquivo.write(''.join(linhas))
+            escritas += 1
+            linhas.clear()
+    linhas.append('\t</automaton>\n</structure>\n')
+    arquivo.write(''.join(linhas))
+    instrumentacao.contar('jflap.estados_escritos', tab.n)
+    instrumentacao.contar('jflap.escritas', escritas + 1)
+
+
+def _abrir_jflap(caminho_arquivo):
+    # Abre o .jff em modo binário, descompactando se estiver em gzip
+    arquivo = open(caminho_arquivo, 'rb')
+    if arquivo.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=arquivo, mode='rb')
+    return arquivo
+
+
+# ===== Produto sob demanda =====
+
+def _classes_conjuntas(tabelas, simbolos):
+    """
+    Classes dos símbolos (coluna c = simbolos[c]) em várias tabelas ao mesmo
+    tempo: dois símbolos ficam juntos se estão na mesma classe em cada
+    tabela (ou fora do alfabeto dela). Retorna (classe, representantes)
+    como TabelaAFD.classes_colunas.
+    """
+    por_tabela = [(tab.coluna, tab.classes_colunas()[0]) for tab in tabelas]
+    ids = {}
+    classe = []
+    representantes = []
+    for c, simbolo in enumerate(simbolos):
+        chave = []
+        for coluna, classe_i in por_tabela:
+            ci = coluna.get(simbolo, -1)
+            chave.append(classe_i[ci] if ci >= 0 else -1)
+        chave = tuple(chave)
+        j = ids.get(chave)
+        if j is None:
+            j = ids[chave] = len(representantes)
+            representantes.append(c)
+        classe.append(j)
+    return classe, representantes
+
+
+class ProdutoPreguicoso:
+    """
+    Produto de vários AFDs (em forma de TabelaAFD) construído sob demanda.
+    Cada tupla de estados recebe um id inteiro só quando alguma transição
+    chega nela, e cada transição do produto só é calculada quando é usada.
+    criterio_final recebe uma tupla com um bool por AFD. O estado morto de
+    cada AFD é implícito (-1); a tupla só de mortos só existe se o critério
+    a tornar final. As transições são guardadas por classe de símbolos
+    (_classes_conjuntas), não por símbolo.
+    """
+
+    NAO_CALCULADO = -2
+
+    def __init__(self, tabelas, criterio_final):
+        self.tabelas = list(tabelas)
+        self.criterio_final = criterio_final
+        self.simbolos = sorted(set().union(*(tab.simbolos for tab in self.tabelas)))
+        self.coluna = {simbolo: c for c, simbolo in enumerate(self.simbolos)}
+        self.k = len(self.simbolos)
+        # Classe de cada coluna do produto; cada classe é calculada só uma
+        # vez, pelo símbolo do seu representante
+        self.classe, self._representantes = _classes_conjuntas(self.tabelas, self.simbolos)
+        self.m = len(self._representantes)
+        # Coluna do representante de cada classe em cada AFD (-1 se não existe)
+        self._colunas = [[tab.coluna.get(self.simbolos[c], -1) for c in self._representantes]
+                         for tab in self.tabelas]
+
+        self._ids = {}
+        self.tuplas = []            # id -> tupla de estados
+        self._final = bytearray()
+        self._delta = array('i')    # m posições por tupla, NAO_CALCULADO até o uso
+        self.inicial = self._registrar(tuple(tab.inicial for tab in self.tabelas))
+
+    def _registrar(self, tupla):
+        q = self._ids.get(tupla)
+        if q is not None:
+            return q
+        finais = tuple(qi >= 0 and tab.eh_final(qi) for qi, tab in zip(tupla, self.tabelas))
+        final = bool(self.criterio_final(finais))
+        if not final and all(qi < 0 for qi in tupla):
+            return -1
+        q = len(self.tuplas)
+        self._ids[tupla] = q
+        self.tuplas.append(tupla)
+        self._final.append(final)
+        self._delta.extend([self.NAO_CALCULADO] * self.m)
+        return q
+
+    def proximo(self, q, c):
+        # Destino da tupla q pela coluna c; -1 é o estado morto
+        return self._proximo_classe(q, self.classe[c])
+
+    def _proximo_classe(self, q, j):
+        i = q * self.m + j
+        destino = self._delta[i]
+        if destino == self.NAO_CALCULADO:
+            destinos = []
+            for qi, tab, colunas in zip(self.tuplas[q], self.tabelas, self._colunas):
+                ci = colunas[j]
+                destinos.append(tab.delta[qi * tab.k + ci] if qi >= 0 and ci >= 0 else -1)
+            destino = self._registrar(tuple(destinos))
+            self._delta[i] = destino
+        return destino
+
+    def eh_final(self, q):
+        return q >= 0 and self._final[q] == 1
+
+    def aceita(self, cadeia):
+        q = self.inicial
+        for simbolo in cadeia:
+            c = self.coluna.get(simbolo)
+            if c is None or q < 0:
+                return False
+            q = self.proximo(q, c)
+        return self.eh_final(q)
+
+    def vazio(self):
+        return self.testemunha() is None
+
+    def testemunha(self):
+        # Busca em largura que para na primeira tupla final e devolve a
+        # menor cadeia que chega nela, ou None se nenhuma é alcançável
+        if self.inicial < 0:
+            return None
+        anterior = {self.inicial: None}     # tupla -> (tupla anterior, classe)
+        fila = deque([self.inicial])
+        while fila:
+            q = fila.popleft()
+            if self._final[q]:
+                instrumentacao.contar('produto.estados_explorados', len(anterior))
+                cadeia = []
+                while anterior[q] is not None:
+                    q, j = anterior[q]
+                    cadeia.append(self.simbolos[self._representantes[j]])
+                return ''.join(reversed(cadeia))
+            for j in range(self.m):
+                d = self._proximo_classe(q, j)
+                if d >= 0 and d not in anterior:
+                    anterior[d] = (q, j)
+                    fila.append(d)
+        instrumentacao.contar('produto.estados_explorados', len(anterior))
+        return None
+
+    def expandidos(self):
+        # Quantas tuplas já foram criadas
+        return len(self.tuplas)
+
+    def tabela(self):
+        # Explora todas as tuplas alcançáveis e devolve a TabelaAFD do produto
+        q = 0
+        while q < len(self.tuplas):
+            for j in range(self.m):
+                self._proximo_classe(q, j)
+            q += 1
+        instrumentacao.contar('produto.estados_explorados', len(self.tuplas))
+        instrumentacao.contar('produto.transicoes_calculadas', len(self.tuplas) * self.m)
+        # O índice -1 (estado morto) pega o último nome: '__dead__'
+        nomes_por_afd = [list(tab.nomes) + ['__dead__'] for tab in self.tabelas]
+        nomes = ['(' + ','.join(nomes_i[qi] for qi, nomes_i in zip(tupla, nomes_por_afd)) + ')'
+                 for tupla in self.tuplas]
+        finais = bytearray((len(nomes) + 7) // 8)
+        for q, final in enumerate(self._final):
+            if final:
+                finais[q >> 3] |= 1 << (q & 7)
+        # Volta a uma coluna por símbolo, copiando a coluna da sua classe
+        n, k, m = len(self.tuplas), self.k, self.m
+        if m == k:
+            delta = array('i', self._delta)
+        else:
+            delta = array('i', [-1]) * (n * k)
+            for c, j in enumerate(self.classe):
+                delta[c::k] = self._delta[j::m]
+        return TabelaAFD(nomes, self.simbolos, delta, finais, self.inicial)
+
+    def materializar(self):
+        tab = self.tabela()
+        return tab.para_afd(''.join(self.simbolos))
+
+
+# ===== Simulação sobre a tabela densa =====
+
+def _blocos(fonte, tamanho_bloco):
+    # Divide a fonte em blocos de até tamanho_bloco, sem copiá-la inteira
+    if isinstance(fonte, str):
+        for i in range(0, len(fonte), tamanho_bloco):
+            yield fonte[i:i + tamanho_bloco]
+    elif isinstance(fonte, (bytes, bytearray, memoryview, mmap.mmap)):
+        with memoryview(fonte) as visao:
+            for i in range(0, len(visao), tamanho_bloco):
+                yield visao[i:i + tamanho_bloco]
+    elif hasattr(fonte, 'read'):
+        while True:
+            bloco = fonte.read(tamanho_bloco)
+            if not bloco:
+                break
+            yield bloco
+    else:
+        yield from fonte
+
+
+def _simular(tab, cadeia):
+    # Estado (id) em que a cadeia termina, ou -1 se faltar transição
+    coluna, delta, k = tab.coluna, tab.delta, tab.k
+    q = tab.inicial
+    for simbolo in cadeia:
+        if q < 0:
+            break
+        c = coluna.get(simbolo)
+        q = -1 if c is None else delta[q * k + c]
+    return q
+
+
+def _simular_lote_numpy(tab, cadeias):
+    """
+    Simula todas as cadeias em paralelo. Retorna um array com o estado final
+    de cada uma; o id tab.n representa o estado morto.
+    """
+    classes, classe = tab.por_classes()
+    n, m = tab.n, classes.k
+    morto = n
+    # Tabela completa (n+1) x (m+1), uma coluna por classe de símbolos:
+    # linha n é o estado morto e a coluna m recebe os símbolos fora do alfabeto
+    T = np.full((n + 1, m + 1), morto, dtype=np.int32)
+    if n and m:
+        delta = np.asarray(classes.delta, dtype=np.int32).reshape(n, m)
+        T[:n, :m] = np.where(delta < 0, morto, delta)
+
+    # Símbolos de todas as cadeias como colunas, num único vetor
+    comprimentos = np.fromiter((len(cadeia) for cadeia in cadeias), dtype=np.int64, count=len(cadeias))
+    inicios = np.zeros(len(cadeias), dtype=np.int64)
+    if len(cadeias):
+        np.cumsum(comprimentos[:-1], out=inicios[1:])
+    codigos = np.frombuffer(''.join(cadeias).encode('utf-32-le'), dtype='<u4')
+    maior = max((ord(simbolo) for simbolo in tab.simbolos), default=0)
+    tradutor = np.full(maior + 2, m, dtype=np.int32)
+    for c, simbolo in enumerate(tab.simbolos):
+        tradutor[ord(simbolo)] = classe[c]
+    colunas = tradutor[np.minimum(codigos, maior + 1)]
+
+    # Ordena por comprimento decrescente: na posição i as cadeias ainda
+    # ativas formam um prefixo do vetor
+    ordem = np.argsort(-comprimentos, kind='stable')
+    comprimentos = comprimentos[ordem]
+    inicios = inicios[ordem]
+    estados = np.full(len(cadeias), morto if tab.inicial < 0 else tab.inicial, dtype=np.int32)
+    maximo = int(comprimentos[0]) if len(cadeias) else 0
+    for i in range(maximo):
+        ativas = int(np.searchsorted(-comprimentos, -i, side='left'))
+        estados[:ativas] = T[estados[:ativas], colunas[inicios[:ativas] + i]]
+
+    resultado = np.empty_like(estados)
+    resultado[ordem] = estados
+    return resultado
+
+
+# ===== Estados úteis, ciclos e contagem =====
+
+def _alcancaveis(tab):
+    # bytearray com 1 nos estados alcançáveis a partir do inicial
+    k, delta = tab.k, tab.delta
+    visto = bytearray(tab.n)
+    if tab.inicial < 0:
+        return visto
+    visto[tab.inicial] = 1
+    pilha = [tab.inicial]
+    while pilha:
+        q = pilha.pop()
+        for d in delta[q * k:(q + 1) * k]:
+            if d >= 0 and not visto[d]:
+                visto[d] = 1
+                pilha.append(d)
+    return visto
+
+
+def _coalcancaveis(tab, entre):
+    # 1 nos estados marcados em entre que alcançam algum final, por uma
+    # busca sobre as transições invertidas
+    n, k, delta = tab.n, tab.k, tab.delta
+    predecessores = [[] for _ in range(n)]
+    for q in range(n):
+        if entre[q]:
+            for d in delta[q * k:(q + 1) * k]:
+                if d >= 0:
+                    predecessores[d].append(q)
+    visto = bytearray(n)
+    pilha = [q for q in range(n) if entre[q] and tab.eh_final(q)]
+    for q in pilha:
+        visto[q] = 1
+    while pilha:
+        for p in predecessores[pilha.pop()]:
+            if not visto[p]:
+                visto[p] = 1
+                pilha.append(p)
+    return visto
+
+
+def _estados_uteis(tab):
+    return _coalcancaveis(tab, _alcancaveis(tab))
+
+
+def _aparar_tabela(tab):
+    """
+    Remove de tab os estados inalcançáveis e os mortos (que não alcançam
+    nenhum final); as transições para eles passam a ser ausentes. O inicial
+    fica mesmo se for morto. Retorna (tabela, inalcançáveis, mortos), onde
+    a tabela é a própria tab se nada foi removido.
+    """
+    alcancavel = _alcancaveis(tab)
+    util = _coalcancaveis(tab, alcancavel)
+    if tab.inicial >= 0:
+        util[tab.inicial] = 1
+    n, k, delta = tab.n, tab.k, tab.delta
+    m = util.count(1)
+    inalcancaveis = n - alcancavel.count(1)
+    mortos = n - inalcancaveis - m
+    instrumentacao.contar('aparar.inalcancaveis', inalcancaveis)
+    instrumentacao.contar('aparar.mortos', mortos)
+    if m == n:
+        return tab, 0, 0
+
+    novo_id = [-1] * n
+    nomes = []
+    for q in range(n):
+        if util[q]:
+            novo_id[q] = len(nomes)
+            nomes.append(tab.nomes[q])
+    novo_delta = array('i', [-1]) * (m * k)
+    finais = bytearray((m + 7) // 8)
+    for q in range(n):
+        i = novo_id[q]
+        if i < 0:
+            continue
+        for c in range(k):
+            d = delta[q * k + c]
+            if d >= 0 and util[d]:
+                novo_delta[i * k + c] = novo_id[d]
+        if tab.eh_final(q):
+            finais[i >> 3] |= 1 << (i & 7)
+    inicial = novo_id[tab.inicial] if tab.inicial >= 0 else -1
+    return TabelaAFD(nomes, tab.simbolos, novo_delta, finais, inicial), inalcancaveis, mortos
+
+
+def _tem_ciclo(tab, entre):
+    # Ordenação topológica (Kahn) do subgrafo dos estados marcados em entre:
+    # sobra algum estado sem ser removido se, e só se, há um ciclo
+    n, k, delta = tab.n, tab.k, tab.delta
+    grau = [0] * n
+    for q in range(n):
+        if entre[q]:
+            for d in delta[q * k:(q + 1) * k]:
+                if d >= 0 and entre[d]:
+                    grau[d] += 1
+    pilha = [q for q in range(n) if entre[q] and grau[q] == 0]
+    removidos = 0
+    while pilha:
+        q = pilha.pop()
+        removidos += 1
+        for d in delta[q * k:(q + 1) * k]:
+            if d >= 0 and entre[d]:
+                grau[d] -= 1
+                if grau[d] == 0:
+                    pilha.append(d)
+    return removidos < sum(entre)
+
+
+def _contar_por_tamanho(tab, n):
+    # Lista com a quantidade de cadeias aceitas de cada tamanho 0..n
+    contagens = [0] * (n + 1)
+    util = _estados_uteis(tab)
+    if tab.inicial < 0 or not util[tab.inicial]:
+        return contagens
+    k, delta = tab.k, tab.delta
+    # Sucessores úteis de cada estado, com quantos símbolos levam de q a d
+    sucessores = {}
+    for q in range(tab.n):
+        if util[q]:
+            vezes = {}
+            for d in delta[q * k:(q + 1) * k]:
+                if d >= 0 and util[d]:
+                    vezes[d] = vezes.get(d, 0) + 1
+            sucessores[q] = list(vezes.items())
+    finais = [q for q in range(tab.n) if util[q] and tab.eh_final(q)]
+
+    # atual[q]: quantas cadeias do tamanho corrente levam do inicial a q
+    atual = {tab.inicial: 1}
+    for tamanho in range(n + 1):
+        contagens[tamanho] = sum(atual.get(q, 0) for q in finais)
+        if tamanho == n or not atual:
+            break
+        proximo = {}
+        for q, quantidade in atual.items():
+            for d, vezes in sucessores[q]:
+                proximo[d] = proximo.get(d, 0) + quantidade * vezes
+        atual = proximo
+    return contagens
+
+
+# ===== Refinamento de partições (núcleo do Hopcroft) =====
+
+def _blocos_equivalencia(tab):
+    """
+    Bloco de cada estado de tab na partição de Myhill–Nerode. A posição n
+    é o estado morto implícito, para onde vão as transições ausentes.
+    """
+    # Símbolos com colunas iguais não separam estados: o refinamento roda
+    # sobre uma coluna por classe de símbolos
+    tab, _ = tab.por_classes()
+    n, k = tab.n, tab.k
+    morto = n
+    delta = [morto if d < 0 else d for d in tab.delta]
+    delta.extend([morto] * k)
+    final = bytearray(n + 1)
+    for q in range(n):
+        if tab.eh_final(q):
+            final[q] = 1
+    return _refinar_particao(n + 1, k, delta, final)
+
+
+def _produto(afds, criterio_final, minimizar, preguicoso, relatorio):
+    # Corpo de AFD.produto_afds e AFD.produto_varios
+    aparagens = [_aparar_com_relatorio(afd.tabela()) for afd in afds]
+    tabelas = [tab for tab, _ in aparagens]
+    if minimizar:
+        tabelas = [_minimizar_tabela(tab, aparar=False) or tab for tab in tabelas]
+    produto = ProdutoPreguicoso(tabelas, criterio_final)
+    if preguicoso:
+        resultado, do_produto = produto, None
+    else:
+        tab, do_produto = _aparar_com_relatorio(produto.tabela())
+        if minimizar:
+            tab = _minimizar_tabela(tab, aparar=False) or tab
+        resultado = tab.para_afd(''.join(tab.simbolos))
+    if relatorio:
+        return resultado, {'operandos': [r for _, r in aparagens], 'produto': do_produto}
+    return resultado
+
+
+def _aparar_com_relatorio(tab):
+    # _aparar_tabela com o relatório de AFD.aparar
+    aparada, inalcancaveis, mortos = _aparar_tabela(tab)
+    return aparada, {'estados': tab.n, 'inalcancaveis': inalcancaveis,
+                     'mortos': mortos, 'restantes': aparada.n}
+
+
+def _minimizar_tabela(tab, aparar=True):
+    """
+    TabelaAFD mínima equivalente a tab, com estados q0, q1, ... ou None se
+    tab já for mínima. Transições para o estado morto são omitidas. Com
+    aparar=True, os estados inalcançáveis e mortos são removidos antes.
+    """
+    original = tab
+    if aparar:
+        tab = _aparar_tabela(tab)[0]
+    n, k = tab.n, tab.k
+    if n == 0:
+        return None if tab is original else tab
+    bloco = _blocos_equivalencia(tab)
+
+    # Blocos que contêm algum estado real viram estados da nova tabela
+    novo_id = {}
+    representante = []
+    for q in range(n):
+        b = bloco[q]
+        if b not in novo_id:
+            novo_id[b] = len(novo_id)
+            representante.append(q)
+
+    # Se cada estado está em seu próprio bloco, já está minimizado
+    m = len(novo_id)
+    if m == n and tab is original:
+        return None
+
+    # Transições copiadas de um representante de cada bloco
+    novo_delta = array('i', [-1]) * (m * k)
+    finais = bytearray((m + 7) // 8)
+    for i, rep in enumerate(representante):
+        for c in range(k):
+            d = tab.delta[rep * k + c]
+            d = novo_id.get(bloco[n if d < 0 else d])
+            if d is not None:
+                novo_delta[i * k + c] = d
+        if tab.eh_final(rep):
+            finais[i >> 3] |= 1 << (i & 7)
+    inicial = novo_id[bloco[tab.inicial]] if tab.inicial >= 0 else -1
+    return TabelaAFD([f'q{i}' for i in range(m)], tab.simbolos, novo_delta, finais, inicial)
+
+
+def _refinar_particao(n, k, delta, final):
+    """
+    Refinamento de partições de Hopcroft sobre estados inteiros 0..n-1.
+    delta é uma tabela completa (delta[q * k + c] é o destino de q pelo
+    símbolo c) e final[q] indica se q é final. Retorna uma lista com o
+    número do bloco de cada estado; estados no mesmo bloco são equivalentes.
+    """
+    # Índice inverso: origens[inv_ini[c * n + t]:inv_ini[c * n + t + 1]]
+    # são os estados que vão para t pelo símbolo c
+    inv_ini = array('i', [0]) * (k * n + 1)
+    for q in range(n):
+        base = q * k
+        for c in range(k):
+            inv_ini[c * n + delta[base + c] + 1] += 1
+    for i in range(k * n):
+        inv_ini[i + 1] += inv_ini[i]
+    proximo = array('i', inv_ini)
+    origens = array('i', [0]) * (k * n)
+    for q in range(n):
+        base = q * k
+        for c in range(k):
+            chave = c * n + delta[base + c]
+            origens[proximo[chave]] = q
+            proximo[chave] += 1
+    del proximo
+
+    # Partição: cada bloco b ocupa elems[inicio[b]:fim[b]]; pos é o inverso de elems
+    finais = [q for q in range(n) if final[q]]
+    nao_finais = [q for q in range(n) if not final[q]]
+    elems = array('i', finais + nao_finais)
+    pos = array('i', [0]) * n
+    for i, q in enumerate(elems):
+        pos[q] = i
+    bloco = [0] * n
+    inicio, fim = [], []
+    for parte, ini in ((finais, 0), (nao_finais, len(finais))):
+        if parte:
+            for q in parte:
+                bloco[q] = len(inicio)
+            inicio.append(ini)
+            fim.append(ini + len(parte))
+    marcados = [0] * n
+
+    # Worklist: basta o menor dos blocos iniciais (o AFD é completo)
+    W = []
+    if len(inicio) == 2:
+        W.append(0 if fim[0] - inicio[0] <= fim[1] - inicio[1] else 1)
+
+    medir = instrumentacao.ATIVO
+    blocos_iniciais = len(inicio)
+    iteracoes = maior_fila = 0
+    while W:
+        if medir:
+            iteracoes += 1
+            maior_fila = max(maior_fila, len(W))
+        A = W.pop()
+        alvo = elems[inicio[A]:fim[A]]
+        for c in range(k):
+            base = c * n
+            tocados = []
+            # Marca os estados que vão para A pelo símbolo c, movendo-os
+            # para o começo do seu bloco
+            for t in alvo:
+                for i in range(inv_ini[base + t], inv_ini[base + t + 1]):
+                    q = origens[i]
+                    b = bloco[q]
+                    m = marcados[b]
+                    if m == 0:
+                        tocados.append(b)
+                    j = inicio[b] + m
+                    pq = pos[q]
+                    if pq != j:
+                        outro = elems[j]
+                        elems[j] = q
+                        pos[q] = j
+                        elems[pq] = outro
+                        pos[outro] = pq
+                    marcados[b] = m + 1
+
+            # Divide cada bloco tocado parcialmente; a metade menor vira um
+            # bloco novo e entra na worklist
+            for b in tocados:
+                m = marcados[b]
+                marcados[b] = 0
+                tamanho = fim[b] - inicio[b]
+                if m == tamanho:
+                    continue
+                novo = len(inicio)
+                if m <= tamanho - m:
+                    ini, f = inicio[b], inicio[b] + m
+                    inicio[b] = f
+                else:
+                    ini, f = inicio[b] + m, fim[b]
+                    fim[b] = ini
+                inicio.append(ini)
+                fim.append(f)
+                for j in range(ini, f):
+                    bloco[elems[j]] = novo
+                W.append(novo)
+
+    if medir:
+        instrumentacao.contar('refinamento.iteracoes', iteracoes)
+        instrumentacao.contar('refinamento.divisoes', len(inicio) - blocos_iniciais)
+        instrumentacao.maximo('refinamento.maior_worklist', maior_fila)
+        instrumentacao.maximo('refinamento.blocos', len(inicio))
+        instrumentacao.maximo('refinamento.maior_bloco',
+                              max((f - i for i, f in zip(inicio, fim)), default=0))
+    return bloco
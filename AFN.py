@@ -0,0 +1,292 @@
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
+
+import instrumentacao
+from AFD import AFDCompacto, TabelaAFD, _abrir_jflap, _minimizar_tabela
+
+
+class AFN:
+    """
+    Autômato finito não determinístico, com transições vazias (ε).
+    transicoes mapeia (estado, simbolo) -> conjunto de destinos; o símbolo
+    "" é a transição ε. Os atributos seguem os nomes da classe AFD.
+    """
+
+    def __init__(self, Alfabeto):
+        if isinstance(Alfabeto, (set, frozenset, list, tuple)):
+            # Como em AFD: coleção de símbolos vira a cadeia dos símbolos
+            Alfabeto = ''.join(sorted({s for s in map(str, Alfabeto) if len(s) == 1}))
+        Alfabeto = str(Alfabeto)
+        self.estados = set()
+        self.alfabeto = Alfabeto
+        self.transicoes = dict()
+        self.incial = None
+        self.finais = set()
+
+    def criaTransicao(self, origem, destino, simbolo):
+        # simbolo "" cria uma transição ε
+        origem = str(origem)
+        destino = str(destino)
+        simbolo = str(simbolo)
+        if origem not in self.estados or destino not in self.estados:
+            return False
+        if len(simbolo) > 1:
+            return False
+        self.transicoes.setdefault((origem, simbolo), set()).add(destino)
+        return True
+
+    def __str__(self):
+        s = 'AFN:\n'
+        s += '  Estados (E):\n'
+        s += '   { ' + ', '.join(str(e) for e in self.estados) + ' }\n'
+        s += '  Alfabeto (A):\n'
+        s += '   { ' + ', '.join(str(a) for a in self.alfabeto) + ' }\n'
+        s += '  Transições (T):\n'
+        for (e, a), destinos in self.transicoes.items():
+            s += f'   ({e}, "{a or "ε"}") --> {{ ' + ', '.join(sorted(destinos)) + ' }\n'
+        s += f'  Estado Inicial (i): {self.incial}\n'
+        s += '  Estados Finais (F):\n'
+        s += '   { ' + ', '.join(str(e) for e in self.finais) + ' }\n'
+        return s
+
+    # ===== SUPORTE AFN EM JFLAP =====
+
+    @instrumentacao.medido('jflap.leitura_afn')
+    def carregar_afn_de_jflap(caminho_arquivo):
+        """
+        Lê o mesmo formato .jff do AFD, mas aceita transições vazias (ε) e
+        várias transições pelo mesmo símbolo. Uma transição que lê mais de
+        um símbolo (ex.: "ab") vira uma cadeia de estados intermediários.
+        Retorna None se não houver estado inicial.
+        """
+        nomes = {}              # id do XML -> nome
+        inicial = None
+        finais = set()
+        arestas = []
+        automato = None
+        with _abrir_jflap(caminho_arquivo) as arquivo:
+            for evento, elem in ET.iterparse(arquivo, events=('start', 'end')):
+                tag = elem.tag
+                if evento == 'start':
+                    if tag == 'automaton':
+                        automato = elem
+                    continue
+                if tag == 'state':
+                    nome = elem.get('name')
+                    nomes[elem.get('id')] = nome
+                    for filho in elem:
+                        if filho.tag == 'initial':
+                            inicial = nome
+                        elif filho.tag == 'final':
+                            finais.add(nome)
+                elif tag == 'transition':
+                    origem = destino = None
+                    simbolo = ""
+                    for filho in elem:
+                        if filho.tag == 'from':
+                            origem = filho.text
+                        elif filho.tag == 'to':
+                            destino = filho.text
+                        elif filho.tag == 'read':
+                            simbolo = filho.text or ""
+                    arestas.append((origem, destino, simbolo))
+                else:
+                    continue
+                elem.clear()
+                if automato is not None:
+                    automato.clear()
+
+        if inicial is None:
+            return None
+        afn = AFN(''.join(sorted({c for _, _, simbolo in arestas for c in simbolo})))
+        afn.estados.update(nomes.values())
+        afn.incial = inicial
+        afn.finais = finais
+        for i, (origem, destino, simbolo) in enumerate(arestas):
+            origem, destino = nomes[origem], nomes[destino]
+            # "abc" de p para q vira p -a-> p~i.1 -b-> p~i.2 -c-> q
+            anterior = origem
+            for j, c in enumerate(simbolo[:-1], 1):
+                intermediario = f'{origem}~{i}.{j}'
+                afn.estados.add(intermediario)
+                afn.transicoes.setdefault((anterior, c), set()).add(intermediario)
+                anterior = intermediario
+            afn.transicoes.setdefault((anterior, simbolo[-1:]), set()).add(destino)
+        return afn
+
+    # ===== Simulação e determinização =====
+    def compilar(self):
+        # Forma interna com estados inteiros e conjuntos como bitsets (int)
+        return _AFNCompilado(self)
+
+    def fecho_epsilon(self, estados):
+        # Estados alcançáveis a partir de estados só por transições ε
+        fecho = set(estados)
+        pilha = list(fecho)
+        while pilha:
+            q = pilha.pop()
+            for d in self.transicoes.get((q, ""), ()):
+                if d not in fecho:
+                    fecho.add(d)
+                    pilha.append(d)
+        return fecho
+
+    def aceita(self, cadeia):
+        # Uma simulação avulsa; para muitas cadeias, use simulador()
+        return self.simulador().aceita(cadeia)
+
+    def simulador(self, capacidade=4096):
+        """
+        Simulador com determinização sob demanda: cada conjunto de estados
+        do AFN só vira um estado do AFD quando uma cadeia chega nele, e suas
+        transições ficam num cache LRU de até capacidade estados.
+        """
+        return SimuladorAFN(self.compilar(), capacidade)
+
+    def determinizar(self, compacto=False, minimizar=False):
+        """
+        Construção de subconjuntos completa, só com os conjuntos alcançáveis.
+        O conjunto vazio é o estado morto implícito (não aparece). Retorna
+        um AFD comum (ou AFDCompacto), pronto para as operações da classe AFD.
+        """
+        comp = self.compilar()
+        ids = {}
+        conjuntos = []
+        delta = array('i')
+        if comp.inicial:
+            ids[comp.inicial] = 0
+            conjuntos.append(comp.inicial)
+        for conjunto in conjuntos:  # conjuntos cresce durante a busca
+            for c in range(comp.k):
+                destino = comp.passo(conjunto, c)
+                if not destino:
+                    delta.append(-1)
+                    continue
+                q = ids.get(destino)
+                if q is None:
+                    q = ids[destino] = len(conjuntos)
+                    conjuntos.append(destino)
+                delta.append(q)
+        instrumentacao.contar('afn.estados_determinizados', len(conjuntos))
+        n = len(conjuntos)
+        finais = bytearray((n + 7) // 8)
+        for q, conjunto in enumerate(conjuntos):
+            if conjunto & comp.finais:
+                finais[q >> 3] |= 1 << (q & 7)
+        nomes = ['{' + ','.join(sorted(comp.nomes_de(conjunto))) + '}' for conjunto in conjuntos]
+        tab = TabelaAFD(nomes, comp.simbolos, delta, finais, 0 if n else -1)
+        if minimizar:
+            tab = _minimizar_tabela(tab) or tab
+        if compacto:
+            return AFDCompacto(tab, self.alfabeto)
+        return tab.para_afd(self.alfabeto)
+
+
+class _AFNCompilado:
+    """
+    AFN com estados 0..n-1 e conjuntos de estados como bitsets (int).
+    passos[q][c] já é o fecho ε dos destinos de q pelo símbolo c, então um
+    passo da construção de subconjuntos é só um OU dos bitsets.
+    """
+
+    def __init__(self, afn):
+        self.nomes = sorted(afn.estados)
+        indice = {nome: q for q, nome in enumerate(self.nomes)}
+        self.simbolos = sorted({simbolo for (_, simbolo) in afn.transicoes if simbolo != ""})
+        self.coluna = {simbolo: c for c, simbolo in enumerate(self.simbolos)}
+        self.k = len(self.simbolos)
+        n = len(self.nomes)
+
+        fecho = [_bits(indice, afn.fecho_epsilon([nome])) for nome in self.nomes]
+
+        self.passos = [[0] * self.k for _ in range(n)]
+        for (origem, simbolo), destinos in afn.transicoes.items():
+            if simbolo == "":
+                continue
+            linha = self.passos[indice[origem]]
+            c = self.coluna[simbolo]
+            for destino in destinos:
+                linha[c] |= fecho[indice[destino]]
+        self.inicial = fecho[indice[afn.incial]] if afn.incial in indice else 0
+        self.finais = _bits(indice, (nome for nome in afn.finais if nome in indice))
+
+    def passo(self, conjunto, c):
+        destino = 0
+        passos = self.passos
+        while conjunto:
+            menor = conjunto & -conjunto
+            destino |= passos[menor.bit_length() - 1][c]
+            conjunto ^= menor
+        return destino
+
+    def nomes_de(self, conjunto):
+        nomes = []
+        while conjunto:
+            menor = conjunto & -conjunto
+            nomes.append(self.nomes[menor.bit_length() - 1])
+            conjunto ^= menor
+        return nomes
+
+
+def _bits(indice, nomes):
+    conjunto = 0
+    for nome in nomes:
+        conjunto |= 1 << indice[nome]
+    return conjunto
+
+
+class SimuladorAFN:
+    """
+    Determinização sob demanda de um AFN compilado. Os estados do AFD são
+    bitsets; cada um guarda as transições já calculadas (coluna -> bitset)
+    num cache LRU limitado a capacidade estados. Um estado despejado só
+    perde o que já tinha calculado: é recriado se alguma cadeia voltar a ele.
+    """
+
+    def __init__(self, compilado, capacidade=4096):
+        if capacidade < 1:
+            raise ValueError("capacidade deve ser pelo menos 1")
+        self.afn = compilado
+        self.capacidade = capacidade
+        self._cache = OrderedDict()     # bitset -> {coluna: bitset}
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+
+    def _proximo(self, conjunto, c):
+        cache = self._cache
+        linha = cache.get(conjunto)
+        if linha is None:
+            linha = cache[conjunto] = {}
+            if len(cache) > self.capacidade:
+                cache.popitem(last=False)
+                self.despejos += 1
+        else:
+            cache.move_to_end(conjunto)
+        destino = linha.get(c)
+        if destino is None:
+            self.falhas += 1
+            destino = linha[c] = self.afn.passo(conjunto, c)
+        else:
+            self.acertos += 1
+        return destino
+
+    def aceita(self, cadeia):
+        coluna = self.afn.coluna
+        conjunto = self.afn.inicial
+        for simbolo in cadeia:
+            c = coluna.get(simbolo)
+            if c is None or not conjunto:
+                return False
+            conjunto = self._proximo(conjunto, c)
+        return bool(conjunto & self.afn.finais)
+
+    def estatisticas(self):
+        return {
+            'estados_em_cache': len(self._cache),
+            'capacidade': self.capacidade,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'despejos': self.despejos,
+        }
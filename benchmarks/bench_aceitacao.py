@@ -0,0 +1,49 @@
+"""
+Vazão (palavras/s) do laço limpaAfd/move contra aceita e aceita_lote.
+
+Uso: python -m benchmarks.bench_aceitacao [num_palavras]
+"""
+import random
+import sys
+import time
+
+from benchmarks.geradores import afd_aleatorio
+
+
+def palavras_aleatorias(quantidade, alfabeto='ab', tamanho_max=20, semente=0):
+    rng = random.Random(semente)
+    return [''.join(rng.choice(alfabeto) for _ in range(rng.randint(0, tamanho_max)))
+            for _ in range(quantidade)]
+
+
+def laco_move(afd, palavras):
+    resultado = []
+    for palavra in palavras:
+        afd.limpaAfd()
+        afd.move(palavra)
+        resultado.append(not afd.deuErro() and afd.estadoFinal(afd.estadoAtual()))
+    return resultado
+
+
+def vazao(funcao, palavras):
+    inicio = time.perf_counter()
+    funcao(palavras)
+    return len(palavras) / (time.perf_counter() - inicio)
+
+
+def main(quantidade):
+    afd = afd_aleatorio(1000, semente=1)
+    compacto = afd.compactar()
+    palavras = palavras_aleatorias(quantidade)
+    casos = [
+        ('move (laço)', lambda ps: laco_move(afd, ps)),
+        ('aceita', lambda ps: [afd.aceita(p) for p in ps]),
+        ('aceita (compacto)', lambda ps: [compacto.aceita(p) for p in ps]),
+        ('aceita_lote', afd.aceita_lote),
+    ]
+    for nome, funcao in casos:
+        print(f'{nome:>20}: {vazao(funcao, palavras):14,.0f} palavras/s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
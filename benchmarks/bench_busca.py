@@ -0,0 +1,73 @@
+"""
+Vazão (MB/s) da busca de ocorrências (busca.py) num texto aleatório de
+palavras, em str, bytes e em blocos de um arquivo, nas semânticas mais
+longa e todas. Para o dicionário de palavras, o resultado da mais longa é
+conferido com re.finditer sobre a alternância das palavras (da mais longa
+para a mais curta, o que dá a mesma ocorrência).
+
+Uso: python -m benchmarks.bench_busca [megabytes]
+"""
+import io
+import random
+import re
+import sys
+import time
+
+import busca
+from construcao import afd_de_palavras, afd_de_regex
+
+_LETRAS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def _texto(tamanho, rng):
+    vocabulario = [''.join(rng.choice(_LETRAS) for _ in range(rng.randint(2, 9)))
+                   for _ in range(5000)]
+    partes, total = [], 0
+    while total < tamanho:
+        palavra = rng.choice(vocabulario)
+        partes.append(palavra)
+        total += len(palavra) + 1
+    return ' '.join(partes)[:tamanho], vocabulario
+
+
+def _medir(funcao, megabytes):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    return resultado, megabytes / segundos
+
+
+def main(megabytes, semente=0):
+    rng = random.Random(semente)
+    texto, vocabulario = _texto(int(megabytes * 10 ** 6), rng)
+    dados = texto.encode('ascii')
+    palavras = sorted(set(rng.sample(vocabulario, 200)))
+    casos = [
+        ('200 palavras', afd_de_palavras(palavras)),
+        ('a(b|c)*d', afd_de_regex('a(b|c)*d', _LETRAS)),
+        ('(a|e|i|o|u)(a|e|i|o|u)+', afd_de_regex('(a|e|i|o|u)(a|e|i|o|u)+', _LETRAS)),
+    ]
+    print(f'texto: {len(texto) / 10 ** 6:.1f} MB')
+    print(f'{"padrão":>26} {"semântica":>10} {"str":>9} {"bytes":>9} {"blocos":>9} '
+          f'{"ocorr.":>9} {"estados":>8}')
+    for nome, afd in casos:
+        for todas in (False, True):
+            buscador = busca.Buscador(afd, todas=todas)
+            achadas, vazao_str = _medir(lambda: buscador.buscar(texto), megabytes)
+            em_bytes, vazao_bytes = _medir(lambda: buscador.buscar(dados), megabytes)
+            em_blocos, vazao_blocos = _medir(
+                lambda: list(buscador.ocorrencias(io.BytesIO(dados))), megabytes)
+            assert achadas == em_bytes == em_blocos
+            print(f'{nome:>26} {"todas" if todas else "mais longa":>10} '
+                  f'{vazao_str:7.1f}MB/s {vazao_bytes:7.1f}MB/s {vazao_blocos:7.1f}MB/s '
+                  f'{len(achadas):9,} {buscador.num_estados():8,}')
+        if nome == '200 palavras':
+            padrao = re.compile('|'.join(sorted(palavras, key=len, reverse=True)))
+            referencia, vazao_re = _medir(
+                lambda: [m.span() for m in padrao.finditer(texto)], megabytes)
+            assert referencia == busca.buscar(afd, texto)
+            print(f'{"re.finditer (referência)":>26} {"":>10} {vazao_re:7.1f}MB/s')
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,57 @@
+"""
+Vazão do AFD compilado (compilador.compilar) contra o laço limpaAfd/move,
+aceita e aceita do AFDCompacto: muitas palavras curtas e uma cadeia longa.
+Mostra também o tempo de compilação e o de reabrir o módulo do disco.
+
+Uso: python -m benchmarks.bench_compilador [num_palavras] [estados]
+"""
+import sys
+import tempfile
+import time
+
+import compilador
+from benchmarks.bench_aceitacao import laco_move, palavras_aleatorias
+from benchmarks.geradores import afd_aleatorio
+
+TAMANHO_LONGA = 10 ** 6
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def main(quantidade, estados):
+    afd = afd_aleatorio(estados, 'abcd', semente=1)
+    compacto = afd.compactar()
+    with tempfile.TemporaryDirectory() as pasta:
+        segundos_compilar = cronometrar(lambda: compilador.compilar(compacto, pasta))
+        compilador.limpar()
+        segundos_disco = cronometrar(lambda: compilador.compilar(compacto, pasta))
+    aceita = compilador.compilar(compacto)
+    print(f'compilação: {segundos_compilar:.3f} s, reabertura do disco: {segundos_disco:.3f} s')
+
+    palavras = palavras_aleatorias(quantidade, 'abcd')
+    longa = palavras_aleatorias(1, 'abcd', TAMANHO_LONGA, semente=1)[0] * 2
+    casos = [
+        ('move (laço)', lambda ps: laco_move(afd, ps)),
+        ('aceita', lambda ps: [afd.aceita(p) for p in ps]),
+        ('aceita (compacto)', lambda ps: [compacto.aceita(p) for p in ps]),
+        ('compilado', lambda ps: [aceita(p) for p in ps]),
+    ]
+    esperado = [afd.aceita(p) for p in palavras]
+    base = None
+    print(f'{"":>20} {"palavras/s":>14} {"cadeia longa":>14} {"ganho":>7}')
+    for nome, funcao in casos:
+        assert funcao(palavras) == esperado, nome
+        segundos = cronometrar(lambda: funcao(palavras))
+        longo = cronometrar(lambda: funcao([longa]))
+        base = base or segundos
+        print(f'{nome:>20} {quantidade / segundos:14,.0f} '
+              f'{len(longa) / longo / 2 ** 20:10.1f} MB/s {base / segundos:6.1f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
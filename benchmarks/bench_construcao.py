@@ -0,0 +1,43 @@
+"""
+Tempo de afd_de_regex em expressões longas (milhares de caracteres),
+conferindo o AFD obtido. Serve também de verificação de regressão: o
+analisador, a concatenação e a derivada não podem recorrer na proporção
+do tamanho da expressão (antes, 'a' * 1200 já estourava a pilha), e
+'a?' * n precisa ficar linear (antes, 1500 repetições levavam ~9 s).
+
+Uso: python -m benchmarks.bench_construcao [tamanho]
+"""
+import sys
+import time
+
+from construcao import afd_de_regex
+
+
+def main(tamanho):
+    casos = [
+        ('a' * tamanho, tamanho + 1,
+         lambda afd: afd.aceita('a' * tamanho) and not afd.aceita('a' * (tamanho - 1))),
+        ('a?' * (tamanho // 2), tamanho // 2 + 1,
+         lambda afd: afd.aceita('') and afd.aceita('a' * (tamanho // 2))
+         and not afd.aceita('a' * (tamanho // 2 + 1))),
+        ('a?' * (tamanho // 4) + 'a' * (tamanho // 4), tamanho // 2 + 1,
+         lambda afd: afd.aceita('a' * (tamanho // 4)) and afd.aceita('a' * (tamanho // 2))
+         and not afd.aceita('a' * (tamanho // 4 - 1))),
+        ('(a|b)*' + 'ab?' * (tamanho // 3), None,
+         lambda afd: afd.aceita('ba' * (tamanho // 3)) and not afd.aceita('b' * 10)),
+        ('(' + 'ab' * (tamanho // 2) + ')+', tamanho + 1,
+         lambda afd: afd.aceita('ab' * tamanho) and not afd.aceita('ab' * (tamanho // 2) + 'a')),
+    ]
+    print(f'{"expressão":>24} {"tamanho":>8} {"estados":>8} {"tempo":>9}')
+    for expressao, estados, confere in casos:
+        inicio = time.perf_counter()
+        afd = afd_de_regex(expressao)
+        segundos = time.perf_counter() - inicio
+        assert estados is None or len(afd.estados) == estados, (expressao[:20], len(afd.estados))
+        assert confere(afd), expressao[:20]
+        resumo = expressao if len(expressao) <= 24 else expressao[:21] + '...'
+        print(f'{resumo:>24} {len(expressao):8,} {len(afd.estados):8,} {segundos:8.2f}s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,65 @@
+"""
+Compara o minimizar_hopcroft atual com a implementação original (quadrática).
+
+Uso: python -m benchmarks.bench_hopcroft [tamanho ...]
+"""
+import contextlib
+import io
+import sys
+import time
+
+from AFD import AFD
+from benchmarks.geradores import afd_aleatorio
+
+
+# Implementação original de minimizar_hopcroft, mantida apenas como referência
+def minimizar_hopcroft_original(afd):
+    Q = set(afd.estados)
+    F = set(afd.finais)
+    P = [block for block in [F, Q - F] if block]
+    W = [block.copy() for block in P]
+    while W:
+        A = W.pop()
+        for c in afd.alfabeto:
+            X = {q for q in Q if afd.transicoes.get((q, c)) in A}
+            new_P = []
+            for Y in P:
+                inter = Y & X
+                diff = Y - X
+                if inter and diff:
+                    new_P.append(inter)
+                    new_P.append(diff)
+                    if Y in W:
+                        W.remove(Y)
+                        W.append(inter)
+                        W.append(diff)
+                    else:
+                        W.append(inter if len(inter) <= len(diff) else diff)
+                else:
+                    new_P.append(Y)
+            P = new_P
+    return len(P)
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def main(tamanhos, limite_original=5000):
+    print(f"{'estados':>10} {'atual (s)':>12} {'original (s)':>14}")
+    for n in tamanhos:
+        afd = afd_aleatorio(n, semente=n)
+        atual = cronometrar(AFD.minimizar_hopcroft, afd)
+        if n <= limite_original:
+            original = f'{cronometrar(minimizar_hopcroft_original, afd):14.3f}'
+        else:
+            original = f"{'-':>14}"
+        print(f'{n:>10} {atual:12.3f} {original}')
+
+
+if __name__ == '__main__':
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000, 10000, 100000]
+    main(tamanhos)
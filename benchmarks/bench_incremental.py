@@ -0,0 +1,70 @@
+"""
+Custo de cada edição num AFDIncremental (criaEstado + criaTransicao,
+mudaEstadoFinal e troca de destino de uma transição) contra minimizar a
+tabela inteira de novo, numa árvore grande sobre 'acgt'.
+
+Uso: python -m benchmarks.bench_incremental [estados] [edicoes]
+"""
+import random
+import statistics
+import sys
+import time
+
+from AFD import _minimizar_tabela
+from benchmarks.geradores import afd_arvore
+from incremental import AFDIncremental
+
+
+def main(estados, edicoes, semente=0):
+    rng = random.Random(semente)
+    inicio = time.perf_counter()
+    afd = afd_arvore(estados, semente=semente)
+    print(f'árvore de {estados:,} estados: {time.perf_counter() - inicio:.1f} s')
+
+    inicio = time.perf_counter()
+    inc = AFDIncremental(afd)
+    print(f'partição inicial (Hopcroft): {time.perf_counter() - inicio:.1f} s, '
+          f'{inc.num_blocos():,} blocos')
+
+    nomes = list(inc.estados)
+    tempos = {'novo estado': [], 'final': [], 'transição': []}
+    for i in range(edicoes):
+        tipo = rng.choice(list(tempos))
+        origem = rng.choice(nomes)
+        simbolo = rng.choice('acgt')
+        inicio = time.perf_counter()
+        if tipo == 'novo estado':
+            nome = f'n{i}'
+            inc.criaEstado(nome, final=True)
+            inc.criaTransicao(origem, nome, simbolo)
+        elif tipo == 'final':
+            inc.mudaEstadoFinal(origem, origem not in inc.finais)
+        else:
+            inc.criaTransicao(origem, rng.choice(nomes), simbolo)
+        tempos[tipo].append(time.perf_counter() - inicio)
+        if tipo == 'novo estado':
+            nomes.append(nome)
+
+    print(f'{"edição":>14} {"média":>9} {"p50":>9} {"p99":>9} {"máx":>9}')
+    todos = sorted(t for lista in tempos.values() for t in lista)
+    for nome, lista in list(tempos.items()) + [('todas', todos)]:
+        lista = sorted(lista)
+        print(f'{nome:>14} ' + ' '.join(f'{1000 * v:7.2f}ms' for v in (
+            statistics.mean(lista), lista[len(lista) // 2],
+            lista[int(0.99 * (len(lista) - 1))], lista[-1])))
+    print(f'recálculos completos: {inc.recalculos - 1} em {inc.edicoes} edições')
+
+    inicio = time.perf_counter()
+    minimo = inc.minimo(compacto=True)
+    print(f'minimo(): {time.perf_counter() - inicio:.2f} s, {len(minimo.estados):,} estados')
+    inicio = time.perf_counter()
+    tab = inc.tabela()
+    referencia = _minimizar_tabela(tab) or tab
+    print(f'minimização completa da tabela: {time.perf_counter() - inicio:.1f} s, '
+          f'{referencia.n:,} estados')
+    assert referencia.n == len(minimo.estados)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3000)
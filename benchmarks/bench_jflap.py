@@ -0,0 +1,97 @@
+"""
+Tempo e pico de memória (RSS) do carregador JFLAP: versão original (ET.parse
++ criaTransicao) contra a leitura em fluxo atual. Cada carregamento roda em
+um processo separado para que o pico de RSS de um não contamine o outro.
+
+Uso: python -m benchmarks.bench_jflap [tamanho ...]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from AFD import AFD
+from benchmarks.geradores import afd_aleatorio
+
+
+# Carregador original, mantido apenas como referência
+def carregar_original(caminho_arquivo):
+    automato = ET.parse(caminho_arquivo).getroot().find('automaton')
+    estados = {}
+    alfabeto = set()
+    transicoes_temp = []
+    inicial = None
+    finais = set()
+    for state in automato.findall('state'):
+        nome = state.get('name')
+        estados[state.get('id')] = nome
+        if state.find('initial') is not None:
+            inicial = nome
+        if state.find('final') is not None:
+            finais.add(nome)
+    if inicial is None:
+        return None
+    for trans in automato.findall('transition'):
+        origem = estados[trans.find('from').text]
+        destino = estados[trans.find('to').text]
+        simbolo = trans.find('read').text or ""
+        alfabeto.add(simbolo)
+        transicoes_temp.append((origem, simbolo, destino))
+    afd = AFD(alfabeto)
+    afd.estados.update(estados.values())
+    afd.incial = inicial
+    afd.finais = finais
+    for origem, simbolo, destino in transicoes_temp:
+        afd.criaTransicao(origem, destino, simbolo)
+    return afd
+
+
+CARREGADORES = {
+    'original': carregar_original,
+    'atual': AFD.carregar_afd_de_jflap,
+    'compacto': lambda caminho: AFD.carregar_afd_de_jflap(caminho, compacto=True),
+}
+
+
+def pico_rss_kb():
+    # VmHWM é zerado no exec; ru_maxrss herda o pico do processo pai
+    try:
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def medir(nome, caminho):
+    # Executado no processo filho: imprime "segundos rss_kb"
+    inicio = time.perf_counter()
+    CARREGADORES[nome](caminho)
+    segundos = time.perf_counter() - inicio
+    print(segundos, pico_rss_kb())
+
+
+def main(tamanhos):
+    print(f"{'estados':>10} {'carregador':>10} {'tempo (s)':>10} {'pico RSS (MB)':>14}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in tamanhos:
+            caminho = os.path.join(pasta, f'afd_{n}.jff')
+            afd_aleatorio(n, semente=n).salvar_afd_em_jflap(caminho)
+            for nome in CARREGADORES:
+                saida = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_jflap', '--medir', nome, caminho],
+                    capture_output=True, text=True, check=True).stdout.split()
+                segundos, rss = float(saida[0]), int(saida[1]) / 1024
+                print(f'{n:>10} {nome:>10} {segundos:10.2f} {rss:14.1f}')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--medir']:
+        medir(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 500000])
@@ -0,0 +1,36 @@
+"""
+Memória por transição: dicionário de tuplas (AFD) x tabela densa (TabelaAFD).
+
+Uso: python -m benchmarks.bench_memoria [tamanho ...]
+"""
+import gc
+import sys
+import tracemalloc
+
+from AFD import TabelaAFD
+from benchmarks.geradores import afd_aleatorio
+
+
+def medir(funcao):
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao()
+    usado = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, usado
+
+
+def main(tamanhos):
+    print(f"{'estados':>10} {'transições':>12} {'dict (B/t)':>12} {'tabela (B/t)':>14} {'c/ nomes (B/t)':>16}")
+    for n in tamanhos:
+        afd = afd_aleatorio(n, semente=n)
+        # Conta só o armazenamento das transições (os nomes já existem)
+        _, em_dict = medir(lambda: {(o, s): d for (o, s), d in afd.transicoes.items()})
+        # A tabela guarda também a lista de nomes e o índice nome -> id
+        tab, com_nomes = medir(lambda: TabelaAFD.de_afd(afd))
+        t = len(afd.transicoes)
+        print(f'{n:>10} {t:>12} {em_dict / t:12.1f} {tab.memoria() / t:14.1f} {com_nomes / t:16.1f}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000])
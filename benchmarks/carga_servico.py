@@ -0,0 +1,144 @@
+"""
+Gerador de carga para o servico.py: várias conexões keep-alive enviando
+requisições /aceita ao mesmo tempo, para medir vazão, latência e quantas
+cadeias o servidor junta em cada lote.
+
+Uso:
+    python -m benchmarks.carga_servico --iniciar [-c 32] [-r 200] [-k 16]
+    python -m benchmarks.carga_servico --host 127.0.0.1 --porta 8080 ...
+
+Com --iniciar, o servidor é criado no mesmo processo, numa porta livre do
+loopback; sem ele, o servidor já deve estar rodando. O AFD de teste é
+registrado a partir de --regex e as respostas são conferidas com um AFD
+construído localmente.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from construcao import afd_de_regex
+from servico import Servico
+
+
+async def _requisitar(leitor, escritor, metodo, caminho, corpo=None):
+    dados = b'' if corpo is None else json.dumps(corpo).encode('utf-8')
+    escritor.write((f"{metodo} {caminho} HTTP/1.1\r\nHost: localhost\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(dados)}\r\n\r\n"
+                    ).encode('latin-1') + dados)
+    await escritor.drain()
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        chave, _, valor = linha.decode('latin-1').partition(':')
+        if chave.strip().lower() == 'content-length':
+            tamanho = int(valor)
+    return status, json.loads(await leitor.readexactly(tamanho))
+
+
+async def _conexao(host, porta, nome, lotes, latencias, referencia):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    erros = 0
+    try:
+        for cadeias in lotes:
+            inicio = time.perf_counter()
+            status, resposta = await _requisitar(leitor, escritor, 'POST', f'/afds/{nome}/aceita',
+                                                 {'cadeias': cadeias})
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200 or resposta['aceitas'] != [referencia.aceita(c) for c in cadeias]:
+                erros += 1
+    finally:
+        escritor.close()
+        await escritor.wait_closed()
+    return erros
+
+
+async def executar(host, porta, conexoes, requisicoes, cadeias_por_requisicao,
+                   tamanho, expressao, alfabeto, semente=0):
+    rng = random.Random(semente)
+    referencia = afd_de_regex(expressao, alfabeto)
+    simbolos = sorted(referencia.alfabeto)
+    nome = 'carga'
+
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    status, resposta = await _requisitar(leitor, escritor, 'POST', '/afds',
+                                         {'nome': nome, 'regex': expressao, 'alfabeto': alfabeto})
+    if status != 201:
+        raise RuntimeError(f"Não foi possível registrar o AFD: {resposta}")
+
+    def cadeia():
+        return ''.join(rng.choice(simbolos) for _ in range(rng.randint(0, tamanho)))
+
+    trabalho = [[[cadeia() for _ in range(cadeias_por_requisicao)] for _ in range(requisicoes)]
+                for _ in range(conexoes)]
+    latencias = []
+    inicio = time.perf_counter()
+    erros = await asyncio.gather(*(_conexao(host, porta, nome, lotes, latencias, referencia)
+                                   for lotes in trabalho))
+    segundos = time.perf_counter() - inicio
+
+    _, estatisticas = await _requisitar(leitor, escritor, 'GET', '/estatisticas')
+    escritor.close()
+    await escritor.wait_closed()
+    latencias.sort()
+    total = conexoes * requisicoes
+    return {
+        'requisicoes': total,
+        'erros': sum(erros),
+        'segundos': segundos,
+        'requisicoes_por_segundo': total / segundos,
+        'cadeias_por_segundo': total * cadeias_por_requisicao / segundos,
+        'latencia_ms': {
+            'p50': 1000 * statistics.median(latencias),
+            'p95': 1000 * latencias[int(0.95 * (len(latencias) - 1))],
+            'p99': 1000 * latencias[int(0.99 * (len(latencias) - 1))],
+            'max': 1000 * latencias[-1],
+        },
+        'servidor': estatisticas,
+    }
+
+
+async def _principal(args):
+    servico = servidor = None
+    host, porta = args.host, args.porta
+    if args.iniciar:
+        servico = Servico(args.processos, args.janela / 1000)
+        servidor = await servico.iniciar('127.0.0.1', 0)
+        host, porta = servidor.sockets[0].getsockname()[:2]
+    try:
+        return await executar(host, porta, args.conexoes, args.requisicoes, args.cadeias,
+                              args.tamanho, args.regex, args.alfabeto)
+    finally:
+        if servico is not None:
+            await servico.parar(servidor)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servico.py.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('--iniciar', action='store_true',
+                        help="inicia o servidor neste processo, numa porta livre")
+    parser.add_argument('-j', '--processos', type=int, default=None,
+                        help="processos de trabalho do servidor iniciado com --iniciar")
+    parser.add_argument('--janela', type=float, default=2.0,
+                        help="janela de agrupamento (ms) do servidor iniciado com --iniciar")
+    parser.add_argument('-c', '--conexoes', type=int, default=32)
+    parser.add_argument('-r', '--requisicoes', type=int, default=200, help="requisições por conexão")
+    parser.add_argument('-k', '--cadeias', type=int, default=16, help="cadeias por requisição")
+    parser.add_argument('--tamanho', type=int, default=32, help="tamanho máximo das cadeias")
+    parser.add_argument('--regex', default='(a|b)*abb(a|b)*')
+    parser.add_argument('--alfabeto', default='ab')
+    args = parser.parse_args(argv)
+
+    resultado = asyncio.run(_principal(args))
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import random
+from array import array
+
+from AFD import AFD, AFDCompacto, TabelaAFD
+
+
+# ===== Geradores de AFDs sintéticos para benchmarks =====
+
+def afd_aleatorio(n, alfabeto='ab', semente=0, completo=True, prob_final=0.5):
+    """
+    AFD aleatório com n estados (q0..q{n-1}) sobre o alfabeto dado.
+    Se completo=False, cada transição é omitida com probabilidade 1/4.
+    """
+    rng = random.Random(semente)
+    afd = AFD(alfabeto)
+    nomes = [f'q{i}' for i in range(n)]
+    afd.estados.update(nomes)
+    afd.incial = nomes[0]
+    afd.finais = {nome for nome in nomes if rng.random() < prob_final}
+    for nome in nomes:
+        for simbolo in alfabeto:
+            if completo or rng.random() >= 0.25:
+                afd.transicoes[(nome, simbolo)] = nomes[rng.randrange(n)]
+    return afd
+
+
+def afd_parcial(n, alfabeto='ab', semente=0, prob_final=0.5):
+    # Mesmo que afd_aleatorio, mas com ~1/4 das transições ausentes
+    return afd_aleatorio(n, alfabeto, semente, completo=False, prob_final=prob_final)
+
+
+def sequencia_de_bruijn(m):
+    # Sequência de de Bruijn binária de ordem m (comprimento 2**m)
+    a = [0] * (m + 1)
+    sequencia = []
+
+    def gerar(t, p):
+        if t > m:
+            if m % p == 0:
+                sequencia.extend(a[1:p + 1])
+        else:
+            a[t] = a[t - p]
+            gerar(t + 1, p)
+            for j in range(a[t - p] + 1, 2):
+                a[t] = j
+                gerar(t + 1, t)
+
+    gerar(1, 1)
+    return sequencia
+
+
+def afd_hopcroft_pior_caso(n, semente=0):
+    """
+    Família de pior caso do Hopcroft (Berstel e Carton): ciclo unário de n
+    estados cujos finais seguem uma sequência de de Bruijn. O AFD já é
+    mínimo, mas o refinamento precisa de Θ(n log n) passos para provar isso.
+    semente é ignorada; existe só para manter a assinatura dos geradores.
+    """
+    m = max(1, (n - 1).bit_length())
+    bits = sequencia_de_bruijn(m)
+    afd = AFD('a')
+    nomes = [f'q{i}' for i in range(n)]
+    afd.estados.update(nomes)
+    afd.incial = nomes[0]
+    afd.finais = {nomes[i] for i in range(n) if bits[i % len(bits)]}
+    for i in range(n):
+        afd.transicoes[(nomes[i], 'a')] = nomes[(i + 1) % n]
+    return afd
+
+
+def afd_termina_com(palavra, alfabeto='ab'):
+    # AFD (KMP) das cadeias que terminam com palavra: estado i = prefixo lido
+    m = len(palavra)
+    afd = AFD(alfabeto)
+    nomes = [f'p{i}' for i in range(m + 1)]
+    afd.estados.update(nomes)
+    afd.incial = nomes[0]
+    afd.finais = {nomes[m]}
+    falha = 0
+    for i in range(m + 1):
+        for simbolo in alfabeto:
+            if i < m and palavra[i] == simbolo:
+                destino = i + 1
+            elif i == 0:
+                destino = 0
+            else:
+                destino = int(afd.transicoes[(nomes[falha], simbolo)][1:])
+            afd.transicoes[(nomes[i], simbolo)] = nomes[destino]
+        if 0 < i < m:
+            falha = int(afd.transicoes[(nomes[falha], palavra[i])][1:])
+    return afd
+
+
+def afds_pequenos(quantidade, tamanho=8, alfabeto='ab', semente=0):
+    """
+    Lista de AFDs pequenos "termina com w", um por palavra aleatória de
+    comprimento tamanho. A união deles tem no máximo quantidade*tamanho+1
+    estados alcançáveis (os nós da trie das palavras).
+    """
+    rng = random.Random(semente)
+    return [afd_termina_com(''.join(rng.choice(alfabeto) for _ in range(tamanho)), alfabeto)
+            for _ in range(quantidade)]
+
+
+def afd_uniao_pequenos(n, alfabeto='ab', semente=0, quantidade=16):
+    # União de quantidade AFDs "termina com w", com cerca de n estados no total
+    afds = afds_pequenos(quantidade, max(1, n // quantidade), alfabeto, semente)
+    return afds[0].uniao_varios(afds)
+
+
+def afd_arvore(n, alfabeto='acgt', semente=0, prob_final=0.3):
+    """
+    AFDCompacto em forma de árvore (uma trie) com n estados: cada estado
+    novo vira filho de um estado anterior sorteado, por um símbolo livre.
+    As folhas são finais; os demais estados, com probabilidade prob_final.
+    Montado direto na tabela densa, para chegar a milhões de estados.
+    """
+    rng = random.Random(semente)
+    k = len(alfabeto)
+    delta = array('i', [-1]) * (n * k)
+    folha = bytearray([1]) * n
+    for q in range(1, n):
+        while True:
+            i = rng.randrange(q) * k + rng.randrange(k)
+            if delta[i] < 0:
+                break
+        delta[i] = q
+        folha[i // k] = 0
+    finais = bytearray((n + 7) // 8)
+    for q in range(n):
+        if folha[q] or rng.random() < prob_final:
+            finais[q >> 3] |= 1 << (q & 7)
+    tab = TabelaAFD([f'q{i}' for i in range(n)], list(alfabeto), delta, finais, 0 if n else -1)
+    return AFDCompacto(tab, alfabeto)
+
+
+# Famílias usadas pela suíte: nome -> gerador(n, semente)
+FAMILIAS = {
+    'aleatorio_completo': lambda n, semente: afd_aleatorio(n, semente=semente),
+    'aleatorio_parcial': lambda n, semente: afd_parcial(n, semente=semente),
+    'hopcroft_pior_caso': afd_hopcroft_pior_caso,
+    'uniao_pequenos': lambda n, semente: afd_uniao_pequenos(n, semente=semente),
+}
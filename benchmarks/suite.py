@@ -0,0 +1,212 @@
+"""
+Suíte de benchmarks: mede tempo e pico de memória (tracemalloc) de cada
+operação do AFD, para cada família de AFDs sintéticos (ver
+geradores.FAMILIAS), em tamanhos de 10^2 a 10^6 estados. O resultado é um
+JSON que pode ser comparado com o de outro commit.
+
+Uso:
+    python -m benchmarks.suite [-n 100 1000 ...] [-f familia ...]
+                               [-p operacao ...] [-o resultado.json]
+                               [--limite SEGUNDOS] [--sem-memoria]
+    python -m benchmarks.suite --comparar antes.json depois.json
+
+Quando uma operação passa de --limite segundos num tamanho, os tamanhos
+maiores dessa família são pulados para ela.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from AFD import AFD
+from benchmarks.geradores import FAMILIAS, afd_aleatorio
+
+TAMANHOS = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+TAMANHO_CADEIA = 10 ** 5
+
+
+# ===== Operações medidas =====
+# Cada preparação recebe o AFD gerado e uma pasta temporária e devolve a
+# função sem argumentos que é cronometrada (a preparação não entra na medida).
+
+def _minimizar(afd, pasta):
+    def executar():
+        with contextlib.redirect_stdout(io.StringIO()):
+            afd.minimizar_hopcroft()
+    return executar
+
+
+def _equivalencia(afd, pasta):
+    copia = afd.tabela().para_afd(afd.alfabeto)
+    return lambda: afd.testar_equivalencia(afd, copia)
+
+
+def _estados_equivalentes(afd, pasta):
+    return lambda: list(afd.estados_equivalentes())
+
+
+def _produto(afd, pasta):
+    outro = afd_aleatorio(8, afd.alfabeto, semente=1)
+    return lambda: afd.uniao_afds(afd, outro)
+
+
+def _salvar_jflap(afd, pasta):
+    return lambda: AFD.salvar_afd_em_jflap(afd, os.path.join(pasta, 'afd.jff'))
+
+
+def _carregar_jflap(afd, pasta):
+    caminho = os.path.join(pasta, 'entrada.jff')
+    AFD.salvar_afd_em_jflap(afd, caminho)
+    return lambda: AFD.carregar_afd_de_jflap(caminho)
+
+
+def _cadeia(afd):
+    rng = random.Random(0)
+    simbolos = sorted({simbolo for (_, simbolo) in afd.transicoes})
+    return ''.join(rng.choice(simbolos) for _ in range(TAMANHO_CADEIA))
+
+
+def _move(afd, pasta):
+    cadeia = _cadeia(afd)
+
+    def executar():
+        afd.limpaAfd()
+        afd.move(cadeia)
+    return executar
+
+
+def _aceita(afd, pasta):
+    cadeia = _cadeia(afd)
+    return lambda: afd.aceita(cadeia)
+
+
+OPERACOES = {
+    'minimizar_hopcroft': _minimizar,
+    'testar_equivalencia': _equivalencia,
+    'estados_equivalentes': _estados_equivalentes,
+    'produto_afds': _produto,
+    'salvar_jflap': _salvar_jflap,
+    'carregar_jflap': _carregar_jflap,
+    'move': _move,
+    'aceita': _aceita,
+}
+
+
+# ===== Medição =====
+
+def medir(funcao, memoria=True):
+    # Tempo de uma execução e, numa segunda execução, o pico de memória
+    inicio = time.perf_counter()
+    funcao()
+    segundos = time.perf_counter() - inicio
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcao()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return segundos, pico
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(tamanhos, familias, operacoes, limite=30.0, memoria=True, semente=0):
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        _executar_familias(tamanhos, familias, operacoes, limite, memoria, semente,
+                           pasta, resultados)
+    return {
+        'commit': _commit(),
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': semente,
+        'resultados': resultados,
+    }
+
+
+def _executar_familias(tamanhos, familias, operacoes, limite, memoria, semente, pasta, resultados):
+    for familia in familias:
+        pulados = set()
+        for n in tamanhos:
+            pendentes = [op for op in operacoes if op not in pulados]
+            if not pendentes:
+                break
+            afd = FAMILIAS[familia](n, semente)
+            for operacao in pendentes:
+                segundos, pico = medir(OPERACOES[operacao](afd, pasta), memoria)
+                resultados.append({'familia': familia, 'n': n, 'estados': len(afd.estados),
+                                   'operacao': operacao, 'segundos': segundos,
+                                   'pico_memoria': pico})
+                pico_mb = '-' if pico is None else f'{pico / 2 ** 20:.1f}'
+                print(f'{familia:>20} {n:>8} {operacao:>22} {segundos:10.4f} s {pico_mb:>9} MB',
+                      file=sys.stderr, flush=True)
+                if segundos > limite:
+                    pulados.add(operacao)
+
+
+def comparar(antes, depois):
+    # Razão depois/antes de tempo e memória para cada medida presente nos dois
+    def indexar(relatorio):
+        return {(r['familia'], r['n'], r['operacao']): r for r in relatorio['resultados']}
+
+    a, d = indexar(antes), indexar(depois)
+    print(f"{'família':>20} {'n':>8} {'operação':>22} {'tempo':>8} {'memória':>8}")
+    for chave in sorted(a.keys() & d.keys()):
+        ra, rd = a[chave], d[chave]
+        tempo = rd['segundos'] / ra['segundos'] if ra['segundos'] else float('nan')
+        if ra['pico_memoria'] and rd['pico_memoria'] is not None:
+            mem = f"{rd['pico_memoria'] / ra['pico_memoria']:7.2f}x"
+        else:
+            mem = '-'
+        print(f'{chave[0]:>20} {chave[1]:>8} {chave[2]:>22} {tempo:7.2f}x {mem:>8}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks dos AFDs.")
+    parser.add_argument('-n', '--tamanhos', type=int, nargs='+', default=TAMANHOS)
+    parser.add_argument('-f', '--familias', nargs='+', choices=sorted(FAMILIAS), default=list(FAMILIAS))
+    parser.add_argument('-p', '--operacoes', nargs='+', choices=sorted(OPERACOES), default=list(OPERACOES))
+    parser.add_argument('-o', '--resultado', default=None, help="arquivo JSON de saída")
+    parser.add_argument('--limite', type=float, default=30.0,
+                        help="segundos a partir dos quais os tamanhos maiores são pulados")
+    parser.add_argument('--sem-memoria', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'))
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        with open(args.comparar[0]) as antes, open(args.comparar[1]) as depois:
+            comparar(json.load(antes), json.load(depois))
+        return
+
+    relatorio = executar(args.tamanhos, args.familias, args.operacoes,
+                         args.limite, not args.sem_memoria, args.semente)
+    if args.resultado:
+        with open(args.resultado, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"✅ Resultado salvo em {args.resultado}")
+    else:
+        json.dump(relatorio, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Busca de ocorrências da linguagem L de um AFD dentro de um texto: o AFD
+vira um varredor que encontra as subcadeias texto[inicio:fim] em L numa
+passada da esquerda para a direita.
+
+    import busca
+    busca.buscar(afd, 'texto a varrer')                 # [(inicio, fim), ...]
+    buscador = busca.Buscador(afd, todas=True)
+    for inicio, fim in buscador.ocorrencias(open('log.txt', 'rb')):
+        ...
+
+Duas semânticas:
+* mais longa à esquerda (padrão): a ocorrência de menor início e, entre
+  elas, a de maior fim; a busca continua depois dela, sem sobreposição
+  (uma ocorrência vazia pula um caractere), como no POSIX;
+* todas (todas=True): todo par (inicio, fim) com texto[inicio:fim] em L,
+  em ordem de fim e depois de início.
+
+O varredor é o AFD de Σ*L, determinizado sob demanda: cada estado é a
+tupla dos estados do AFD aparado em que estão as "tentativas" vivas, da
+mais antiga para a mais nova, e a cada posição entra uma tentativa nova no
+inicial. Quando duas tentativas caem no mesmo estado, fica a mais antiga.
+Cada transição guarda de que posição da tupla anterior veio cada
+elemento, então o início de uma tentativa se recupera andando para trás
+pelos estados visitados, só quando há ocorrência; o laço por caractere é
+só a consulta à tabela. Com preguicoso=False a tabela é calculada inteira
+de uma vez (até limite_estados).
+
+Na mais longa, a partir da primeira ocorrência as tentativas mais antigas
+que ela seguem uma a uma até morrerem, e a busca recomeça no fim da
+ocorrência escolhida. Em todas, os inícios de cada fim saem do AFD do
+reverso de L, percorrido para trás a partir do fim.
+
+Posições contam caracteres para str e bytes para bytes (cada byte é o
+símbolo chr(byte)). Em ocorrencias, a fonte pode ser str, bytes, um
+arquivo ou um iterável de blocos, que não devem misturar str e bytes; só
+fica guardado o trecho do texto que ainda pode fazer parte de uma
+ocorrência.
+"""
+from array import array
+
+from AFD import _aparar_tabela, _blocos
+
+_NAO_CALCULADO = -2
+
+
+class _Colunas(dict):
+    # str.translate: símbolo fora do alfabeto vai para a coluna fora
+    def __init__(self, colunas, fora):
+        super().__init__(colunas)
+        self.fora = fora
+
+    def __missing__(self, codigo):
+        return self.fora
+
+
+class Buscador:
+    """
+    Varredor de ocorrências da linguagem de um AFD. Os símbolos do AFD
+    devem ter um caractere cada.
+    """
+
+    def __init__(self, afd, todas=False, preguicoso=True, limite_estados=100000):
+        tab, _, _ = _aparar_tabela(afd.tabela())
+        if any(len(simbolo) != 1 for simbolo in tab.simbolos):
+            raise ValueError("Só AFDs com símbolos de um caractere podem ser usados na busca.")
+        classes, classe = tab.por_classes()
+        self.todas = todas
+        self.limite_estados = limite_estados
+        self._n = n = classes.n
+        self._m = m = classes.k
+        self._delta_l = classes.delta
+        self._inicial = classes.inicial
+        self._final = bytearray(classes.eh_final(q) for q in range(n))
+        self._vazia = not any(self._final)
+        # Coluna m: símbolo fora do alfabeto, que mata todas as tentativas
+        self._tipo = 'B' if m + 1 <= 256 else 'I'
+        self._colunas = {simbolo: classe[c] for c, simbolo in enumerate(tab.simbolos)}
+        if self._tipo == 'B':
+            self._tradutor_str = _Colunas({ord(s): chr(c) for s, c in self._colunas.items()}, chr(m))
+            self._tradutor_bytes = tab.tradutor_bytes(m)
+        else:
+            self._tradutor_bytes = [self._colunas.get(chr(b), m) for b in range(256)]
+        if todas:
+            # pred[q][c]: bitset dos estados que vão para q pela coluna c
+            self._pred = [[0] * m for _ in range(n)]
+            for p in range(n):
+                for c in range(m):
+                    d = self._delta_l[p * m + c]
+                    if d >= 0:
+                        self._pred[d][c] |= 1 << p
+            self._finais_bits = sum(1 << q for q in range(n) if self._final[q])
+        self._limpar()
+        if not preguicoso:
+            self.precalcular()
+
+    # ----- AFD de Σ*L sob demanda -----
+
+    def _limpar(self):
+        self._ids = {}
+        self._estados = []          # id -> tupla de estados do AFD aparado
+        # delta[s * (m + 1) + c]: o destino t, ou -3 - t se t tem tentativa
+        # aceitando; _NAO_CALCULADO se ainda falta
+        self._delta = array('i')
+        self._origens = []          # mesma posição: de onde veio cada elemento (-1: novo)
+        self._primeiro_final = array('i')   # posição do primeiro final na tupla, ou -1
+        self._reverso = {}          # (bitset, coluna) -> bitset, para todas
+        self._inicio = self._registrar((self._inicial,))
+
+    def _registrar(self, tupla):
+        s = self._ids.get(tupla)
+        if s is None:
+            s = self._ids[tupla] = len(self._estados)
+            self._estados.append(tupla)
+            self._delta.extend([_NAO_CALCULADO] * (self._m + 1))
+            self._origens.extend([None] * (self._m + 1))
+            final = self._final
+            self._primeiro_final.append(next((j for j, q in enumerate(tupla) if final[q]), -1))
+        return s
+
+    def _calcular(self, s, c):
+        m, delta_l, inicial = self._m, self._delta_l, self._inicial
+        destinos, origem, vistos = [], [], set()
+        if c < m:
+            for j, q in enumerate(self._estados[s]):
+                d = delta_l[q * m + c]
+                if d >= 0 and d not in vistos:
+                    vistos.add(d)
+                    destinos.append(d)
+                    origem.append(j)
+        if inicial not in vistos:
+            destinos.append(inicial)
+            origem.append(-1)
+        t = self._registrar(tuple(destinos))
+        if self._primeiro_final[t] >= 0:
+            t = -3 - t
+        i = s * (m + 1) + c
+        self._delta[i] = t
+        self._origens[i] = tuple(origem)
+        return t
+
+    def precalcular(self):
+        """
+        Calcula todas as transições alcançáveis do varredor. Retorna False
+        se parou em limite_estados (o resto segue sob demanda).
+        """
+        colunas = self._m + 1
+        s = 0
+        while s < len(self._estados):
+            if len(self._estados) > self.limite_estados:
+                return False
+            for c in range(colunas):
+                if self._delta[s * colunas + c] == _NAO_CALCULADO:
+                    self._calcular(s, c)
+            s += 1
+        return True
+
+    def num_estados(self):
+        # Estados do varredor calculados até agora
+        return len(self._estados)
+
+    def _passo_reverso(self, conjunto, c):
+        chave = (conjunto, c)
+        resultado = self._reverso.get(chave)
+        if resultado is None:
+            resultado = 0
+            if c < self._m:
+                pred, resto = self._pred, conjunto
+                while resto:
+                    menor = resto & -resto
+                    resultado |= pred[menor.bit_length() - 1][c]
+                    resto ^= menor
+            self._reverso[chave] = resultado
+        return resultado
+
+    # ----- Varredura -----
+
+    def _traduzir(self, bloco):
+        # Bloco do texto -> números das colunas
+        if self._tipo == 'B':
+            if isinstance(bloco, str):
+                return bloco.translate(self._tradutor_str).encode('latin-1')
+            return bytes(bloco).translate(self._tradutor_bytes)
+        if isinstance(bloco, str):
+            colunas, fora = self._colunas, self._m
+            return array('I', [colunas.get(ch, fora) for ch in bloco])
+        return array('I', [self._tradutor_bytes[b] for b in bytes(bloco)])
+
+    def buscar(self, texto):
+        # Lista das ocorrências (inicio, fim) em texto (str ou bytes)
+        return list(self.ocorrencias(texto))
+
+    def ocorrencias(self, fonte, tamanho_bloco=1 << 16):
+        """
+        Gera as ocorrências (inicio, fim) numa fonte str, bytes, arquivo
+        ou iterável de blocos, à medida que ficam decididas.
+        """
+        return self._varrer(_blocos(fonte, tamanho_bloco))
+
+    def _varrer(self, blocos):
+        if self._vazia:
+            return
+        blocos = iter(blocos)
+        todas, m = self.todas, self._m
+        colunas = m + 1
+        delta_l, final = self._delta_l, self._final
+        janela = array(self._tipo)  # colunas do texto desde a posição base
+        base = fim = 0
+        # Modo rápido: estado s do varredor em cada posição desde p0
+        # (hist[u] é o estado na posição p0 + u) e o início de cada
+        # elemento do estado em p0
+        s = p0 = 0
+        hist, inicios_base = [], []
+        # Modo lento (mais longa): tentativas (estado, inicio) e a melhor
+        # ocorrência até agora
+        lento, melhor = None, None
+        reiniciar = 0           # posição em que a varredura rápida recomeça
+        pendente = False        # estado atual ainda não conferido
+        delta, origens, primeiro_final = self._delta, self._origens, self._primeiro_final
+
+        def inicios(indices):
+            # Início das tentativas nas posições indices do estado atual
+            resultado = {}
+            atuais = {j: j for j in indices}
+            u = len(hist) - 1
+            while atuais and u > 0:
+                origem = origens[hist[u - 1] * colunas + janela[p0 + u - 1 - base]]
+                proximos = {}
+                for j, i in atuais.items():
+                    if origem[i] < 0:
+                        resultado[j] = p0 + u
+                    else:
+                        proximos[j] = origem[i]
+                atuais = proximos
+                u -= 1
+            for j, i in atuais.items():
+                resultado[j] = inicios_base[i]
+            return [resultado[j] for j in indices]
+
+        while True:
+            if reiniciar is not None:
+                if reiniciar > fim:
+                    bloco = next(blocos, None)
+                    if bloco is None:
+                        return
+                    janela.extend(self._traduzir(bloco))
+                    fim = base + len(janela)
+                    continue
+                p0 = reiniciar
+                s = self._inicio
+                hist, inicios_base = [s], [p0]
+                reiniciar, pendente = None, True
+
+            if lento is None:
+                pos = p0 + len(hist) - 1
+                evento = pendente and primeiro_final[s] >= 0
+                pendente = False
+                if not evento and pos < fim:
+                    with memoryview(janela) as visao:
+                        for c in visao[pos - base:]:
+                            t = delta[s * colunas + c]
+                            if t < 0:
+                                if t == _NAO_CALCULADO:
+                                    t = self._calcular(s, c)
+                                if t < 0:
+                                    s = -3 - t
+                                    hist.append(s)
+                                    evento = True
+                                    break
+                            s = t
+                            hist.append(s)
+                    pos = p0 + len(hist) - 1
+                if evento:
+                    if todas:
+                        # Inicios das ocorrências que terminam em pos, pelo
+                        # AFD do reverso de L
+                        conjunto, p, achados = self._finais_bits, pos, []
+                        bit = 1 << self._inicial
+                        if conjunto & bit:
+                            achados.append(p)
+                        while p > base and conjunto:
+                            conjunto = self._passo_reverso(conjunto, janela[p - 1 - base])
+                            p -= 1
+                            if conjunto & bit:
+                                achados.append(p)
+                        for inicio in reversed(achados):
+                            yield inicio, pos
+                    else:
+                        # Segue só as tentativas até a primeira que aceita
+                        j = primeiro_final[s]
+                        tupla = self._estados[s]
+                        lento = list(zip(tupla[:j + 1], inicios(range(j + 1))))
+                        melhor = (lento[-1][1], pos)
+                    continue
+                # Fim do bloco: guarda os inícios das tentativas vivas e só
+                # o trecho do texto que ainda pode ser preciso
+                bloco = next(blocos, None)
+                if bloco is None:
+                    return
+                tupla = self._estados[s]
+                inicios_base = inicios(range(len(tupla)))
+                p0 = pos
+                if len(self._estados) > self.limite_estados:
+                    self._limpar()
+                    delta, origens = self._delta, self._origens
+                    primeiro_final = self._primeiro_final
+                    s = self._registrar(tupla)
+                hist = [s]
+                corte = inicios_base[0] if todas else pos
+                del janela[:corte - base]
+                base = corte
+                janela.extend(self._traduzir(bloco))
+                fim = base + len(janela)
+                continue
+
+            # Modo lento: as tentativas estão em ordem de início e nenhuma
+            # começa depois da melhor ocorrência
+            with memoryview(janela) as visao:
+                for c in visao[pos - base:]:
+                    pos += 1
+                    novas, vistos = [], set()
+                    if c < m:
+                        for q, inicio in lento:
+                            d = delta_l[q * m + c]
+                            if d >= 0 and d not in vistos:
+                                vistos.add(d)
+                                novas.append((d, inicio))
+                    lento = novas
+                    for j, (q, inicio) in enumerate(lento):
+                        if final[q]:
+                            if inicio < melhor[0]:
+                                del lento[j + 1:]
+                            melhor = (inicio, pos)
+                            break
+                    if not lento:
+                        break
+            if lento:
+                bloco = next(blocos, None)
+                if bloco is not None:
+                    del janela[:melhor[1] - base]
+                    base = melhor[1]
+                    janela.extend(self._traduzir(bloco))
+                    fim = base + len(janela)
+                    continue
+            yield melhor
+            inicio, final_ocorrencia = melhor
+            reiniciar = final_ocorrencia if final_ocorrencia > inicio else final_ocorrencia + 1
+            lento = melhor = None
+
+
+def buscar(afd, texto, todas=False):
+    # Ocorrências da linguagem de afd em texto (str ou bytes)
+    return Buscador(afd, todas=todas).buscar(texto)
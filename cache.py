@@ -0,0 +1,220 @@
+"""
+Cache LRU de resultados de operações sobre AFDs, indexado pela impressão
+digital estrutural (AFD.impressao_digital), que não depende dos nomes dos
+estados. Opcionalmente grava os resultados numa pasta, para reaproveitá-los
+entre execuções.
+
+    cache = CacheAFD(capacidade=256, pasta='cache_afd')
+    m = cache.minimizar(afd)
+    cache.equivalentes(afd1, afd2)
+    print(cache.estatisticas())
+
+Cada operação é calculada sobre a forma canônica dos AFDs (só a parte
+alcançável, ver TabelaAFD.canonica), então o resultado depende apenas das
+impressões digitais (no complemento, também dos símbolos usados só em
+estados inalcançáveis, que vão na chave). AFDs devolvidos são AFDCompacto novos sobre uma
+tabela guardada no cache: alterá-los não afeta o cache, e a impressão
+digital deles já fica calculada, o que torna baratas as operações
+encadeadas.
+"""
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+
+from AFD import AFD, AFDCompacto, TabelaAFD, _minimizar_tabela
+
+# Muda quando a forma canônica ou o formato dos arquivos mudar
+_VERSAO = 2
+
+
+class CacheAFD:
+
+    def __init__(self, capacidade=256, pasta=None):
+        if capacidade < 1:
+            raise ValueError("capacidade deve ser pelo menos 1")
+        self.capacidade = capacidade
+        self.pasta = pasta
+        if pasta is not None:
+            os.makedirs(pasta, exist_ok=True)
+        self._itens = OrderedDict()
+        self.acertos = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.despejos = 0
+
+    # ===== Operações memoizadas =====
+    def minimizar(self, afd):
+        # AFD mínimo (sem estados inalcançáveis), com estados q0, q1, ...
+        return self.memoizar('minimizar', [afd], lambda tab: _minimizar_tabela(tab) or tab)
+
+    def complemento(self, afd):
+        # AFD.complemento_afd completa sobre os símbolos das transições,
+        # inclusive os que só aparecem em estados inalcançáveis, que a forma
+        # canônica perde: esses símbolos entram na chave e no cálculo
+        tab = afd.tabela()
+        extras = tuple(sorted(_simbolos_usados(tab) - _simbolos_usados(tab.canonica())))
+        return self.memoizar('complemento', [tab], lambda t: _complemento(t, extras), extra=extras)
+
+    def uniao(self, afd1, afd2):
+        return self.memoizar('uniao', [afd1, afd2],
+                             lambda t1, t2: _via_afd(t1, AFD.uniao_afds, t2), comutativa=True)
+
+    def intersecao(self, afd1, afd2):
+        return self.memoizar('intersecao', [afd1, afd2],
+                             lambda t1, t2: _via_afd(t1, AFD.intersecao_afds, t2), comutativa=True)
+
+    def diferenca(self, afd1, afd2):
+        return self.memoizar('diferenca', [afd1, afd2],
+                             lambda t1, t2: _via_afd(t1, AFD.diferenca_afds, t2))
+
+    def contraexemplo(self, afd1, afd2):
+        # Menor cadeia que distingue os AFDs, ou None se forem equivalentes
+        return self.memoizar('contraexemplo', [afd1, afd2],
+                             lambda t1, t2: _via_afd(t1, AFD.contraexemplo_equivalencia, t2),
+                             comutativa=True)
+
+    def equivalentes(self, afd1, afd2):
+        return self.contraexemplo(afd1, afd2) is None
+
+    # ===== Núcleo =====
+    def memoizar(self, operacao, afds, calcular, comutativa=False, extra=()):
+        """
+        Resultado de calcular(*tabelas_canonicas) guardado sob a chave
+        (operacao, impressões digitais, *extra). afds podem ser AFDs ou
+        TabelaAFD; extra leva o que, além das formas canônicas, muda o
+        resultado. calcular deve devolver uma TabelaAFD (entregue como
+        AFDCompacto), ou um valor simples serializável em JSON (str, bool,
+        número, None, listas).
+        """
+        tabelas = [afd if isinstance(afd, TabelaAFD) else afd.tabela() for afd in afds]
+        impressoes = [tab.impressao_digital() for tab in tabelas]
+        if comutativa and impressoes[1] < impressoes[0]:
+            tabelas.reverse()
+            impressoes.reverse()
+        chave = (operacao, *impressoes, *extra)
+
+        achou, valor = self._obter(chave)
+        if not achou:
+            self.falhas += 1
+            valor = calcular(*(tab.canonica() for tab in tabelas))
+            if isinstance(valor, TabelaAFD):
+                valor.impressao_digital()
+            self._guardar(chave, valor)
+            self._gravar(chave, valor)
+        return AFDCompacto(valor) if isinstance(valor, TabelaAFD) else valor
+
+    def _obter(self, chave):
+        itens = self._itens
+        if chave in itens:
+            itens.move_to_end(chave)
+            self.acertos += 1
+            return True, itens[chave]
+        achou, valor = self._ler(chave)
+        if achou:
+            self.acertos_disco += 1
+            self._guardar(chave, valor)
+        return achou, valor
+
+    def _guardar(self, chave, valor):
+        itens = self._itens
+        itens[chave] = valor
+        itens.move_to_end(chave)
+        while len(itens) > self.capacidade:
+            itens.popitem(last=False)
+            self.despejos += 1
+
+    # ===== Disco =====
+    def _caminho(self, chave):
+        nome = hashlib.blake2b(repr((_VERSAO, chave)).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.pasta, nome)
+
+    def _ler(self, chave):
+        if self.pasta is None:
+            return False, None
+        base = self._caminho(chave)
+        if os.path.exists(base + '.afdb'):
+            with open(base + '.afdb', 'rb') as arquivo:
+                mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            return True, TabelaAFD.de_buffer(mapa)
+        if os.path.exists(base + '.json'):
+            with open(base + '.json', encoding='utf-8') as arquivo:
+                return True, json.load(arquivo)['valor']
+        return False, None
+
+    def _gravar(self, chave, valor):
+        if self.pasta is None:
+            return
+        base = self._caminho(chave)
+        if isinstance(valor, TabelaAFD):
+            caminho = base + '.afdb'
+            with open(caminho + '.tmp', 'wb') as arquivo:
+                valor.escrever(arquivo)
+        else:
+            caminho = base + '.json'
+            with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+                json.dump({'chave': chave, 'valor': valor}, arquivo, ensure_ascii=False)
+        # Troca atômica: outro processo nunca lê um arquivo pela metade
+        os.replace(caminho + '.tmp', caminho)
+
+    # ===== Estatísticas =====
+    def estatisticas(self):
+        consultas = self.acertos + self.acertos_disco + self.falhas
+        return {
+            'itens': len(self._itens),
+            'capacidade': self.capacidade,
+            'acertos': self.acertos,
+            'acertos_disco': self.acertos_disco,
+            'falhas': self.falhas,
+            'despejos': self.despejos,
+            'taxa_acerto': (self.acertos + self.acertos_disco) / consultas if consultas else 0.0,
+        }
+
+    def limpar(self):
+        # Esvazia a memória (os arquivos em disco continuam valendo)
+        self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
+
+
+def _simbolos_usados(tab):
+    # Símbolos com alguma transição definida na tabela
+    k = tab.k
+    return {simbolo for c, simbolo in enumerate(tab.simbolos)
+            if tab.n and max(tab.delta[c::k]) >= 0}
+
+
+def _complemento(tab, extras):
+    """
+    Complemento da tabela canônica como em AFD.complemento_afd: completa
+    com um estado morto sobre os símbolos usados mais extras e inverte os
+    finais.
+    """
+    simbolos = sorted(_simbolos_usados(tab) | set(extras))
+    if tab.inicial < 0:
+        return TabelaAFD([], simbolos, array('i'), bytearray(), -1)
+    n, k = tab.n, len(simbolos)
+    colunas = [tab.coluna.get(simbolo) for simbolo in simbolos]
+    morto = n
+    delta = array('i', [morto]) * ((n + 1) * k)
+    for q in range(n):
+        base = q * tab.k
+        for j, c in enumerate(colunas):
+            if c is not None and tab.delta[base + c] >= 0:
+                delta[q * k + j] = tab.delta[base + c]
+    finais = bytearray((n + 8) // 8)
+    for q in range(n + 1):
+        if q == morto or not tab.eh_final(q):
+            finais[q >> 3] |= 1 << (q & 7)
+    # canonica descarta o morto se nenhuma transição foi para ele
+    return TabelaAFD(list(tab.nomes) + ['__dead__'], simbolos, delta, finais, tab.inicial).canonica()
+
+
+def _via_afd(tab, operacao, *outras):
+    # Aplica uma operação da classe AFD sobre tabelas; AFDs viram tabelas
+    afds = [AFDCompacto(t) for t in (tab, *outras)]
+    resultado = operacao(afds[0], *afds)
+    return resultado.tabela() if isinstance(resultado, AFD) else resultado
@@ -0,0 +1,158 @@
+"""
+Compila um AFD num módulo Python especializado, com uma função
+aceita(cadeia) -> bool bem mais rápida que move/aceita para testar muitas
+cadeias contra um AFD fixo.
+
+    import compilador
+    aceita = compilador.compilar(afd, pasta='afds_compilados')
+    aceita('abba')
+
+O código gerado:
+* troca cada símbolo pelo número da sua classe (símbolos com colunas
+  iguais em delta dividem uma coluna, TabelaAFD.classes_colunas) com um
+  único str.translate, e percorre os bytes resultantes; símbolos fora do
+  alfabeto vão para uma coluna extra, que leva ao estado morto;
+* representa cada estado por uma lista cujas posições são diretamente as
+  listas dos estados de destino, então o laço interno é só "t = t[c]", sem
+  dicionário, tupla ou aritmética; a última posição diz se o estado é final.
+
+O código é gerado a partir da forma canônica do AFD (TabelaAFD.canonica),
+então depende só da impressão digital. Com pasta, o módulo é gravado como
+afd_<impressão>.py e importado de lá: a próxima compilação do mesmo AFD
+(mesmo em outra execução) só importa o módulo. A tabela vai no módulo
+como um literal hexadecimal, que o Python compila quase de graça.
+"""
+import importlib.util
+import os
+from array import array
+
+from AFD import _little_endian
+
+_compilados = {}    # impressão digital -> função aceita
+
+_MODELO = '''\
+# Gerado por compilador.py a partir do AFD de impressão digital {impressao}.
+# Não edite: o nome do arquivo identifica o AFD.
+import sys
+from array import array
+
+N = {n}                 # estados; o estado N é o morto
+K = {k}                 # colunas (classes de símbolos); a K - 1 é "fora do alfabeto"
+SIMBOLOS = {simbolos!r}
+INICIAL = {inicial}
+# Bitset dos finais e delta[q * K + c] (int32 little-endian) em hexadecimal,
+# que compilam muito mais rápido que tuplas literais grandes
+FINAIS = bytes.fromhex({finais!r})
+DELTA = array('i', bytes.fromhex({delta!r}))
+if sys.byteorder == 'big':
+    DELTA.byteswap()
+
+
+class _Colunas(dict):
+    # str.translate: símbolo fora do alfabeto vai para a última coluna
+    def __missing__(self, codigo):
+        return {fora!r}
+
+
+def _estados():
+    # Cada estado é uma lista: posição c = lista do destino pela coluna c,
+    # posição K = se é final
+    linhas = [[False] * (K + 1) for _ in range(N + 1)]
+    for q, linha in enumerate(linhas):
+        base = q * K
+        for c in range(K):
+            linha[c] = linhas[DELTA[base + c]]
+    for q in range(N):
+        if FINAIS[q >> 3] & (1 << (q & 7)):
+            linhas[q][K] = True
+    return linhas[INICIAL]
+
+
+def aceita(cadeia, _colunas=_Colunas({colunas!r}), _inicial=_estados()):
+    t = _inicial
+    for c in {percurso}:
+        t = t[c]
+    return t[{k}]
+'''
+
+
+def fonte(afd):
+    """
+    Código-fonte do módulo gerado para afd. Os símbolos do AFD devem ter
+    um caractere cada.
+    """
+    return _fonte(afd.tabela().canonica())
+
+
+def _fonte(tab):
+    if any(len(simbolo) != 1 for simbolo in tab.simbolos):
+        raise ValueError("Só AFDs com símbolos de um caractere podem ser compilados.")
+    classes, classe = tab.por_classes()
+    n, m = tab.n, classes.k
+    colunas = m + 1
+    morto = n
+    # Tabela completa: coluna extra e linha do morto levam ao morto
+    delta = array('i', [morto]) * ((n + 1) * colunas)
+    for q in range(n):
+        base = q * colunas
+        linha = classes.delta[q * m:(q + 1) * m]
+        for j in range(m):
+            if linha[j] >= 0:
+                delta[base + j] = linha[j]
+    if colunas <= 256:
+        # Colunas cabem num byte: percorre o bytes de latin-1 direto
+        percurso = "cadeia.translate(_colunas).encode('latin-1')"
+    else:
+        percurso = "memoryview(cadeia.translate(_colunas).encode('utf-32-le')).cast('I')"
+    return _MODELO.format(
+        impressao=tab.impressao_digital(),
+        n=n, k=colunas,
+        simbolos=''.join(tab.simbolos),
+        inicial=tab.inicial if tab.inicial >= 0 else morto,
+        finais=bytes(tab.finais).hex(),
+        delta=_little_endian(delta).hex(),
+        fora=chr(m),
+        colunas={ord(simbolo): chr(classe[c]) for c, simbolo in enumerate(tab.simbolos)},
+        percurso=percurso,
+    )
+
+
+def compilar(afd, pasta=None):
+    """
+    Função aceita(cadeia) -> bool equivalente a afd.aceita. Sem pasta, o
+    código é compilado em memória; com pasta, o módulo gerado fica em
+    disco e é reaproveitado pela impressão digital.
+    """
+    tab = afd.tabela().canonica()
+    impressao = tab.impressao_digital()
+    aceita = _compilados.get(impressao)
+    if aceita is not None:
+        return aceita
+    if pasta is None:
+        espaco = {'__name__': f'afd_{impressao}'}
+        exec(compile(_fonte(tab), f'<afd {impressao}>', 'exec'), espaco)
+        aceita = espaco['aceita']
+    else:
+        aceita = _importar(tab, impressao, pasta)
+    _compilados[impressao] = aceita
+    return aceita
+
+
+def _importar(tab, impressao, pasta):
+    nome = f'afd_{impressao}'
+    caminho = os.path.join(pasta, nome + '.py')
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(_fonte(tab))
+        os.replace(temporario, caminho)
+    especificacao = importlib.util.spec_from_file_location(nome, caminho)
+    modulo = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(modulo)
+    return modulo.aceita
+
+
+def limpar():
+    # Esquece as funções já compiladas nesta execução (o disco fica)
+    _compilados.clear()
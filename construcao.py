@@ -0,0 +1,418 @@
+"""
+Construção de AFDs mínimos direto da descrição da linguagem, sem passar
+por um autômato maior que depois precisaria de minimizar_hopcroft.
+
+* afd_de_palavras: lista ordenada de palavras, pelo algoritmo incremental
+  de Daciuk–Mihov. O autômato fica mínimo a cada palavra inserida; só o
+  caminho da última palavra ainda não está registrado, então a trie
+  completa nunca existe na memória.
+* afd_de_regex: expressão regular, pelas derivadas de Brzozowski. Cada
+  estado do AFD é uma derivada da expressão (normalizada por
+  associatividade, comutatividade e idempotência da união), criada só
+  quando alguma transição chega nela; no fim o AFD passa pelo refinamento
+  de partições, que é barato nesse tamanho.
+
+Sintaxe das expressões: símbolos comuns, '|' (união), concatenação,
+'*', '+', '?', parênteses, classes '[abc]' / '[a-z]', '.' (qualquer
+símbolo do alfabeto), 'ε' (cadeia vazia) e '\\' para escapar um
+caractere especial.
+"""
+from array import array
+
+from AFD import AFDCompacto, TabelaAFD, _minimizar_tabela
+
+
+def _resultado(tab, Alfabeto, compacto):
+    if compacto:
+        return AFDCompacto(tab, Alfabeto)
+    return tab.para_afd(Alfabeto)
+
+
+# ===== Lista de palavras (Daciuk–Mihov) =====
+
+def _com_sentinela(palavras):
+    # As palavras seguidas de None, que marca o fim da entrada
+    yield from palavras
+    yield None
+
+def afd_de_palavras(palavras, Alfabeto=None, compacto=False):
+    """
+    AFD mínimo que aceita exatamente as palavras dadas, que precisam vir em
+    ordem crescente (repetições são ignoradas). Com compacto=True retorna
+    um AFDCompacto, que ocupa bem menos memória em dicionários grandes.
+    """
+    # Um estado registrado é representado só pela assinatura
+    # (final, (símbolo, filho), ...), com os filhos já registrados. Os
+    # estados do caminho da última palavra são listas [final, itens] ainda
+    # abertas: o filho seguinte no caminho entra em itens quando for
+    # registrado.
+    assinaturas = []        # id -> assinatura
+    registro = {}           # assinatura -> id
+    caminho = [[0, []]]
+    anterior = ''
+    primeira = True
+
+    for palavra in _com_sentinela(palavras):
+        if palavra is None:
+            profundidade = 0
+        else:
+            if not primeira and palavra <= anterior:
+                if palavra == anterior:
+                    continue
+                raise ValueError(f"Palavras fora de ordem: {anterior!r} antes de {palavra!r}.")
+            primeira = False
+            # Tamanho do prefixo comum com a palavra anterior
+            profundidade = 0
+            limite = min(len(palavra), len(anterior))
+            while profundidade < limite and palavra[profundidade] == anterior[profundidade]:
+                profundidade += 1
+
+        # Registra (ou troca por um equivalente já registrado) os estados do
+        # caminho abaixo do prefixo comum, do mais fundo para o mais raso.
+        # Os filhos entram em ordem de símbolo porque as palavras vêm
+        # ordenadas, então a assinatura já sai canônica.
+        while len(caminho) - 1 > profundidade:
+            final, itens = caminho.pop()
+            assinatura = (final, *itens)
+            q = registro.get(assinatura)
+            if q is None:
+                q = registro[assinatura] = len(assinaturas)
+                assinaturas.append(assinatura)
+            caminho[-1][1].append((anterior[len(caminho) - 1], q))
+        if palavra is None:
+            break
+
+        for _ in range(len(palavra) - profundidade):
+            caminho.append([0, []])
+        caminho[-1][0] = 1
+        anterior = palavra
+
+    # A raiz nunca é equivalente a outro estado (é o único com as palavras
+    # mais longas), então recebe um id próprio
+    final, itens = caminho[0]
+    raiz = len(assinaturas)
+    assinaturas.append((final, *itens))
+
+    # Numera os estados em largura a partir da raiz e monta a tabela densa
+    simbolos = sorted({simbolo for assinatura in assinaturas for simbolo, _ in assinatura[1:]})
+    coluna = {simbolo: c for c, simbolo in enumerate(simbolos)}
+    k = len(simbolos)
+    n = len(assinaturas)
+    ordem = [raiz]
+    novo_id = array('i', [-1]) * n
+    novo_id[raiz] = 0
+    delta = array('i', [-1]) * (n * k)
+    finais = bytearray((n + 7) // 8)
+    for i, q in enumerate(ordem):  # ordem cresce durante a busca
+        assinatura = assinaturas[q]
+        if assinatura[0]:
+            finais[i >> 3] |= 1 << (i & 7)
+        base = i * k
+        for simbolo, destino in assinatura[1:]:
+            d = novo_id[destino]
+            if d < 0:
+                d = novo_id[destino] = len(ordem)
+                ordem.append(destino)
+            delta[base + coluna[simbolo]] = d
+    tab = TabelaAFD([f'q{i}' for i in range(n)], simbolos, delta, finais, 0)
+    return _resultado(tab, ''.join(simbolos) if Alfabeto is None else Alfabeto, compacto)
+
+
+# ===== Expressões regulares (derivadas de Brzozowski) =====
+
+# Tipos de nó da expressão. _OPCIONAIS é x?x?...x? (k vezes, k >= 2)
+# para uma classe x: (_OPCIONAIS, classe, k)
+_VAZIO, _EPS, _CLASSE, _CONCAT, _UNIAO, _ESTRELA, _OPCIONAIS = range(7)
+
+
+class _Expressoes:
+    """
+    Nós de expressão regular internados: cada nó é um inteiro e nós
+    estruturalmente iguais têm o mesmo id, então comparar e usar como
+    chave de dicionário custa O(1). Os construtores já simplificam
+    (∅·r = ∅, ε·r = r, r|r = r, r** = r*, ...), o que mantém finito o
+    número de derivadas distintas. Uma sequência x?x?...x? de uma mesma
+    classe x vira um único nó _OPCIONAIS: como derivada de x{0,k} é
+    x{0,k-1}, os estados não acumulam uniões de todos os sufixos.
+    """
+
+    def __init__(self):
+        self.nos = []
+        self._ids = {}
+        self._anulavel = []
+        self._derivadas = {}
+        self.vazio = self._internar((_VAZIO, None, None), False)
+        self.eps = self._internar((_EPS, None, None), True)
+
+    def _internar(self, no, anulavel):
+        r = self._ids.get(no)
+        if r is None:
+            r = self._ids[no] = len(self.nos)
+            self.nos.append(no)
+            self._anulavel.append(anulavel)
+        return r
+
+    def anulavel(self, r):
+        return self._anulavel[r]
+
+    def classe(self, simbolos):
+        if not simbolos:
+            return self.vazio
+        return self._internar((_CLASSE, frozenset(simbolos), None), False)
+
+    def concat(self, r, s):
+        return self.sequencia((r, s))
+
+    def sequencia(self, fatores):
+        """
+        Concatenação dos fatores, aninhada à direita: a·(b·(c·...)). A
+        cabeça de um nó CONCAT nunca é CONCAT, então só os fatores antes do
+        último precisam ser achatados; a dobra é iterativa, sem recursão
+        proporcional ao tamanho da expressão.
+        """
+        cabecas = []
+        for r in fatores[:-1]:
+            while self.nos[r][0] == _CONCAT:
+                _, a, r = self.nos[r]
+                cabecas.append(a)
+            cabecas.append(r)
+        s = fatores[-1]
+        if s == self.vazio or self.vazio in cabecas:
+            return self.vazio
+        anulavel = self._anulavel
+        for r in reversed(cabecas):
+            if r == self.eps:
+                continue
+            if s == self.eps:
+                s = r
+                continue
+            # x{0,i}·x{0,j}·resto = x{0,i+j}·resto
+            opcional = self._opcional(r)
+            if opcional is not None:
+                tipo, cabeca, resto = self.nos[s]
+                if tipo != _CONCAT:
+                    cabeca, resto = s, self.eps
+                seguinte = self._opcional(cabeca)
+                if seguinte is not None and seguinte[0] == opcional[0]:
+                    r = self._internar((_OPCIONAIS, opcional[0], opcional[1] + seguinte[1]), True)
+                    s = resto
+                    if s == self.eps:
+                        s = r
+                        continue
+            s = self._internar((_CONCAT, r, s), anulavel[r] and anulavel[s])
+        return s
+
+    def _opcional(self, r):
+        # (classe, k) se r é x{0,k} para uma classe x, senão None
+        tipo, a, b = self.nos[r]
+        if tipo == _OPCIONAIS:
+            return a, b
+        if tipo == _UNIAO and len(a) == 2 and self.eps in a:
+            x = next(m for m in a if m != self.eps)
+            if self.nos[x][0] == _CLASSE:
+                return x, 1
+        return None
+
+    def uniao(self, *partes):
+        membros = set()
+        for r in partes:
+            tipo, a, _ = self.nos[r]
+            if tipo == _UNIAO:
+                membros.update(a)
+            elif r != self.vazio:
+                membros.add(r)
+        if not membros:
+            return self.vazio
+        if len(membros) == 1:
+            return membros.pop()
+        membros = frozenset(membros)
+        return self._internar((_UNIAO, membros, None), any(self._anulavel[r] for r in membros))
+
+    def estrela(self, r):
+        if r == self.vazio or r == self.eps:
+            return self.eps
+        if self.nos[r][0] == _ESTRELA:
+            return r
+        return self._internar((_ESTRELA, r, None), True)
+
+    def derivada(self, r, simbolo):
+        chave = (r, simbolo)
+        d = self._derivadas.get(chave)
+        if d is not None:
+            return d
+        tipo, a, b = self.nos[r]
+        if tipo == _CLASSE:
+            d = self.eps if simbolo in a else self.vazio
+        elif tipo == _CONCAT:
+            # Enquanto a cabeça é anulável a derivada passa para o resto da
+            # cadeia: percorre os sufixos sem recursão até um já derivado
+            # (ou que não é CONCAT) e deriva do último para o primeiro
+            sufixos = [r]
+            while (self._anulavel[a] and self.nos[b][0] == _CONCAT
+                   and (b, simbolo) not in self._derivadas):
+                sufixos.append(b)
+                _, a, b = self.nos[b]
+            for t in reversed(sufixos):
+                _, a, b = self.nos[t]
+                d = self.concat(self.derivada(a, simbolo), b)
+                if self._anulavel[a]:
+                    d = self.uniao(d, self.derivada(b, simbolo))
+                self._derivadas[(t, simbolo)] = d
+        elif tipo == _UNIAO:
+            d = self.uniao(*(self.derivada(m, simbolo) for m in a))
+        elif tipo == _ESTRELA:
+            d = self.concat(self.derivada(a, simbolo), r)
+        elif tipo == _OPCIONAIS:
+            if simbolo not in self.nos[a][1]:
+                d = self.vazio
+            elif b == 2:
+                d = self.uniao(a, self.eps)
+            else:
+                d = self._internar((_OPCIONAIS, a, b - 1), True)
+        else:
+            d = self.vazio
+        self._derivadas[chave] = d
+        return d
+
+
+class _LeitorRegex:
+    # Analisador descendente recursivo: uniao -> concat ('|' concat)*, etc.
+
+    def __init__(self, texto, expressoes, alfabeto):
+        self.texto = texto
+        self.i = 0
+        self.ex = expressoes
+        self.alfabeto = alfabeto
+
+    def erro(self, mensagem):
+        raise ValueError(f"Expressão regular inválida na posição {self.i}: {mensagem}")
+
+    def ler(self):
+        r = self.uniao()
+        if self.i < len(self.texto):
+            self.erro(f"'{self.texto[self.i]}' inesperado")
+        return r
+
+    def uniao(self):
+        partes = [self.concat()]
+        while self.i < len(self.texto) and self.texto[self.i] == '|':
+            self.i += 1
+            partes.append(self.concat())
+        return self.ex.uniao(*partes)
+
+    def concat(self):
+        fatores = [self.ex.eps]
+        while self.i < len(self.texto) and self.texto[self.i] not in '|)':
+            fatores.append(self.posfixo())
+        return self.ex.sequencia(fatores)
+
+    def posfixo(self):
+        r = self.atomo()
+        while self.i < len(self.texto) and self.texto[self.i] in '*+?':
+            operador = self.texto[self.i]
+            self.i += 1
+            if operador == '*':
+                r = self.ex.estrela(r)
+            elif operador == '+':
+                r = self.ex.concat(r, self.ex.estrela(r))
+            else:
+                r = self.ex.uniao(r, self.ex.eps)
+        return r
+
+    def atomo(self):
+        c = self.texto[self.i]
+        self.i += 1
+        if c == '(':
+            r = self.uniao()
+            if self.i >= len(self.texto) or self.texto[self.i] != ')':
+                self.erro("falta ')'")
+            self.i += 1
+            return r
+        if c == '[':
+            return self.ex.classe(self.conjunto())
+        if c == '.':
+            return self.ex.classe(self.alfabeto)
+        if c == 'ε':
+            return self.ex.eps
+        if c == '\\':
+            return self.ex.classe({self.escapado()})
+        if c in '*+?)':
+            self.erro(f"'{c}' sem operando")
+        return self.ex.classe({c})
+
+    def escapado(self):
+        if self.i >= len(self.texto):
+            self.erro("'\\' no final da expressão")
+        self.i += 1
+        return self.texto[self.i - 1]
+
+    def conjunto(self):
+        simbolos = set()
+        while self.i < len(self.texto) and self.texto[self.i] != ']':
+            c = self.texto[self.i]
+            self.i += 1
+            if c == '\\':
+                c = self.escapado()
+            if (self.i + 1 < len(self.texto) and self.texto[self.i] == '-'
+                    and self.texto[self.i + 1] != ']'):
+                self.i += 1
+                fim = self.texto[self.i]
+                self.i += 1
+                if fim == '\\':
+                    fim = self.escapado()
+                if ord(fim) < ord(c):
+                    self.erro(f"intervalo invertido {c}-{fim}")
+                simbolos.update(chr(x) for x in range(ord(c), ord(fim) + 1))
+            else:
+                simbolos.add(c)
+        if self.i >= len(self.texto):
+            self.erro("falta ']'")
+        self.i += 1
+        return simbolos
+
+
+def _simbolos_da_regex(texto):
+    # Símbolos que aparecem literalmente (inclusive em classes e intervalos)
+    ex = _Expressoes()
+    leitor = _LeitorRegex(texto, ex, frozenset())
+    leitor.ler()
+    simbolos = set()
+    for tipo, a, _ in ex.nos:
+        if tipo == _CLASSE:
+            simbolos |= a
+    return simbolos
+
+
+def afd_de_regex(expressao, Alfabeto=None, compacto=False):
+    """
+    AFD mínimo da expressão regular. O alfabeto é o dos símbolos que
+    aparecem na expressão, mais os de Alfabeto (usado também por '.').
+    """
+    alfabeto = frozenset(_simbolos_da_regex(expressao) | set(Alfabeto or ''))
+    ex = _Expressoes()
+    raiz = _LeitorRegex(expressao, ex, alfabeto).ler()
+    simbolos = sorted(alfabeto)
+
+    # Subconjuntos sob demanda: cada derivada nova vira um estado
+    estados = [raiz]
+    ids = {raiz: 0}
+    delta = array('i')
+    for r in estados:  # estados cresce durante a busca
+        for simbolo in simbolos:
+            d = ex.derivada(r, simbolo)
+            if d == ex.vazio:
+                delta.append(-1)
+                continue
+            q = ids.get(d)
+            if q is None:
+                q = ids[d] = len(estados)
+                estados.append(d)
+            delta.append(q)
+    n = len(estados)
+    finais = bytearray((n + 7) // 8)
+    for q, r in enumerate(estados):
+        if ex.anulavel(r):
+            finais[q >> 3] |= 1 << (q & 7)
+    tab = TabelaAFD([f'q{q}' for q in range(n)], simbolos, delta, finais, 0)
+    tab = _minimizar_tabela(tab) or tab
+    return _resultado(tab, ''.join(simbolos) if Alfabeto is None else Alfabeto, compacto)
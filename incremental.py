@@ -0,0 +1,642 @@
+"""
+AFD que mantém viva a partição de Myhill–Nerode dos seus estados e a
+atualiza a cada edição (criaEstado, criaTransicao, mudaEstadoFinal), em
+vez de minimizar tudo de novo.
+
+    from incremental import AFDIncremental
+    inc = AFDIncremental(afd)
+    inc.criaTransicao('q3', 'q7', 'a')
+    inc.equivalentes('q1', 'q2')
+    minimo = inc.minimo()
+
+Uma edição no estado p só muda a linguagem de p e dos seus ancestrais
+(os estados que alcançam p), achados pelo índice inverso das transições.
+Os demais estados continuam nos seus blocos; os blocos que ficam sem
+membros saem do registro de assinaturas. Os ancestrais voltam em ordem
+topológica inversa das suas componentes fortemente conexas:
+
+* um estado fora de ciclo tem a assinatura (final, bloco do destino por
+  cada símbolo) e entra no bloco registrado com a mesma assinatura, ou num
+  bloco novo, como em construcao.afd_de_palavras;
+* uma componente com ciclo é refinada entre si (Moore) e comparada, por um
+  percurso sincronizado, com os blocos candidatos: os que chegam pelo
+  mesmo símbolo ao mesmo bloco de fora (índice inverso) ou, se ela só sai
+  para o morto, o bloco com o mesmo código canônico.
+
+Se os ancestrais passam de limite estados, ou a busca de candidatos fica
+cara demais, a partição é recalculada inteira pelo refinamento de Hopcroft.
+"""
+from array import array
+
+import instrumentacao
+from AFD import AFD, AFDCompacto, TabelaAFD, _blocos_equivalencia
+
+# Componentes que só saem para o morto guardam um código canônico até
+# este tamanho; uma maior que volte numa edição força o recálculo
+_FECHADA_MAXIMA = 64
+
+
+class AFDIncremental(AFDCompacto):
+    """
+    AFD editável que sabe, a qualquer momento, quais estados são
+    equivalentes. As edições devem passar por criaEstado, criaTransicao,
+    mudaEstadoFinal e mudaEstadoInicial; estados, transicoes e finais
+    continuam legíveis como em qualquer AFD.
+
+    limite é o número de ancestrais acima do qual uma edição recalcula a
+    partição inteira (padrão: max(1024, n/16)).
+    """
+
+    def __init__(self, afd, limite=None):
+        tab = afd.tabela()
+        AFDCompacto.__init__(self, tab, afd.alfabeto)
+        # Uma coluna por símbolo do alfabeto, usado ou não
+        self._simbolos = sorted(set(tab.simbolos) | set(self.alfabeto))
+        self._coluna = {simbolo: c for c, simbolo in enumerate(self._simbolos)}
+        self._k = k = len(self._simbolos)
+        self._nomes = list(tab.nomes)
+        self._indice = dict(tab.indice)
+        n = tab.n
+        if list(tab.simbolos) == self._simbolos:
+            self._delta = array('i', tab.delta)
+        else:
+            self._delta = array('i', [-1]) * (n * k)
+            for c, simbolo in enumerate(tab.simbolos):
+                self._delta[self._coluna[simbolo]::k] = array('i', tab.delta[c::tab.k])
+        self._final = bytearray(tab.eh_final(q) for q in range(n))
+        self.limite = max(1024, n // 16) if limite is None else limite
+        self.edicoes = 0
+        self.recalculos = 0
+        self._recalcular()
+
+    # ===== Edição =====
+
+    def criaEstado(self, id, inicial=False, final=False):
+        if not AFD.criaEstado(self, id, inicial, final):
+            return False
+        q = self._indice[str(id)] = len(self._nomes)
+        self._nomes.append(str(id))
+        self._delta.extend(array('i', [-1]) * self._k)
+        self._final.append(1 if final else 0)
+        self._bloco.append(-1)
+        self._prox.append(-1)
+        self._ant.append(-1)
+        # Estado sem antecessores: só ele muda
+        self.edicoes += 1
+        self._recolocar([q])
+        return True
+
+    def criaTransicao(self, origem, destino, simbolo):
+        if not AFD.criaTransicao(self, origem, destino, simbolo):
+            return False
+        p, d = self._indice[str(origem)], self._indice[str(destino)]
+        e = p * self._k + self._coluna[str(simbolo)]
+        if self._delta[e] != d:
+            self._editar(p, e, d)
+        return True
+
+    def mudaEstadoFinal(self, id, final):
+        AFD.mudaEstadoFinal(self, id, final)
+        p = self._indice.get(str(id))
+        if p is not None and self._final[p] != bool(final):
+            self._editar(p, final=final)
+
+    def _editar(self, p, e=None, destino=-1, final=None):
+        """
+        Aplica a mudança na transição e (para destino) ou no final de p e
+        recoloca p e seus ancestrais. Os ancestrais não dependem das
+        transições que saem de p, então podem ser achados antes.
+        """
+        self.edicoes += 1
+        ancestrais = self._ancestrais(p)
+        if ancestrais is not None:
+            self._retirar(ancestrais)
+        if e is not None:
+            self._delta[e] = destino
+            self._pred_extra.setdefault(destino, []).append(e)
+        if final is not None:
+            self._final[p] = 1 if final else 0
+        if ancestrais is None or not self._recolocar(ancestrais):
+            self._recalcular()
+
+    def copiar(afd):
+        # A cópia não herda a partição: é um AFDCompacto da tabela atual
+        return AFDCompacto(afd.tabela(), afd.alfabeto)
+
+    # ===== Consultas =====
+
+    def equivalentes(self, estado1, estado2):
+        # True se os dois estados aceitam a mesma linguagem, em O(1)
+        bloco, indice = self._bloco, self._indice
+        return bloco[indice[str(estado1)]] == bloco[indice[str(estado2)]]
+
+    def aceita(self, cadeia):
+        coluna, delta, k = self._coluna, self._delta, self._k
+        q = self._indice.get(self.incial, -1)
+        for simbolo in cadeia:
+            c = coluna.get(simbolo)
+            if c is None or q < 0:
+                return False
+            q = delta[q * k + c]
+        return q >= 0 and self._final[q] == 1
+
+    def num_blocos(self):
+        # Quantas linguagens não vazias diferentes os estados aceitam
+        return len(self._registro) - 1
+
+    def tabela(self):
+        n, k, delta = len(self._nomes), self._k, self._delta
+        # Como TabelaAFD.de_afd: só os símbolos que aparecem em transições
+        usadas = [c for c in range(k) if any(d >= 0 for d in delta[c::k])]
+        if len(usadas) == k:
+            novo_delta = array('i', delta)
+        else:
+            m = len(usadas)
+            novo_delta = array('i', [-1]) * (n * m)
+            for j, c in enumerate(usadas):
+                novo_delta[j::m] = delta[c::k]
+        finais = bytearray((n + 7) // 8)
+        for q in range(n):
+            if self._final[q]:
+                finais[q >> 3] |= 1 << (q & 7)
+        return TabelaAFD(list(self._nomes), [self._simbolos[c] for c in usadas], novo_delta,
+                         finais, self._indice.get(self.incial, -1))
+
+    def minimo(self, compacto=False):
+        """
+        AFD mínimo equivalente, lido da partição atual: um estado por bloco
+        alcançável a partir do bloco do inicial, sem o morto (a não ser que
+        seja o do inicial). Custa o tamanho do AFD mínimo, não o deste.
+        """
+        tab = self._tabela_minima()
+        if compacto:
+            return AFDCompacto(tab, self.alfabeto)
+        return tab.para_afd(self.alfabeto)
+
+    def minimizar_hopcroft(self):
+        """
+        Como AFD.minimizar_hopcroft, mas sem refinar de novo: o AFD mínimo
+        vem da partição mantida a cada edição.
+        """
+        minima = self._tabela_minima()
+        instrumentacao.contar('minimizar.estados_entrada', len(self._nomes))
+        instrumentacao.contar('minimizar.estados_saida', minima.n)
+        if minima.n == len(self._nomes):
+            print("✅ O AFD já está minimizado pelo critério de Hopcroft.")
+            return self
+        print("✅ AFD minimizado com sucesso pelo algoritmo de Hopcroft.")
+        return minima.para_afd(self.alfabeto)
+
+    def _tabela_minima(self):
+        k, morto = self._k, self._morto
+        inicial = self._indice.get(self.incial, -1)
+        blocos = []
+        novo_id = {}
+        if inicial >= 0:
+            # Como em _aparar_tabela, o inicial fica mesmo se for morto
+            blocos.append(self._bloco[inicial])
+            novo_id[blocos[0]] = 0
+        linhas = []
+        for b in blocos:        # blocos cresce durante a busca
+            linha = self._linha_bloco(b)
+            for c in range(k):
+                d = linha[c + 1]
+                if d != morto and d not in novo_id:
+                    novo_id[d] = len(blocos)
+                    blocos.append(d)
+            linhas.append(linha)
+        m = len(blocos)
+        delta = array('i', [-1]) * (m * k)
+        finais = bytearray((m + 7) // 8)
+        for i, linha in enumerate(linhas):
+            for c in range(k):
+                d = linha[c + 1]
+                if d != morto:
+                    delta[i * k + c] = novo_id[d]
+            if linha[0]:
+                finais[i >> 3] |= 1 << (i & 7)
+        tab = TabelaAFD([f'q{i}' for i in range(m)], self._simbolos, delta, finais,
+                        0 if m else -1)
+        # Sem as colunas que o AFD mínimo não usa, como em tabela()
+        usadas = [c for c in range(k) if any(d >= 0 for d in delta[c::k])]
+        if len(usadas) < k:
+            novo = array('i', [-1]) * (m * len(usadas))
+            for j, c in enumerate(usadas):
+                novo[j::len(usadas)] = delta[c::k]
+            tab = TabelaAFD(tab.nomes, [self._simbolos[c] for c in usadas], novo, finais, tab.inicial)
+        return tab
+
+    # ===== Partição =====
+
+    def _recalcular(self):
+        """
+        Partição inteira pelo refinamento de Hopcroft, e todos os índices
+        refeitos do zero: listas de membros, registro de assinaturas,
+        códigos das componentes fechadas e índice inverso.
+        """
+        self.recalculos += 1
+        instrumentacao.contar('incremental.recalculos')
+        n, k, delta = len(self._nomes), self._k, self._delta
+        finais = bytearray((n + 7) // 8)
+        for q in range(n):
+            if self._final[q]:
+                finais[q >> 3] |= 1 << (q & 7)
+        bloco = _blocos_equivalencia(TabelaAFD(self._nomes, self._simbolos, delta, finais, -1))
+        self._morto = morto = bloco.pop()
+        num = max(bloco + [morto]) + 1
+        self._bloco = array('i', bloco)
+        self._tamanho = array('i', [0]) * num
+        self._primeiro = array('i', [-1]) * num
+        self._prox = array('i', [-1]) * n
+        self._ant = array('i', [-1]) * n
+        for q in reversed(range(n)):
+            self._ligar(q, bloco[q])
+        self._livres = [b for b in range(num) if b != morto and not self._tamanho[b]]
+
+        # Registro: assinatura -> bloco; o morto fica sempre registrado
+        self._registro = {array('i', [0] + [morto] * k).tobytes(): morto}
+        for b in range(num):
+            if b != morto and self._tamanho[b]:
+                self._registro[self._assinatura(self._primeiro[b])] = b
+        self._fechadas = {}     # código canônico -> bloco
+        self._codigo = {}       # bloco -> código canônico
+        self._registrar_fechadas(num)
+
+        # Índice inverso: _pred[_pred_ini[t]:_pred_ini[t + 1]] são as
+        # posições e = q * k + c de delta que apontam para t. Mudanças
+        # posteriores vão para _pred_extra; entradas velhas são filtradas
+        # na leitura (delta[e] != t)
+        ini = array('i', [0]) * (n + 1)
+        for d in delta:
+            if d >= 0:
+                ini[d + 1] += 1
+        for t in range(n):
+            ini[t + 1] += ini[t]
+        proximo = array('i', ini)
+        pred = array('i', [0]) * ini[n]
+        for e, d in enumerate(delta):
+            if d >= 0:
+                pred[proximo[d]] = e
+                proximo[d] += 1
+        self._pred_ini, self._pred, self._pred_extra = ini, pred, {}
+        self._indexados = n
+
+    def _registrar_fechadas(self, num):
+        # Componentes do grafo de blocos que só saem para o morto, com
+        # ciclo e até _FECHADA_MAXIMA blocos: guarda o código de cada bloco
+        morto = self._morto
+        vivos = [b for b in range(num) if b != morto and self._tamanho[b]]
+
+        def sucessores(b):
+            return [d for d in self._linha_bloco(b)[1:] if d != morto]
+
+        for componente in _componentes_fortes(vivos, sucessores):
+            if len(componente) > _FECHADA_MAXIMA:
+                continue
+            dentro = set(componente)
+            saidas = [d for b in componente for d in sucessores(b)]
+            if not saidas or any(d not in dentro for d in saidas):
+                continue
+            for b in componente:
+                self._guardar_codigo(b, self._codigo_bloco(b))
+
+    def _guardar_codigo(self, b, codigo):
+        self._fechadas[codigo] = b
+        self._codigo[b] = codigo
+
+    def _ancestrais(self, p):
+        # p e os estados que alcançam p, ou None se passarem de limite
+        k = self._k
+        vistos = {p}
+        fila = [p]
+        for q in fila:      # fila cresce durante a busca
+            for e in self._predecessores(q):
+                r = e // k
+                if r not in vistos:
+                    vistos.add(r)
+                    fila.append(r)
+                    if len(fila) > self.limite:
+                        instrumentacao.contar('incremental.limite_excedido')
+                        return None
+        instrumentacao.contar('incremental.ancestrais', len(fila))
+        return fila
+
+    def _predecessores(self, t):
+        # Posições e de delta com delta[e] == t (pode repetir)
+        delta = self._delta
+        if t < self._indexados:
+            pred = self._pred
+            for i in range(self._pred_ini[t], self._pred_ini[t + 1]):
+                e = pred[i]
+                if delta[e] == t:
+                    yield e
+        for e in self._pred_extra.get(t, ()):
+            if delta[e] == t:
+                yield e
+
+    def _retirar(self, estados):
+        # Tira os estados dos seus blocos, antes da mudança; os blocos que
+        # ficam vazios saem do registro
+        contagem = {}
+        for q in estados:
+            b = self._bloco[q]
+            contagem[b] = contagem.get(b, 0) + 1
+        for b, quantos in contagem.items():
+            if quantos == self._tamanho[b] and b != self._morto:
+                del self._registro[self._assinatura(self._primeiro[b])]
+                codigo = self._codigo.pop(b, None)
+                if codigo is not None:
+                    del self._fechadas[codigo]
+                self._livres.append(b)
+        for q in estados:
+            self._desligar(q)
+
+    def _recolocar(self, estados):
+        """
+        Dá um bloco a cada estado de estados (todos sem bloco), componente
+        por componente, dos sucessores para os antecessores. Retorna False
+        se for preciso recalcular tudo.
+        """
+        k, delta = self._k, self._delta
+        dentro = set(estados)
+
+        def sucessores(q):
+            return [d for d in delta[q * k:(q + 1) * k] if d in dentro]
+
+        for componente in _componentes_fortes(estados, sucessores):
+            q = componente[0]
+            if len(componente) == 1 and q not in sucessores(q):
+                assinatura = self._assinatura(q)
+                b = self._registro.get(assinatura)
+                if b is None:
+                    b = self._registro[assinatura] = self._novo_bloco()
+                self._ligar(q, b)
+            elif not self._recolocar_ciclo(componente):
+                return False
+        return True
+
+    def _recolocar_ciclo(self, componente):
+        k, delta, final, bloco, morto = self._k, self._delta, self._final, self._bloco, self._morto
+        linhas = {q: delta[q * k:(q + 1) * k] for q in componente}
+
+        # Estados que não aceitam nada (nem saindo da componente) são o morto
+        dentro = set(componente)
+        antecessores = {q: [] for q in componente}
+        vivos = set()
+        for q, linha in linhas.items():
+            vivo = final[q]
+            for d in linha:
+                if d in dentro:
+                    antecessores[d].append(q)
+                elif d >= 0 and bloco[d] != morto:
+                    vivo = True
+            if vivo:
+                vivos.add(q)
+        pilha = list(vivos)
+        while pilha:
+            for r in antecessores[pilha.pop()]:
+                if r not in vivos:
+                    vivos.add(r)
+                    pilha.append(r)
+        for q in componente:
+            if q not in vivos:
+                self._ligar(q, morto)
+        componente = [q for q in componente if q in vivos]
+        if not componente:
+            return True
+
+        # Refinamento de Moore entre os estados vivos; um destino de fora é
+        # o código -1 - bloco, e um de dentro é a classe atual do destino
+        def fora(d):
+            return -1 - (morto if d < 0 else bloco[d])
+
+        ids = {}
+        classe = {}
+        for q in componente:
+            chave = (final[q],) + tuple(0 if d in vivos else fora(d) for d in linhas[q])
+            classe[q] = ids.setdefault(chave, len(ids))
+        m = len(ids)
+        while True:
+            ids = {}
+            nova = {}
+            for q in componente:
+                chave = (classe[q],) + tuple(classe[d] if d in vivos else fora(d) for d in linhas[q])
+                nova[q] = ids.setdefault(chave, len(ids))
+            classe = nova
+            if len(ids) == m:
+                break
+            m = len(ids)
+        representante = [None] * m
+        for q in componente:
+            if representante[classe[q]] is None:
+                representante[classe[q]] = q
+        finais = [final[q] for q in representante]
+        transicoes = [[classe[d] if d in vivos else fora(d) for d in linhas[q]]
+                      for q in representante]
+
+        # Semente: uma classe que sai por algum símbolo para um bloco de
+        # fora que não é o morto, o menor possível; os candidatos são os
+        # blocos que vão para o mesmo bloco pelo mesmo símbolo
+        saidas = [(self._tamanho[-1 - t], j, c, -1 - t) for j, linha in enumerate(transicoes)
+                  for c, t in enumerate(linha) if t < 0 and -1 - t != morto]
+        semente = min(saidas)[1:] if saidas else None
+        if semente is not None:
+            j0, c, alvo = semente
+            candidatos = self._candidatos(alvo, c)
+            if candidatos is None:
+                return False
+            codigo = None
+        else:
+            if m > _FECHADA_MAXIMA:
+                return False
+            j0 = 0
+            codigo = _codigo_canonico(0, finais.__getitem__,
+                                      lambda j: [None if t < 0 else t for t in transicoes[j]])
+            b = self._fechadas.get(codigo)
+            candidatos = () if b is None else (b,)
+        for b in candidatos:
+            mapa = self._casar(j0, b, finais, transicoes)
+            if mapa is not None:
+                for q in componente:
+                    self._ligar(q, mapa[classe[q]])
+                return True
+
+        # Nenhum bloco existente: linguagens novas, um bloco por classe
+        blocos = [self._novo_bloco() for _ in range(m)]
+        for q in componente:
+            self._ligar(q, blocos[classe[q]])
+        for j in range(m):
+            self._registro[self._assinatura(representante[j])] = blocos[j]
+        if codigo is not None:
+            for j in range(m):
+                self._guardar_codigo(blocos[j], self._codigo_bloco(blocos[j]))
+        instrumentacao.contar('incremental.ciclos_novos')
+        return True
+
+    def _candidatos(self, alvo, c):
+        # Blocos com algum estado que vai para o bloco alvo pela coluna c,
+        # ou None se a busca passar de limite passos
+        k, bloco, morto = self._k, self._bloco, self._morto
+        candidatos = set()
+        passos = 0
+        t = self._primeiro[alvo]
+        while t >= 0:
+            for e in self._predecessores(t):
+                passos += 1
+                if e % k == c:
+                    b = bloco[e // k]
+                    if b >= 0 and b != morto:
+                        candidatos.add(b)
+            if passos > self.limite:
+                instrumentacao.contar('incremental.limite_excedido')
+                return None
+            t = self._prox[t]
+        return candidatos
+
+    def _casar(self, j0, b0, finais, transicoes):
+        # Percorre as classes e os blocos juntos a partir de (j0, b0); se
+        # tudo bate, devolve o bloco de cada classe
+        morto = self._morto
+        mapa = {j0: b0}
+        pilha = [j0]
+        while pilha:
+            j = pilha.pop()
+            linha = self._linha_bloco(mapa[j])
+            if linha[0] != finais[j]:
+                return None
+            for t, d in zip(transicoes[j], linha[1:]):
+                if t < 0:
+                    if d != -1 - t:
+                        return None
+                elif t in mapa:
+                    if mapa[t] != d:
+                        return None
+                elif d == morto:
+                    return None
+                else:
+                    mapa[t] = d
+                    pilha.append(t)
+        return mapa
+
+    # ===== Auxiliares =====
+
+    def _linha(self, q):
+        # [final, bloco do destino por cada coluna] de um estado já colocado
+        k, bloco, morto = self._k, self._bloco, self._morto
+        return [self._final[q]] + [morto if d < 0 else bloco[d]
+                                   for d in self._delta[q * k:(q + 1) * k]]
+
+    def _linha_bloco(self, b):
+        if b == self._morto:
+            return [0] + [b] * self._k
+        return self._linha(self._primeiro[b])
+
+    def _assinatura(self, q):
+        return array('i', self._linha(q)).tobytes()
+
+    def _codigo_bloco(self, b):
+        morto = self._morto
+        return _codigo_canonico(b, lambda x: self._linha_bloco(x)[0],
+                                lambda x: [None if d == morto else d
+                                           for d in self._linha_bloco(x)[1:]])
+
+    def _novo_bloco(self):
+        if self._livres:
+            return self._livres.pop()
+        self._tamanho.append(0)
+        self._primeiro.append(-1)
+        return len(self._tamanho) - 1
+
+    def _ligar(self, q, b):
+        # Põe q no começo da lista de membros de b
+        primeiro = self._primeiro[b]
+        self._prox[q] = primeiro
+        self._ant[q] = -1
+        if primeiro >= 0:
+            self._ant[primeiro] = q
+        self._primeiro[b] = q
+        self._tamanho[b] += 1
+        self._bloco[q] = b
+
+    def _desligar(self, q):
+        b = self._bloco[q]
+        anterior, seguinte = self._ant[q], self._prox[q]
+        if anterior >= 0:
+            self._prox[anterior] = seguinte
+        else:
+            self._primeiro[b] = seguinte
+        if seguinte >= 0:
+            self._ant[seguinte] = anterior
+        self._tamanho[b] -= 1
+        self._bloco[q] = -1
+
+
+def _componentes_fortes(nos, sucessores):
+    """
+    Componentes fortemente conexas (Tarjan, sem recursão) do grafo dado por
+    sucessores(no), só entre os nós de nos. Saem em ordem topológica
+    inversa: cada componente vem depois das que ela alcança.
+    """
+    indice = {}
+    menor = {}
+    pilha = []
+    na_pilha = set()
+    componentes = []
+    for raiz in nos:
+        if raiz in indice:
+            continue
+        indice[raiz] = menor[raiz] = len(indice)
+        pilha.append(raiz)
+        na_pilha.add(raiz)
+        trabalho = [(raiz, iter(sucessores(raiz)))]
+        while trabalho:
+            v, filhos = trabalho[-1]
+            for w in filhos:
+                if w not in indice:
+                    indice[w] = menor[w] = len(indice)
+                    pilha.append(w)
+                    na_pilha.add(w)
+                    trabalho.append((w, iter(sucessores(w))))
+                    break
+                if w in na_pilha and indice[w] < menor[v]:
+                    menor[v] = indice[w]
+            else:
+                trabalho.pop()
+                if trabalho:
+                    u = trabalho[-1][0]
+                    if menor[v] < menor[u]:
+                        menor[u] = menor[v]
+                if menor[v] == indice[v]:
+                    componente = []
+                    while True:
+                        w = pilha.pop()
+                        na_pilha.discard(w)
+                        componente.append(w)
+                        if w == v:
+                            break
+                    componentes.append(componente)
+    return componentes
+
+
+def _codigo_canonico(inicio, final, sucessores):
+    """
+    Código do AFD alcançável a partir de inicio, com os estados numerados
+    na ordem de uma busca em largura; sucessores(x) dá o destino por cada
+    coluna (None é o morto). Dois AFDs mínimos têm o mesmo código se e só
+    se aceitam a mesma linguagem.
+    """
+    numero = {inicio: 0}
+    ordem = [inicio]
+    codigo = []
+    for x in ordem:         # ordem cresce durante a busca
+        linha = []
+        for y in sucessores(x):
+            if y is None:
+                linha.append(-1)
+                continue
+            if y not in numero:
+                numero[y] = len(ordem)
+                ordem.append(y)
+            linha.append(numero[y])
+        codigo.append((bool(final(x)), tuple(linha)))
+    return tuple(codigo)
@@ -0,0 +1,169 @@
+"""
+Instrumentação opcional das operações do AFD: contadores, máximos,
+cronômetros por fase e fotografias de memória (tracemalloc).
+
+Fica desligada por padrão. Desligada, cada ponto de medida custa só a
+leitura de ATIVO (os laços internos leem uma vez, numa variável local) e
+fase() devolve um contexto vazio compartilhado.
+
+    import instrumentacao
+    instrumentacao.ativar(memoria=True)
+    afd.minimizar_hopcroft()
+    instrumentacao.imprimir()
+    instrumentacao.exportar_json('medidas.json')
+"""
+import contextlib
+import functools
+import json
+import time
+import tracemalloc
+
+ATIVO = False
+MEMORIA = False
+
+_contadores = {}
+_maximos = {}
+_fases = {}            # nome -> {'chamadas', 'segundos', 'pico_memoria'}
+_fotografias = []
+_picos = []           # pico de memória das fases abertas
+_NADA = contextlib.nullcontext()
+
+
+def ativar(memoria=False):
+    # Com memoria=True, cada fase registra também o pico de memória alocada
+    global ATIVO, MEMORIA
+    ATIVO = True
+    MEMORIA = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desativar():
+    global ATIVO, MEMORIA
+    if MEMORIA and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    ATIVO = MEMORIA = False
+
+
+def limpar():
+    _contadores.clear()
+    _maximos.clear()
+    _fases.clear()
+    _fotografias.clear()
+
+
+def contar(nome, quantidade=1):
+    if ATIVO:
+        _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+def maximo(nome, valor):
+    # Guarda o maior valor já visto (ex.: tamanho máximo de uma fila)
+    if ATIVO and valor > _maximos.get(nome, valor - 1):
+        _maximos[nome] = valor
+
+
+def fase(nome):
+    """
+    Contexto que cronometra uma fase:
+        with instrumentacao.fase('minimizar.refinamento'): ...
+    Desligada, devolve um contexto vazio.
+    """
+    if not ATIVO:
+        return _NADA
+    return _cronometrar(nome)
+
+
+def medido(nome):
+    """
+    Decorador que cronometra cada chamada da função como a fase nome.
+    Desligada, a função decorada custa só um teste a mais por chamada.
+    """
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not ATIVO:
+                return funcao(*args, **kwargs)
+            with _cronometrar(nome):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorar
+
+
+@contextlib.contextmanager
+def _cronometrar(nome):
+    memoria = MEMORIA and tracemalloc.is_tracing()
+    if memoria:
+        # reset_peak apaga o pico das fases externas; elas guardam o maior
+        # valor visto até aqui na pilha
+        atual, pico = tracemalloc.get_traced_memory()
+        if _picos:
+            _picos[-1] = max(_picos[-1], pico)
+        _picos.append(0)
+        tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        dados = _fases.setdefault(nome, {'chamadas': 0, 'segundos': 0.0, 'pico_memoria': 0})
+        dados['chamadas'] += 1
+        dados['segundos'] += segundos
+        if memoria:
+            pico = max(_picos.pop(), tracemalloc.get_traced_memory()[1])
+            if _picos:
+                _picos[-1] = max(_picos[-1], pico)
+            dados['pico_memoria'] = max(dados['pico_memoria'], pico - atual)
+
+
+def fotografar(rotulo, limite=10):
+    # Fotografia do tracemalloc: as linhas de código que mais alocaram
+    if not (ATIVO and tracemalloc.is_tracing()):
+        return
+    estatisticas = tracemalloc.take_snapshot().statistics('lineno')[:limite]
+    _fotografias.append({
+        'rotulo': rotulo,
+        'total': tracemalloc.get_traced_memory()[0],
+        'maiores': [{'local': str(e.traceback[0]), 'bytes': e.size, 'blocos': e.count}
+                    for e in estatisticas],
+    })
+
+
+def relatorio():
+    return {
+        'contadores': dict(sorted(_contadores.items())),
+        'maximos': dict(sorted(_maximos.items())),
+        'fases': {nome: dict(dados) for nome, dados in sorted(_fases.items())},
+        'fotografias': list(_fotografias),
+    }
+
+
+def exportar_json(caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio(), arquivo, ensure_ascii=False, indent=2)
+
+
+def imprimir():
+    dados = relatorio()
+    if not any(dados.values()):
+        print("ℹ️ Nenhuma medida registrada.")
+        return
+    if dados['fases']:
+        print("⏱️ Fases:")
+        for nome, medida in dados['fases'].items():
+            linha = f"  {nome:<32} {medida['chamadas']:>6}x {medida['segundos']:10.4f} s"
+            if medida['pico_memoria']:
+                linha += f" {medida['pico_memoria'] / 2 ** 20:9.2f} MB"
+            print(linha)
+    if dados['contadores']:
+        print("🔢 Contadores:")
+        for nome, valor in dados['contadores'].items():
+            print(f"  {nome:<32} {valor:>12}")
+    if dados['maximos']:
+        print("📈 Máximos:")
+        for nome, valor in dados['maximos'].items():
+            print(f"  {nome:<32} {valor:>12}")
+    for foto in dados['fotografias']:
+        print(f"📷 {foto['rotulo']}: {foto['total'] / 2 ** 20:.2f} MB alocados")
+        for item in foto['maiores']:
+            print(f"  {item['bytes'] / 1024:10.1f} KB  {item['local']}")
@@ -0,0 +1,225 @@
+"""
+Execução em lote, sem menu: carrega todos os .jff de uma pasta e aplica
+uma lista de operações, distribuindo o trabalho num ProcessPoolExecutor.
+
+Os AFDs trafegam entre processos no formato binário da TabelaAFD
+(para_bytes / de_buffer), e não como dicionários de strings serializados
+com pickle. Na etapa das operações cada processo recebe todas as tabelas
+uma única vez, pelo initializer do pool, e as tarefas levam só os nomes.
+
+Uso: python lote.py PASTA OPERACAO [OPERACAO ...] [-j PROCESSOS]
+                    [-o resultado.json] [--saida PASTA_SAIDA]
+
+Operações: minimizar, completar, complemento, classes, equivalencia
+(esta última compara todos os pares de AFDs).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from AFD import AFD, AFDCompacto, TabelaAFD, _minimizar_tabela
+from AFN import AFN
+
+
+# ===== Código executado nos processos de trabalho =====
+
+# nome -> bytes da tabela, preenchido pelo initializer do pool
+_tabelas = {}
+
+
+def _iniciar_processo(tabelas):
+    _tabelas.update(tabelas)
+
+
+def _afd(nome):
+    return AFDCompacto(TabelaAFD.de_buffer(_tabelas[nome]))
+
+
+def _carregar(caminho):
+    inicio = time.perf_counter()
+    try:
+        try:
+            afd = AFD.carregar_afd_de_jflap(caminho, compacto=True)
+        except ValueError:
+            # Transições ε ou não determinísticas: lê como AFN e determiniza
+            afn = AFN.carregar_afn_de_jflap(caminho)
+            afd = None if afn is None else afn.determinizar(compacto=True)
+    except Exception as e:
+        return caminho, None, f"{type(e).__name__}: {e}", time.perf_counter() - inicio
+    if afd is None:
+        return caminho, None, "ausência de estado inicial", time.perf_counter() - inicio
+    return caminho, afd.tabela().para_bytes(), None, time.perf_counter() - inicio
+
+
+def _salvar(afd, nome, operacao, pasta_saida):
+    if pasta_saida is None:
+        return None
+    caminho = os.path.join(pasta_saida, f"{nome}.{operacao}.jff")
+    AFD.salvar_afd_em_jflap(afd, caminho)
+    return caminho
+
+
+def _minimizar(nome, pasta_saida):
+    tab = TabelaAFD.de_buffer(_tabelas[nome])
+    minima = _minimizar_tabela(tab)
+    resultado = {'estados': tab.n, 'estados_minimo': tab.n if minima is None else minima.n}
+    resultado['arquivo'] = _salvar((minima or tab).para_afd(), nome, 'minimizar', pasta_saida)
+    return resultado
+
+
+def _completar(nome, pasta_saida):
+    afd = _afd(nome)
+    comp = afd.completar_afd(afd)
+    resultado = {'estados': len(comp.estados), 'transicoes': len(comp.transicoes)}
+    resultado['arquivo'] = _salvar(comp, nome, 'completar', pasta_saida)
+    return resultado
+
+
+def _complemento(nome, pasta_saida):
+    afd = _afd(nome)
+    comp = afd.complemento_afd(afd)
+    resultado = {'estados': len(comp.estados), 'finais': len(comp.finais)}
+    resultado['arquivo'] = _salvar(comp, nome, 'complemento', pasta_saida)
+    return resultado
+
+
+def _classes(nome, pasta_saida):
+    return {'classes': _afd(nome).classes_equivalencia()}
+
+
+def _equivalencia(par, pasta_saida):
+    afd1, afd2 = _afd(par[0]), _afd(par[1])
+    palavra = afd1.contraexemplo_equivalencia(afd1, afd2)
+    return {'equivalentes': palavra is None, 'contraexemplo': palavra}
+
+
+OPERACOES = {
+    'minimizar': _minimizar,
+    'completar': _completar,
+    'complemento': _complemento,
+    'classes': _classes,
+    'equivalencia': _equivalencia,
+}
+
+
+def _executar(tarefa):
+    operacao, alvo, pasta_saida = tarefa
+    inicio = time.perf_counter()
+    try:
+        resultado = OPERACOES[operacao](alvo, pasta_saida)
+    except Exception as e:
+        resultado = {'erro': f"{type(e).__name__}: {e}"}
+    resultado['segundos'] = time.perf_counter() - inicio
+    return operacao, alvo, resultado
+
+
+# ===== Processo principal =====
+
+_SUFIXOS_JFF = ('.jff.gz', '.jff')
+
+
+def _nome_jff(arquivo):
+    # Nome do AFD: o nome do arquivo sem o sufixo .jff ou .jff.gz
+    for sufixo in _SUFIXOS_JFF:
+        if arquivo.lower().endswith(sufixo):
+            return arquivo[:-len(sufixo)]
+    return arquivo
+
+
+def _arquivos_jff(pasta):
+    """
+    ({nome: arquivo}, {arquivo: erro}) dos .jff e .jff.gz de pasta. Dois
+    arquivos com o mesmo nome (M.jff e M.jff.gz) seriam o mesmo AFD: o
+    primeiro em ordem alfabética fica e os demais viram erro.
+    """
+    arquivos, erros = {}, {}
+    for arquivo in sorted(os.listdir(pasta)):
+        if not arquivo.lower().endswith(_SUFIXOS_JFF):
+            continue
+        nome = _nome_jff(arquivo)
+        if nome in arquivos:
+            erros[arquivo] = f"nome '{nome}' repetido: já usado por {arquivos[nome]}"
+        else:
+            arquivos[nome] = arquivo
+    return arquivos, erros
+
+
+def executar_lote(pasta, operacoes, processos=None, pasta_saida=None):
+    """
+    Carrega os .jff de pasta e aplica as operações em paralelo.
+    Retorna um dicionário pronto para json.dump com os resultados e os
+    tempos de cada etapa.
+    """
+    for operacao in operacoes:
+        if operacao not in OPERACOES:
+            raise ValueError(f"Operação desconhecida: {operacao}")
+    if pasta_saida is not None:
+        os.makedirs(pasta_saida, exist_ok=True)
+    arquivos, repetidos = _arquivos_jff(pasta)
+    nomes = sorted(arquivos)
+    inicio = time.perf_counter()
+    relatorio = {'pasta': pasta, 'processos': processos or os.cpu_count(),
+                 'carregamento': {}, 'operacoes': {}}
+
+    for arquivo, erro in repetidos.items():
+        relatorio['carregamento'][arquivo] = {'segundos': 0.0, 'erro': erro}
+    tabelas = {}
+    caminhos = [os.path.join(pasta, arquivos[nome]) for nome in nomes]
+    with ProcessPoolExecutor(processos) as pool:
+        for nome, (_, dados, erro, segundos) in zip(nomes, pool.map(_carregar, caminhos)):
+            relatorio['carregamento'][nome] = {'segundos': segundos, 'erro': erro}
+            if dados is not None:
+                tabelas[nome] = dados
+    relatorio['segundos_carregamento'] = time.perf_counter() - inicio
+
+    tarefas = []
+    for operacao in operacoes:
+        relatorio['operacoes'][operacao] = {}
+        if operacao == 'equivalencia':
+            tarefas.extend((operacao, par, pasta_saida) for par in combinations(sorted(tabelas), 2))
+        else:
+            tarefas.extend((operacao, nome, pasta_saida) for nome in sorted(tabelas))
+
+    inicio_operacoes = time.perf_counter()
+    if tarefas:
+        processos_usados = processos or os.cpu_count() or 1
+        lote = max(1, len(tarefas) // (4 * processos_usados))
+        with ProcessPoolExecutor(processos, initializer=_iniciar_processo,
+                                 initargs=(tabelas,)) as pool:
+            for operacao, alvo, resultado in pool.map(_executar, tarefas, chunksize=lote):
+                chave = alvo if isinstance(alvo, str) else ' x '.join(alvo)
+                relatorio['operacoes'][operacao][chave] = resultado
+    relatorio['segundos_operacoes'] = time.perf_counter() - inicio_operacoes
+    relatorio['segundos_total'] = time.perf_counter() - inicio
+    return relatorio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Operações em lote sobre uma pasta de AFDs JFLAP.")
+    parser.add_argument('pasta', help="pasta com os arquivos .jff")
+    parser.add_argument('operacoes', nargs='+', choices=sorted(OPERACOES))
+    parser.add_argument('-j', '--processos', type=int, default=None,
+                        help="número de processos (padrão: um por núcleo)")
+    parser.add_argument('-o', '--resultado', default=None,
+                        help="arquivo JSON de saída (padrão: saída padrão)")
+    parser.add_argument('--saida', default=None,
+                        help="pasta onde gravar os AFDs produzidos")
+    args = parser.parse_args(argv)
+
+    relatorio = executar_lote(args.pasta, args.operacoes, args.processos, args.saida)
+    if args.resultado is None:
+        json.dump(relatorio, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        with open(args.resultado, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"✅ Resultado salvo em {args.resultado} "
+              f"({relatorio['segundos_total']:.2f} s, {relatorio['processos']} processos)")
+
+
+if __name__ == '__main__':
+    main()
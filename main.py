@@ -3,6 +3,8 @@ import sys
 from gc import disable
 import tkinter as tk
 from AFD import *
+from AFN import AFN
+import instrumentacao
 from collections import deque
 from tkinter import filedialog
 
@@ -43,6 +45,8 @@ def menu():
         print("6. Verificar equivalência entre AFDs")
         print("7. Verificar estados esquivalentes do AFD")
         print("8. Operação entre AFDs")
+        print("9. Instrumentação (medidas de desempenho)")
+        print("10. Consultas sobre linguagens (vazio, inclusão, finitude, ...)")
         print("0. Sair")
         opcao = input("Escolha uma opção: ")
 
@@ -51,7 +55,13 @@ def menu():
             caminho = escolher_arquivo_abrir()
             if caminho and os.path.exists(caminho):
                 try:
-                    afd = AFD.carregar_afd_de_jflap(caminho)
+                    try:
+                        afd = AFD.carregar_afd_de_jflap(caminho)
+                    except ValueError as e:
+                        # Transições ε ou não determinísticas: lê como AFN e determiniza
+                        print(f"ℹ️ {e} Carregando como AFN e determinizando.")
+                        afn = AFN.carregar_afn_de_jflap(caminho)
+                        afd = None if afn is None else afn.determinizar()
                     if afd is None:
                         print("❌ AFD inválido: ausência de estado inicial.")
                     else:
@@ -127,22 +137,23 @@ def menu():
             if nome1 not in afds or nome2 not in afds:
                 print("⚠️ Um ou ambos os AFDs não foram encontrados.")
                 continue
-            equivalente = afd.testar_equivalencia(afds[nome1], afds[nome2])
-            if equivalente:
+            contraexemplo = afd.contraexemplo_equivalencia(afds[nome1], afds[nome2])
+            if contraexemplo is None:
                 print(f"✅ Os AFDs '{nome1}' e '{nome2}' são equivalentes.")
             else:
                 print(f"❌ Os AFDs '{nome1}' e '{nome2}' NÃO são equivalentes.")
+                print(f"   Menor cadeia que os distingue: '{contraexemplo or 'ε'}'")
         elif opcao == "7":
             if not afds:
                 print("⚠️ Nenhum AFD carregado.")
                 continue
             nome_afd = input(f"Digite o nome do AFD para verificar estados equivalentes {list(afds.keys())}: ")
             if nome_afd in afds:
-                equivalentes = afds[nome_afd].estados_equivalentes()
-                if equivalentes:
+                classes = afds[nome_afd].classes_equivalencia()
+                if classes:
                     print("✅ Estados equivalentes encontrados:")
-                    for par in equivalentes:
-                        print(f"  - {par[0]} ≡ {par[1]}")
+                    for classe in classes:
+                        print("  - " + " ≡ ".join(classe))
                 else:
                     print("ℹ️ Nenhum par de estados equivalentes encontrado.")
             else:
@@ -158,6 +169,7 @@ def menu():
             print("b. Intersecao")
             print("c. Diferenca")
             print("d. Complemento")
+            print("e. Uniao/Intersecao de varios AFDs")
             print("0. Voltar")
             op = input("Escolha a operacao: ")
 
@@ -209,6 +221,111 @@ def menu():
                 afds[f"{n}_C"] = res
                 print(f"✅ AFD resultante '{n}_C' criado.")
 
+            elif op == 'e':
+                entrada = input(f"AFDs separados por virgula {list(afds.keys())}: ")
+                nomes = [n.strip() for n in entrada.split(',') if n.strip()]
+                faltando = [n for n in nomes if n not in afds]
+                if faltando:
+                    print(f"❌ AFD '{faltando[0]}' não encontrado.")
+                    continue
+                if len(nomes) < 2:
+                    print("⚠️ Informe pelo menos dois AFDs.")
+                    continue
+                tipo = input("u. Uniao / i. Intersecao: ")
+                if tipo == 'u':
+                    res = afd.uniao_varios([afds[n] for n in nomes], minimizar=True)
+                    nome_res = "_U_".join(nomes)
+                elif tipo == 'i':
+                    res = afd.intersecao_varios([afds[n] for n in nomes], minimizar=True)
+                    nome_res = "_I_".join(nomes)
+                else:
+                    print("❌ Opção inválida.")
+                    continue
+                afds[nome_res] = res
+                print(f"✅ AFD resultante '{nome_res}' criado.")
+
+        elif opcao == "9":
+            estado = "ligada" if instrumentacao.ATIVO else "desligada"
+            print(f"\n--- INSTRUMENTACAO ({estado}) ---")
+            print("a. Ativar")
+            print("b. Desativar")
+            print("c. Mostrar medidas")
+            print("d. Exportar medidas em JSON")
+            print("e. Limpar medidas")
+            print("0. Voltar")
+            op = input("Escolha a operacao: ")
+
+            if op == 'a':
+                memoria = input("Medir também a memória (tracemalloc)? (s/n): ").strip().lower() == 's'
+                instrumentacao.ativar(memoria=memoria)
+                print("✅ Instrumentação ativada.")
+            elif op == 'b':
+                instrumentacao.desativar()
+                print("✅ Instrumentação desativada.")
+            elif op == 'c':
+                instrumentacao.imprimir()
+            elif op == 'd':
+                caminho = input("Arquivo de saída (.json): ").strip()
+                if caminho:
+                    instrumentacao.exportar_json(caminho)
+                    print(f"✅ Medidas salvas em {caminho}")
+            elif op == 'e':
+                instrumentacao.limpar()
+                print("✅ Medidas apagadas.")
+
+        elif opcao == "10":
+            if not afds:
+                print("⚠️ Nenhum AFD carregado.")
+                continue
+            print("\n--- CONSULTAS ---")
+            print("a. Linguagem vazia?")
+            print("b. Inclusão L1 ⊆ L2")
+            print("c. Disjunção")
+            print("d. Linguagem finita?")
+            print("e. Contar cadeias aceitas até um tamanho")
+            print("0. Voltar")
+            op = input("Escolha a operacao: ")
+
+            if op in ('a', 'd', 'e'):
+                n = input(f"Nome do AFD {list(afds.keys())}: ")
+                if n not in afds:
+                    print(f"❌ AFD '{n}' não encontrado.")
+                    continue
+                if op == 'a':
+                    exemplo = afds[n].exemplo_aceito()
+                    if exemplo is None:
+                        print(f"✅ A linguagem de '{n}' é vazia.")
+                    else:
+                        print(f"❌ A linguagem de '{n}' não é vazia. Menor cadeia aceita: '{exemplo or 'ε'}'")
+                elif op == 'd':
+                    finita = afds[n].finito()
+                    print(f"ℹ️ A linguagem de '{n}' é {'finita' if finita else 'infinita'}.")
+                else:
+                    try:
+                        tamanho = int(input("Tamanho máximo das cadeias: "))
+                    except ValueError:
+                        print("❌ Tamanho inválido.")
+                        continue
+                    print(f"ℹ️ '{n}' aceita {afds[n].contar_palavras(tamanho)} cadeias de tamanho até {tamanho}.")
+            elif op in ('b', 'c'):
+                n1 = input(f"Nome do primeiro AFD {list(afds.keys())}: ")
+                n2 = input(f"Nome do segundo AFD {list(afds.keys())}: ")
+                if n1 not in afds or n2 not in afds:
+                    print("⚠️ Um ou ambos os AFDs não foram encontrados.")
+                    continue
+                if op == 'b':
+                    palavra = afds[n1].contraexemplo_inclusao(afds[n1], afds[n2])
+                    if palavra is None:
+                        print(f"✅ L({n1}) ⊆ L({n2}).")
+                    else:
+                        print(f"❌ L({n1}) ⊄ L({n2}). Cadeia aceita só por '{n1}': '{palavra or 'ε'}'")
+                else:
+                    palavra = afds[n1].palavra_comum(afds[n1], afds[n2])
+                    if palavra is None:
+                        print(f"✅ Os AFDs '{n1}' e '{n2}' são disjuntos.")
+                    else:
+                        print(f"❌ Os AFDs '{n1}' e '{n2}' não são disjuntos. Cadeia comum: '{palavra or 'ε'}'")
+
         elif opcao == "0":
             print("Saindo...")
             sys.exit()
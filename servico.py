@@ -0,0 +1,444 @@
+"""
+Serviço HTTP/JSON local sobre asyncio, para usar os AFDs sem o menu
+interativo (que depende de input() e das janelas do Tkinter).
+
+O servidor guarda um registro de AFDs (nome -> tabela no formato binário)
+carregado uma vez na partida e alterado pelas rotas abaixo. O trabalho
+pesado (ler JFLAP, minimizar, produtos, equivalência, aceitação) roda num
+ProcessPoolExecutor; o laço de eventos só faz a E/S. Requisições /aceita
+concorrentes para o mesmo AFD são agrupadas num único lote (aceita_lote)
+enviado a um processo de trabalho.
+
+Uso: python servico.py [PASTA] [--host 127.0.0.1] [--porta 8080]
+                       [-j PROCESSOS] [--janela MS] [--lote-maximo N]
+
+Rotas (corpos e respostas em JSON):
+    GET    /afds                   registro: nome -> estados, transições, impressão
+    POST   /afds                   {"nome", "caminho" | "regex" | "palavras", "alfabeto"?}
+    GET    /afds/NOME              descrição de um AFD
+    DELETE /afds/NOME              remove do registro
+    POST   /afds/NOME/minimizar    {"destino"?}
+    POST   /afds/NOME/aceita       {"cadeias": [...]} -> {"aceitas": [...]}
+    POST   /combinar               {"operacao", "afds": [...], "destino"?}
+                                   operacao: uniao, intersecao (2+ AFDs), diferenca (2),
+                                   complemento (1)
+    POST   /equivalencia           {"afds": [A, B]} -> {"equivalentes", "contraexemplo"}
+    GET    /estatisticas           contadores do serviço e dos lotes de aceitação
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import unquote, urlsplit
+
+from AFD import AFDCompacto, TabelaAFD, _minimizar_tabela
+from construcao import afd_de_palavras, afd_de_regex
+from lote import _arquivos_jff, _carregar as _carregar_jflap
+
+_CORPO_MAXIMO = 64 << 20
+
+
+# ===== Código executado nos processos de trabalho =====
+# As tabelas vão do servidor para os processos no formato binário; cada
+# processo guarda as últimas que usou, pela impressão digital, para não
+# refazer a tabela (nem os arrays do NumPy) a cada lote de aceitação.
+
+_afds = OrderedDict()
+_CAPACIDADE_PROCESSO = 32
+
+
+def _iniciar_processo():
+    # Ctrl+C chega a todo o grupo de processos; quem encerra os processos
+    # de trabalho é o servidor (Servico.parar)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _afd(impressao, dados):
+    afd = _afds.get(impressao)
+    if afd is None:
+        afd = _afds[impressao] = AFDCompacto(TabelaAFD.de_buffer(dados))
+        if len(_afds) > _CAPACIDADE_PROCESSO:
+            _afds.popitem(last=False)
+    else:
+        _afds.move_to_end(impressao)
+    return afd
+
+
+def _empacotar(tab):
+    return tab.para_bytes(), tab.impressao_digital()
+
+
+def _carregar(fonte):
+    if 'caminho' in fonte:
+        _, dados, erro, _ = _carregar_jflap(fonte['caminho'])
+        if erro is not None:
+            raise ValueError(erro)
+        return _empacotar(TabelaAFD.de_buffer(dados))
+    if 'regex' in fonte:
+        afd = afd_de_regex(fonte['regex'], fonte.get('alfabeto'), compacto=True)
+    elif 'palavras' in fonte:
+        afd = afd_de_palavras(sorted(fonte['palavras']), fonte.get('alfabeto'), compacto=True)
+    else:
+        raise ValueError("informe 'caminho', 'regex' ou 'palavras'")
+    return _empacotar(afd.tabela())
+
+
+def _minimizar(dados):
+    tab = TabelaAFD.de_buffer(dados)
+    return _empacotar(_minimizar_tabela(tab) or tab)
+
+
+# Operação de /combinar -> (mínimo, máximo) de AFDs; None = sem máximo
+_OPERANDOS = {'complemento': (1, 1), 'diferenca': (2, 2),
+              'uniao': (2, None), 'intersecao': (2, None)}
+
+
+def _conferir_operandos(operacao, quantidade):
+    if operacao not in _OPERANDOS:
+        raise ValueError(f"operação desconhecida: {operacao!r} "
+                         f"(use {', '.join(sorted(_OPERANDOS))})")
+    minimo, maximo = _OPERANDOS[operacao]
+    if quantidade < minimo or (maximo is not None and quantidade > maximo):
+        esperado = (f"exatamente {minimo}" if minimo == maximo else f"pelo menos {minimo}")
+        raise ValueError(f"'{operacao}' precisa de {esperado} AFD(s), recebeu {quantidade}")
+
+
+def _combinar(operacao, dados):
+    _conferir_operandos(operacao, len(dados))
+    afds = [AFDCompacto(TabelaAFD.de_buffer(d)) for d in dados]
+    a = afds[0]
+    if operacao == 'complemento':
+        resultado = a.complemento_afd(a)
+    elif operacao == 'diferenca':
+        resultado = a.diferenca_afds(a, afds[1])
+    elif operacao == 'uniao':
+        resultado = a.uniao_varios(afds)
+    else:
+        resultado = a.intersecao_varios(afds)
+    return _empacotar(resultado.tabela())
+
+
+def _equivalencia(dados1, dados2):
+    a1 = AFDCompacto(TabelaAFD.de_buffer(dados1))
+    a2 = AFDCompacto(TabelaAFD.de_buffer(dados2))
+    return a1.contraexemplo_equivalencia(a1, a2)
+
+
+def _aceitar(impressao, dados, cadeias):
+    aceitos = _afd(impressao, dados).aceita_lote(cadeias)
+    return [bool(x) for x in aceitos]
+
+
+# ===== Servidor =====
+
+class AFDNaoEncontrado(KeyError):
+    # Nome ausente do registro (404); um KeyError vindo de outro lugar é
+    # erro interno (500)
+    pass
+
+
+class Servico:
+    """
+    Registro de AFDs e rotas HTTP. janela é quanto tempo (em segundos) uma
+    requisição /aceita espera por outras do mesmo AFD antes de o lote ser
+    enviado; um lote com lote_maximo cadeias é enviado na hora.
+    """
+
+    def __init__(self, processos=None, janela=0.002, lote_maximo=4096):
+        self.afds = {}      # nome -> {'dados', 'impressao', 'estados', 'transicoes'}
+        self.janela = janela
+        self.lote_maximo = lote_maximo
+        self._pool = ProcessPoolExecutor(processos, initializer=_iniciar_processo)
+        self.processos = processos or os.cpu_count()
+        # nome -> [cadeias pendentes, [(início, fim, futuro)], timer]
+        self._pendentes = {}
+        self._conexoes = {}     # tarefa -> escritor de cada conexão aberta
+        self.requisicoes = 0
+        self.lotes = 0
+        self.cadeias = 0
+        self.segundos_trabalho = 0.0
+
+    async def _executar(self, funcao, *args):
+        inicio = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, funcao, *args)
+        finally:
+            self.segundos_trabalho += time.perf_counter() - inicio
+
+    def _registrar(self, nome, dados, impressao):
+        tab = TabelaAFD.de_buffer(dados)
+        self.afds[nome] = {'dados': dados, 'impressao': impressao,
+                           'estados': tab.n, 'transicoes': tab.num_transicoes()}
+        return self.descrever(nome)
+
+    def _registro(self, nome):
+        try:
+            return self.afds[nome]
+        except KeyError:
+            raise AFDNaoEncontrado(nome) from None
+
+    def descrever(self, nome):
+        registro = self._registro(nome)
+        return {'nome': nome, 'estados': registro['estados'],
+                'transicoes': registro['transicoes'], 'impressao': registro['impressao']}
+
+    # ===== Operações =====
+    async def carregar(self, nome, fonte):
+        dados, impressao = await self._executar(_carregar, fonte)
+        return self._registrar(nome, dados, impressao)
+
+    async def carregar_pasta(self, pasta):
+        # Carrega todos os .jff da pasta em paralelo; devolve os erros por
+        # arquivo, inclusive os de nome repetido (ver lote._arquivos_jff)
+        arquivos, erros = _arquivos_jff(pasta)
+        resultados = await asyncio.gather(
+            *(self.carregar(nome, {'caminho': os.path.join(pasta, arquivo)})
+              for nome, arquivo in arquivos.items()),
+            return_exceptions=True)
+        erros.update((arquivo, str(r)) for arquivo, r in zip(arquivos.values(), resultados)
+                     if isinstance(r, Exception))
+        return erros
+
+    async def minimizar(self, nome, destino):
+        dados, impressao = await self._executar(_minimizar, self._registro(nome)['dados'])
+        return self._registrar(destino, dados, impressao)
+
+    async def combinar(self, operacao, nomes, destino):
+        _conferir_operandos(operacao, len(nomes))
+        dados, impressao = await self._executar(
+            _combinar, operacao, [self._registro(nome)['dados'] for nome in nomes])
+        return self._registrar(destino, dados, impressao)
+
+    async def equivalencia(self, nome1, nome2):
+        palavra = await self._executar(_equivalencia, self._registro(nome1)['dados'],
+                                       self._registro(nome2)['dados'])
+        return {'equivalentes': palavra is None, 'contraexemplo': palavra}
+
+    async def aceitar(self, nome, cadeias):
+        # Entra no lote pendente do AFD; o primeiro a chegar agenda o envio
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        pendente = self._pendentes.get(nome)
+        if pendente is None:
+            pendente = self._pendentes[nome] = [[], [], None]
+            pendente[2] = loop.call_later(self.janela, self._despachar, nome)
+        inicio = len(pendente[0])
+        pendente[0].extend(cadeias)
+        pendente[1].append((inicio, len(pendente[0]), futuro))
+        if len(pendente[0]) >= self.lote_maximo:
+            pendente[2].cancel()
+            self._despachar(nome)
+        return await futuro
+
+    def _despachar(self, nome):
+        cadeias, esperando, _ = self._pendentes.pop(nome)
+        registro = self.afds.get(nome)
+        if registro is None:
+            for _, _, futuro in esperando:
+                futuro.set_exception(AFDNaoEncontrado(nome))
+            return
+        self.lotes += 1
+        self.cadeias += len(cadeias)
+        tarefa = asyncio.ensure_future(
+            self._executar(_aceitar, registro['impressao'], registro['dados'], cadeias))
+
+        def repartir(tarefa):
+            erro = None if tarefa.cancelled() else tarefa.exception()
+            for inicio, fim, futuro in esperando:
+                if futuro.done():
+                    continue
+                if tarefa.cancelled():
+                    futuro.cancel()
+                elif erro is not None:
+                    futuro.set_exception(erro)
+                else:
+                    futuro.set_result(tarefa.result()[inicio:fim])
+        tarefa.add_done_callback(repartir)
+
+    def estatisticas(self):
+        return {
+            'afds': len(self.afds),
+            'processos': self.processos,
+            'requisicoes': self.requisicoes,
+            'lotes_aceitacao': self.lotes,
+            'cadeias_aceitacao': self.cadeias,
+            'cadeias_por_lote': self.cadeias / self.lotes if self.lotes else 0.0,
+            'segundos_trabalho': self.segundos_trabalho,
+        }
+
+    # ===== HTTP =====
+    async def iniciar(self, host='127.0.0.1', porta=8080):
+        return await asyncio.start_server(self._atender, host, porta)
+
+    async def parar(self, servidor):
+        # Fecha o servidor e as conexões abertas, espera cada uma terminar a
+        # requisição em andamento e encerra os processos de trabalho
+        if servidor is not None:
+            servidor.close()
+        for escritor in self._conexoes.values():
+            escritor.close()
+        await asyncio.gather(*self._conexoes, return_exceptions=True)
+        if servidor is not None:
+            await servidor.wait_closed()
+        self._pool.shutdown(cancel_futures=True)
+
+    async def _atender(self, leitor, escritor):
+        # Uma conexão: requisições HTTP/1.1 em sequência (keep-alive)
+        tarefa = asyncio.current_task()
+        self._conexoes[tarefa] = escritor
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, alvo, versao = linha.decode('latin-1').split()
+                except ValueError:
+                    await _responder(escritor, 400, {'erro': "Requisição inválida."}, False)
+                    break
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b'\r\n', b'\n', b''):
+                        break
+                    chave, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[chave.strip().lower()] = valor.strip()
+                tamanho = int(cabecalhos.get('content-length', 0) or 0)
+                if tamanho > _CORPO_MAXIMO:
+                    await _responder(escritor, 413, {'erro': "Corpo grande demais."}, False)
+                    break
+                corpo = await leitor.readexactly(tamanho) if tamanho else b''
+                conexao = cabecalhos.get('connection', '').lower()
+                manter = conexao == 'keep-alive' or (versao == 'HTTP/1.1' and conexao != 'close')
+
+                self.requisicoes += 1
+                status, resposta = await self._rotear(metodo, alvo, corpo)
+                await _responder(escritor, status, resposta, manter)
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self._conexoes[tarefa]
+            escritor.close()
+
+    async def _rotear(self, metodo, alvo, corpo):
+        partes = [unquote(p) for p in urlsplit(alvo).path.split('/') if p]
+        try:
+            pedido = json.loads(corpo) if corpo else {}
+        except ValueError:
+            return 400, {'erro': "O corpo não é JSON válido."}
+        if not isinstance(pedido, dict):
+            return 400, {'erro': "O corpo deve ser um objeto JSON."}
+
+        rota = tuple(partes[:1] + partes[2:]) if partes[:1] == ['afds'] else tuple(partes)
+        nomes = partes[1:2] if partes[:1] == ['afds'] else pedido.get('afds', [])
+        if not isinstance(nomes, list) or not all(isinstance(n, str) for n in nomes):
+            return 400, {'erro': "'afds' deve ser uma lista de nomes."}
+        for nome in nomes:
+            if nome not in self.afds:
+                return 404, {'erro': f"AFD não encontrado: {nome}"}
+        try:
+            return await self._operacao(metodo, rota, partes, nomes, pedido)
+        except AFDNaoEncontrado as e:
+            return 404, {'erro': f"AFD não encontrado: {e.args[0]}"}
+        except (ValueError, TypeError) as e:
+            return 400, {'erro': f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            return 500, {'erro': f"{type(e).__name__}: {e}"}
+
+    async def _operacao(self, metodo, rota, partes, nomes, pedido):
+        if rota == ('afds',) and len(partes) == 1:
+            if metodo == 'GET':
+                return 200, {nome: self.descrever(nome) for nome in sorted(self.afds)}
+            if metodo == 'POST':
+                nome = pedido.get('nome')
+                if not isinstance(nome, str) or not nome:
+                    raise ValueError("informe o 'nome' do AFD")
+                return 201, await self.carregar(nome, pedido)
+        elif rota == ('afds',):
+            if metodo == 'GET':
+                return 200, self.descrever(nomes[0])
+            if metodo == 'DELETE':
+                del self.afds[nomes[0]]
+                return 200, {'removido': nomes[0]}
+        elif rota == ('afds', 'minimizar'):
+            if metodo == 'POST':
+                destino = pedido.get('destino', f"{nomes[0]}_min")
+                return 201, await self.minimizar(nomes[0], destino)
+        elif rota == ('afds', 'aceita'):
+            if metodo == 'POST':
+                cadeias = pedido.get('cadeias')
+                if not isinstance(cadeias, list) or not all(isinstance(c, str) for c in cadeias):
+                    raise ValueError("'cadeias' deve ser uma lista de strings")
+                return 200, {'aceitas': await self.aceitar(nomes[0], cadeias)}
+        elif rota == ('combinar',):
+            if metodo == 'POST':
+                operacao = pedido.get('operacao')
+                destino = pedido.get('destino', f"{operacao}({','.join(nomes)})")
+                return 201, await self.combinar(operacao, nomes, destino)
+        elif rota == ('equivalencia',):
+            if metodo == 'POST':
+                if len(nomes) != 2:
+                    raise ValueError("informe exatamente dois AFDs")
+                return 200, await self.equivalencia(*nomes)
+        elif rota == ('estatisticas',):
+            if metodo == 'GET':
+                return 200, self.estatisticas()
+        else:
+            return 404, {'erro': f"Rota desconhecida: /{'/'.join(partes)}"}
+        return 405, {'erro': f"Método {metodo} não permitido em /{'/'.join(partes)}"}
+
+
+async def _responder(escritor, status, corpo, manter):
+    dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+    cabecalho = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                 f"Content-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(dados)}\r\n"
+                 f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n")
+    escritor.write(cabecalho.encode('latin-1') + dados)
+    await escritor.drain()
+
+
+async def _principal(args):
+    servico = Servico(args.processos, args.janela / 1000, args.lote_maximo)
+    servidor = None
+    try:
+        if args.pasta:
+            erros = await servico.carregar_pasta(args.pasta)
+            print(f"✅ {len(servico.afds)} AFD(s) carregado(s) de {args.pasta}")
+            for nome, erro in erros.items():
+                print(f"❌ {nome}: {erro}")
+        servidor = await servico.iniciar(args.host, args.porta)
+        enderecos = ', '.join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servidor.sockets)
+        print(f"🚀 Servindo em {enderecos} ({servico.processos} processos)")
+        await servidor.serve_forever()
+    finally:
+        await servico.parar(servidor)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON de AFDs.")
+    parser.add_argument('pasta', nargs='?', help="pasta com .jff carregados na partida")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('-j', '--processos', type=int, default=None,
+                        help="processos de trabalho (padrão: um por núcleo)")
+    parser.add_argument('--janela', type=float, default=2.0,
+                        help="milissegundos que uma aceitação espera para formar lote")
+    parser.add_argument('--lote-maximo', type=int, default=4096,
+                        help="cadeias a partir das quais o lote é enviado na hora")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_principal(args))
+    except KeyboardInterrupt:
+        print("Saindo...")
+
+
+if __name__ == '__main__':
+    main()
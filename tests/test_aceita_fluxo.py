@@ -0,0 +1,48 @@
+"""
+AFD.aceita_fluxo: '\r' só é descartado como parte do fim de linha CRLF
+quando não pertence ao alfabeto do AFD.
+
+Uso: python -m unittest discover -s tests
+"""
+import io
+import unittest
+
+from AFD import AFD
+
+
+def _afd(alfabeto):
+    # a*, com alfabeto informado à parte das transições
+    afd = AFD(alfabeto)
+    afd.estados.add('q0')
+    afd.incial = 'q0'
+    afd.finais.add('q0')
+    afd.transicoes[('q0', 'a')] = 'q0'
+    return afd
+
+
+def _aceitas(afd, fonte):
+    return [aceita for _, _, aceita in afd.aceita_fluxo(fonte)]
+
+
+class TesteAceitaFluxo(unittest.TestCase):
+
+    def test_cr_fora_do_alfabeto_e_ignorado(self):
+        afd = _afd('a')
+        for fonte in ('aa\r\n\r\na\r', b'aa\r\n\r\na\r'):
+            self.assertEqual(_aceitas(afd, fonte), [True, True, True])
+
+    def test_cr_no_alfabeto_sem_transicao_rejeita(self):
+        afd = _afd('a\r')
+        self.assertNotIn('\r', {simbolo for (_, simbolo) in afd.transicoes})
+        for fonte in ('\r\naa\n\r', b'\r\naa\n\r', io.BytesIO(b'\r\naa\n\r')):
+            self.assertEqual(_aceitas(afd, fonte), [False, True, False])
+
+    def test_compactado_segue_o_alfabeto(self):
+        afd = _afd('a\r').compactar()
+        self.assertEqual(_aceitas(afd, b'\r\na\r\n'), [False, False])
+        afd = _afd('a').compactar()
+        self.assertEqual(_aceitas(afd, b'\r\na\r\n'), [True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+AFD.copiar: original e cópia continuam com a interface de set/dict em
+estados, finais e transicoes, e as alterações de um não aparecem no outro.
+
+Uso: python -m unittest discover -s tests
+"""
+import unittest
+
+from AFD import AFD
+
+
+def _afd():
+    afd = AFD('ab')
+    afd.estados.update({'q0', 'q1', 'q2'})
+    afd.incial = 'q0'
+    afd.finais.add('q2')
+    afd.transicoes.update({('q0', 'a'): 'q1', ('q1', 'b'): 'q2', ('q2', 'a'): 'q2'})
+    return afd
+
+
+class TesteCopiar(unittest.TestCase):
+
+    def conferir_conjunto(self, conjunto, esperado):
+        self.assertEqual(conjunto.copy(), esperado)
+        self.assertEqual(conjunto.union({'x'}), esperado | {'x'})
+        self.assertEqual(conjunto.intersection({'q0', 'x'}), esperado & {'q0', 'x'})
+        self.assertEqual(conjunto.difference({'q0'}), esperado - {'q0'})
+        self.assertEqual(conjunto.symmetric_difference({'q0', 'x'}), esperado ^ {'q0', 'x'})
+        self.assertEqual(conjunto | {'x'}, esperado | {'x'})
+        self.assertEqual(conjunto & {'q0', 'x'}, esperado & {'q0', 'x'})
+        self.assertEqual(conjunto - {'q0'}, esperado - {'q0'})
+        self.assertEqual({'q0', 'x'} - conjunto, {'q0', 'x'} - esperado)
+        self.assertTrue(conjunto.issubset(esperado | {'x'}))
+        self.assertTrue(conjunto.issuperset(set()))
+        self.assertEqual(conjunto, esperado)
+        self.assertEqual(len(conjunto), len(esperado))
+
+    def conferir_mapa(self, mapa, esperado):
+        self.assertEqual(mapa.copy(), esperado)
+        self.assertEqual(mapa | {('x', 'a'): 'x'}, {**esperado, ('x', 'a'): 'x'})
+        self.assertEqual({('x', 'a'): 'x'} | mapa, {('x', 'a'): 'x', **esperado})
+        self.assertEqual(dict(mapa.items()), esperado)
+        self.assertEqual(mapa.get(('q0', 'a')), esperado.get(('q0', 'a')))
+        self.assertEqual(mapa, esperado)
+
+    def conferir(self, afd, estados, finais, transicoes):
+        self.conferir_conjunto(afd.estados, estados)
+        self.conferir_conjunto(afd.finais, finais)
+        self.conferir_mapa(afd.transicoes, transicoes)
+
+    def test_original_e_copia_mantem_interface(self):
+        original = _afd()
+        estados, finais = set(original.estados), set(original.finais)
+        transicoes = dict(original.transicoes)
+        copia = original.copiar()
+        self.conferir(original, estados, finais, transicoes)
+        self.conferir(copia, estados, finais, transicoes)
+
+    def test_alteracoes_independentes(self):
+        original = _afd()
+        estados, finais = set(original.estados), set(original.finais)
+        transicoes = dict(original.transicoes)
+        copia = original.copiar()
+
+        copia.estados.add('q3')
+        copia.finais.update({'q1'})
+        copia.finais.difference_update({'q2'})
+        copia.transicoes[('q2', 'b')] = 'q3'
+        del copia.transicoes[('q0', 'a')]
+        original.estados.discard('q1')
+        original.finais.symmetric_difference_update({'q0'})
+        original.transicoes |= {('q1', 'a'): 'q0'}
+
+        self.conferir(original, estados - {'q1'}, finais ^ {'q0'},
+                      {**transicoes, ('q1', 'a'): 'q0'})
+        copia_transicoes = {**transicoes, ('q2', 'b'): 'q3'}
+        del copia_transicoes[('q0', 'a')]
+        self.conferir(copia, estados | {'q3'}, {'q1'}, copia_transicoes)
+
+    def test_copia_de_copia(self):
+        original = _afd()
+        copia = original.copiar()
+        copia.finais.intersection_update({'q0'})
+        neta = copia.copiar()
+        neta.finais.add('q1')
+        self.assertEqual(set(original.finais), {'q2'})
+        self.assertEqual(copia.finais.copy(), set())
+        self.assertEqual(neta.finais.union(), {'q1'})
+
+
+if __name__ == '__main__':
+    unittest.main()